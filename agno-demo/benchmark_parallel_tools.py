@@ -0,0 +1,126 @@
+"""
+Offline benchmark: sequential function calling vs parallel tool calling
+
+Runs the same multi-action tasks through the two Pica agent modes
+(PICA_AGENT_MODE=functions and PICA_AGENT_MODE=parallel) with a scripted
+chat model and a stand-in tool, both with fixed latency, so it needs no API
+keys or network access. It reports the model round trips and wall time per
+task.
+
+Usage:
+    python benchmark_parallel_tools.py --actions 1,3,5 --llm-latency 0.5 --tool-latency 0.3
+"""
+
+import argparse
+import json
+import time
+import uuid
+from typing import Any, Dict, List
+
+from langchain.agents import AgentType, initialize_agent
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, FunctionMessage, SystemMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.tools import StructuredTool
+
+from pica_parallel_agent import create_parallel_agent
+
+SYSTEM_PROMPT = "You execute platform actions. Perform every action the user asks for."
+
+
+class ScriptedToolModel(BaseChatModel):
+    """
+    Chat model that asks for one tool call per action listed in the task.
+
+    Given functions (OPENAI_FUNCTIONS agent) it can only request one call per
+    turn; given tools it requests all remaining calls in a single response,
+    as a model with parallel tool calling would.
+    """
+
+    latency: float = 0.5
+    calls: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted-tool-model"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        time.sleep(self.latency)
+        self.calls += 1
+
+        task = next(str(m.content) for m in messages if m.type == "human")
+        actions = [a.strip() for a in task.split("ACTIONS:", 1)[1].split(";") if a.strip()]
+        done = sum(isinstance(m, (FunctionMessage, ToolMessage)) for m in messages)
+        remaining = actions[done:]
+
+        if not remaining:
+            message = AIMessage(content=f"Completed {len(actions)} actions.")
+        elif "tools" in kwargs:
+            message = AIMessage(content="", tool_calls=[
+                {"name": "execute_action", "args": {"action": action}, "id": f"call_{uuid.uuid4().hex[:8]}"}
+                for action in remaining
+            ])
+        else:
+            message = AIMessage(content="", additional_kwargs={"function_call": {
+                "name": "execute_action",
+                "arguments": json.dumps({"action": remaining[0]}),
+            }})
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+def make_tool(latency: float) -> StructuredTool:
+    def execute_action(action: str) -> str:
+        """Execute one platform action."""
+        time.sleep(latency)
+        return f"Executed: {action}"
+
+    return StructuredTool.from_function(execute_action)
+
+
+def run_mode(mode: str, actions: int, args: argparse.Namespace) -> Dict[str, Any]:
+    llm = ScriptedToolModel(latency=args.llm_latency)
+    tools = [make_tool(args.tool_latency)]
+    if mode == "parallel":
+        agent = create_parallel_agent(llm, tools, SYSTEM_PROMPT, max_concurrency=args.concurrency)
+    else:
+        agent = initialize_agent(
+            tools, llm, agent=AgentType.OPENAI_FUNCTIONS,
+            agent_kwargs={"system_message": SystemMessage(content=SYSTEM_PROMPT)}
+        )
+
+    task = "Do the following. ACTIONS: " + "; ".join(f"create issue {i + 1}" for i in range(actions))
+    started = time.perf_counter()
+    agent.invoke({"input": task})
+    return {
+        "mode": mode,
+        "actions": actions,
+        "model_rounds": llm.calls,
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare Pica agent modes offline")
+    parser.add_argument("--actions", default="1,3,5", help="Comma-separated action counts per task")
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="Scripted model latency per call (s)")
+    parser.add_argument("--tool-latency", type=float, default=0.3, help="Tool latency per call (s)")
+    parser.add_argument("--concurrency", type=int, default=4, help="Tool concurrency in parallel mode")
+    parser.add_argument("--output", help="Optional JSON file for the results")
+    args = parser.parse_args()
+
+    results: List[Dict[str, Any]] = []
+    print(f"{'actions':>7}  {'mode':<10} {'rounds':>6} {'seconds':>8}")
+    for actions in [int(n) for n in args.actions.split(",")]:
+        for mode in ("functions", "parallel"):
+            result = run_mode(mode, actions, args)
+            results.append(result)
+            print(f"{actions:>7}  {mode:<10} {result['model_rounds']:>6} {result['seconds']:>8.2f}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"settings": vars(args), "results": results}, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
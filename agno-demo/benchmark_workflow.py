@@ -0,0 +1,397 @@
+"""
+Offline benchmark: BusinessAutomationWorkflow end to end
+
+Runs N onboarding workflows with every OpenAIChat model of the workflow
+agents replaced by a scripted model, and PicaAgentService replaced by a
+local fake, both with fixed latency. No API keys or network access are
+needed and every run does the same work, so step-level changes can be
+compared reproducibly.
+
+The scripted model answers each step with canned output (markdown tasks, or
+a TaskPlan in structured planning mode), makes one tool call for each
+platform task, and reports token usage estimated from the message sizes.
+The fake Pica service sleeps, reports success, and records the LLM usage a
+Pica agent would have in the run's usage tracker.
+
+Reported per run and overall: step latency, LLM calls and tokens (by agent),
+Pica calls, and throughput.
+
+Usage:
+    python benchmark_workflow.py --runs 20 --concurrency 4 --llm-latency 0.5 --pica-latency 0.3
+    python benchmark_workflow.py --runs 100 --concurrency 50 --mode async --planning-mode structured
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+
+# Keep benchmark results out of the real result store
+os.environ["WORKFLOW_RESULTS_DB"] = os.path.join(tempfile.mkdtemp(prefix="workflow-bench-"), "results.db")
+
+from agno.agent import Agent
+from agno.models.base import Model
+from agno.models.message import Message
+from agno.models.response import ModelResponse
+
+import pica_agent_service
+from business_automation_workflow import BusinessAutomationWorkflow
+from pica_agent_service import PicaAgentService
+from pica_compaction import OutputCompactor
+from rate_limits import configure_rate_limit
+from usage_tracking import TokenUsage, current_tracker
+
+PLATFORMS = ["gmail", "linear", "notion", "airtable", "google-calendar"]
+
+ANALYSIS = """\
+## Customer Analysis
+1. **Priority**: High - inbound website lead with high stated interest.
+2. **Approach**: White-glove onboarding with a named success manager.
+3. **Key tasks**: welcome email, onboarding project, customer profile, CRM record.
+4. **Communication**: Personal welcome within 24 hours, weekly check-ins for a month.
+5. **Success metrics**: Time to first value, activation within 14 days, NPS at day 30.
+"""
+
+TASKS = """\
+**Task 1: Send Welcome Email**
+- Description: Send a personalized welcome email to the customer using Gmail
+- Priority: High
+- Assignee: success
+- Deadline: Tomorrow
+
+**Task 2: Create Onboarding Project**
+- Description: Create the onboarding project with milestones using Linear
+- Priority: High
+- Assignee: success
+- Deadline: In 2 days
+
+**Task 3: Set Up Account Configuration Ticket**
+- Description: Track account configuration and permissions using Linear
+- Priority: Medium
+- Assignee: support
+- Deadline: In 3 days
+
+**Task 4: Create Customer Profile**
+- Description: Document the customer profile and goals using Notion
+- Priority: Medium
+- Assignee: sales
+- Deadline: In 3 days
+
+**Task 5: Add CRM Record**
+- Description: Add the customer record with lead source using Airtable
+- Priority: Low
+- Assignee: sales
+- Deadline: In 5 days
+"""
+
+TASK_PLAN = {"tasks": [
+    {"title": "Send Welcome Email", "description": "Send a personalized welcome email to the customer",
+     "platform": "gmail", "priority": "high", "assigned_to": "success", "due_date": "tomorrow"},
+    {"title": "Create Onboarding Project", "description": "Create the onboarding project with milestones",
+     "platform": "linear", "priority": "high", "assigned_to": "success", "due_date": "in 2 days"},
+    {"title": "Account Configuration", "description": "Track account configuration and permissions",
+     "platform": "linear", "priority": "medium", "assigned_to": "support", "due_date": "in 3 days"},
+    {"title": "Create Customer Profile", "description": "Document the customer profile and goals",
+     "platform": "notion", "priority": "medium", "assigned_to": "sales", "due_date": "in 3 days"},
+    {"title": "Add CRM Record", "description": "Add the customer record with lead source",
+     "platform": "airtable", "priority": "low", "assigned_to": "sales", "due_date": "in 5 days"},
+]}
+
+COMMUNICATION = """\
+**Subject:** Welcome aboard - let's get you set up
+
+Hi there, thank you for choosing us. Your success manager will reach out today
+to schedule a kickoff call and walk you through the first steps.
+
+**Follow-ups:** day 3 check-in, day 7 tips, day 14 review.
+**Internal:** notify the success team in the onboarding channel.
+"""
+
+
+@dataclass
+class ScriptedModel(Model):
+    """
+    Stand-in for OpenAIChat with fixed latency and canned, step-specific output.
+
+    Platform task prompts ("Execute this ... Use <tool> tool ...") get one call
+    of the named tool, then a final answer. Token usage is estimated at four
+    characters per token, so prompt changes show up in the token counts.
+    """
+
+    id: str = "scripted"
+    name: str = "ScriptedModel"
+    provider: str = "Scripted"
+    latency: float = 0.5
+
+    def invoke(self, messages: List[Message], **kwargs) -> ModelResponse:
+        time.sleep(self.latency)
+        return self._respond(messages, kwargs.get("tools"))
+
+    async def ainvoke(self, messages: List[Message], **kwargs) -> ModelResponse:
+        await asyncio.sleep(self.latency)
+        return self._respond(messages, kwargs.get("tools"))
+
+    def invoke_stream(self, messages: List[Message], **kwargs) -> Iterator[ModelResponse]:
+        yield self.invoke(messages, **kwargs)
+
+    async def ainvoke_stream(self, messages: List[Message], **kwargs) -> AsyncIterator[ModelResponse]:
+        yield await self.ainvoke(messages, **kwargs)
+
+    def parse_provider_response(self, response: ModelResponse, **kwargs) -> ModelResponse:
+        return response
+
+    def parse_provider_response_delta(self, response: ModelResponse) -> ModelResponse:
+        return response
+
+    def _respond(self, messages: List[Message], tools: Optional[List[Dict[str, Any]]]) -> ModelResponse:
+        prompt = next(str(m.content) for m in reversed(messages) if m.role == "user")
+        tool_names = {t["function"]["name"] for t in tools or [] if t.get("type") == "function"}
+        response = ModelResponse(role="assistant")
+
+        if prompt.startswith("Execute this"):
+            tool_name = next((name for name in tool_names if f"Use {name} tool" in prompt), None)
+            if tool_name and not any(m.role == "tool" for m in messages):
+                task = prompt.split(": ", 1)[1].rsplit(". Use ", 1)[0]
+                response.tool_calls = [{
+                    "id": f"call_{uuid.uuid4().hex[:12]}",
+                    "type": "function",
+                    "function": {"name": tool_name, "arguments": json.dumps({"task": task})},
+                }]
+            else:
+                response.content = "Done. The platform confirmed the operation."
+        elif "plan the tasks" in prompt:
+            response.content = json.dumps(TASK_PLAN)
+        elif "create specific tasks" in prompt:
+            response.content = TASKS
+        elif "communication plan" in prompt:
+            response.content = COMMUNICATION
+        elif "Analyze this customer" in prompt:
+            response.content = ANALYSIS
+        else:
+            response.content = "OK"
+
+        prompt_chars = sum(len(str(m.content or "")) for m in messages) + len(json.dumps(tools or []))
+        completion_chars = len(response.content or "") + len(json.dumps(response.tool_calls))
+        response.response_usage = {"input_tokens": prompt_chars // 4, "output_tokens": completion_chars // 4}
+        return response
+
+
+class FakePicaService(PicaAgentService):
+    """
+    Local stand-in for PicaAgentService: every task and action succeeds after a
+    fixed latency. Each task also records `llm_calls` calls of simulated Pica
+    agent usage in the current run's tracker.
+    """
+
+    def __init__(self, latency: float = 0.3, llm_calls: int = 2,
+                 prompt_tokens: int = 1200, completion_tokens: int = 120):
+        self.latency = latency
+        self.llm_calls = llm_calls
+        self.prompt_tokens = prompt_tokens
+        self.completion_tokens = completion_tokens
+        self.compactor = OutputCompactor()
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def execute_task(self, task_description: str, platform: Optional[str] = None) -> Dict[str, Any]:
+        time.sleep(self.latency)
+        return self._result(task_description, platform)
+
+    async def aexecute_task(self, task_description: str, platform: Optional[str] = None) -> Dict[str, Any]:
+        await asyncio.sleep(self.latency)
+        return self._result(task_description, platform)
+
+    def execute_action(self, platform: str, action_id: str, params: Optional[Dict[str, Any]] = None,
+                       query_params: Optional[Dict[str, Any]] = None,
+                       connection_key: Optional[str] = None) -> Dict[str, Any]:
+        time.sleep(self.latency)
+        return self._result(f"action {action_id}", platform)
+
+    def test_connection(self, force_refresh: bool = False) -> Dict[str, Any]:
+        return {
+            "success": True,
+            "connected_platforms": PLATFORMS,
+            "platform_count": len(PLATFORMS),
+            "pica_secret_configured": True,
+            "openai_configured": True,
+            "agent_created": True,
+        }
+
+    def _result(self, task: str, platform: Optional[str]) -> Dict[str, Any]:
+        usage = TokenUsage()
+        for _ in range(self.llm_calls):
+            usage.add(self.prompt_tokens, self.completion_tokens, model="gpt-4o-mini")
+        tracker = current_tracker()
+        if tracker is not None:
+            tracker.record(usage, "pica_agent")
+        with self._lock:
+            self.calls += 1
+        return {
+            "success": True,
+            "result": {"output": f"Completed on {platform or 'pica'}: {task[:80]}"},
+            "task": task,
+            "execution_method": "pica_langchain",
+            "usage": usage.to_dict(),
+        }
+
+
+def install_stubs(llm_latency: float, pica: FakePicaService) -> None:
+    """Swap the workflow agents' models for scripted ones and install the fake Pica service."""
+    for name in dir(BusinessAutomationWorkflow):
+        agent = getattr(BusinessAutomationWorkflow, name, None)
+        if isinstance(agent, Agent):
+            # Keep the model id, so cost estimates use the real model's pricing
+            agent.model = ScriptedModel(id=agent.model.id, latency=llm_latency)
+    pica_agent_service._pica_service = pica
+
+
+def customer(index: int) -> Dict[str, Any]:
+    return {
+        "name": f"Customer {index}",
+        "email": f"customer{index}@example.com",
+        "company": f"Company {index}",
+        "source": "website_form",
+        "interest_level": "high",
+    }
+
+
+def run_sync(index: int, args: argparse.Namespace) -> Dict[str, Any]:
+    workflow = BusinessAutomationWorkflow(session_id=f"bench_{index}")
+    workflow.use_private_agents()
+    workflow.planning_mode = args.planning_mode
+    started = time.perf_counter()
+    for _ in workflow.run(customer_data=customer(index), use_cache=False):
+        pass
+    return summarize(workflow, time.perf_counter() - started)
+
+
+async def run_async(index: int, args: argparse.Namespace) -> Dict[str, Any]:
+    workflow = BusinessAutomationWorkflow(session_id=f"bench_{index}")
+    workflow.planning_mode = args.planning_mode
+    started = time.perf_counter()
+    async for _ in workflow.arun(customer_data=customer(index), use_cache=False):
+        pass
+    return summarize(workflow, time.perf_counter() - started)
+
+
+def summarize(workflow: BusinessAutomationWorkflow, seconds: float) -> Dict[str, Any]:
+    result = workflow.last_result
+    if result is None:
+        return {"status": "failed", "seconds": seconds, "steps": {}, "usage": {}}
+    return {"status": result.status, "seconds": seconds, "steps": result.step_seconds, "usage": result.usage}
+
+
+def run_all(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    if args.mode == "async":
+        async def bounded() -> List[Dict[str, Any]]:
+            slots = asyncio.Semaphore(args.concurrency)
+
+            async def one(index: int) -> Dict[str, Any]:
+                async with slots:
+                    return await run_async(index, args)
+            return await asyncio.gather(*(one(i) for i in range(args.runs)))
+        return asyncio.run(bounded())
+
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        return list(pool.map(lambda i: run_sync(i, args), range(args.runs)))
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def report(runs: List[Dict[str, Any]], elapsed: float, pica_calls: int) -> Dict[str, Any]:
+    steps: Dict[str, List[float]] = {}
+    for run in runs:
+        for name, seconds in run["steps"].items():
+            steps.setdefault(name, []).append(seconds)
+    step_stats = {
+        name: {
+            "mean": round(statistics.mean(values), 3),
+            "p50": round(percentile(values, 0.5), 3),
+            "p95": round(percentile(values, 0.95), 3),
+        }
+        for name, values in steps.items()
+    }
+
+    by_source: Dict[str, Dict[str, int]] = {}
+    for run in runs:
+        for source, usage in (run["usage"].get("by_source") or {}).items():
+            totals = by_source.setdefault(source, {"llm_calls": 0, "total_tokens": 0})
+            totals["llm_calls"] += usage["llm_calls"]
+            totals["total_tokens"] += usage["total_tokens"]
+
+    statuses: Dict[str, int] = {}
+    for run in runs:
+        statuses[run["status"]] = statuses.get(run["status"], 0) + 1
+    workflow_seconds = [run["seconds"] for run in runs]
+    return {
+        "runs": len(runs),
+        "by_status": statuses,
+        "elapsed_seconds": round(elapsed, 3),
+        "workflows_per_minute": round(len(runs) / elapsed * 60, 2) if elapsed else 0.0,
+        "workflow_seconds": {
+            "mean": round(statistics.mean(workflow_seconds), 3),
+            "p50": round(percentile(workflow_seconds, 0.5), 3),
+            "p95": round(percentile(workflow_seconds, 0.95), 3),
+        },
+        "steps": step_stats,
+        "llm_calls": sum(run["usage"].get("llm_calls", 0) for run in runs),
+        "total_tokens": sum(run["usage"].get("total_tokens", 0) for run in runs),
+        "estimated_cost_usd": round(sum(run["usage"].get("estimated_cost_usd", 0.0) for run in runs), 4),
+        "by_source": by_source,
+        "pica_calls": pica_calls,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the onboarding workflow offline")
+    parser.add_argument("--runs", type=int, default=20, help="Workflows to run")
+    parser.add_argument("--concurrency", type=int, default=4, help="Workflows running at once")
+    parser.add_argument("--mode", choices=("sync", "async"), default="sync", help="run() on threads or arun() on one event loop")
+    parser.add_argument("--planning-mode", choices=("markdown", "structured"), default="markdown", help="Task planning mode")
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="Scripted model latency per call (s)")
+    parser.add_argument("--pica-latency", type=float, default=0.3, help="Fake Pica latency per task (s)")
+    parser.add_argument("--pica-llm-calls", type=int, default=2, help="Simulated Pica agent LLM calls per task")
+    parser.add_argument("--output", help="Optional JSON file for the results")
+    args = parser.parse_args()
+
+    # Measure the workflow itself, not the process-wide rate limits
+    configure_rate_limit("llm", None)
+    configure_rate_limit("pica", None)
+    pica = FakePicaService(latency=args.pica_latency, llm_calls=args.pica_llm_calls)
+    install_stubs(args.llm_latency, pica)
+
+    started = time.perf_counter()
+    runs = run_all(args)
+    summary = report(runs, time.perf_counter() - started, pica.calls)
+
+    print(f"{summary['runs']} workflows ({args.mode}, concurrency {args.concurrency}, {args.planning_mode} planning) "
+          f"in {summary['elapsed_seconds']:.2f}s: {summary['workflows_per_minute']:.1f} workflows/min, "
+          f"statuses {summary['by_status']}")
+    print(f"\n{'step':<15} {'mean':>7} {'p50':>7} {'p95':>7}")
+    for name, stats in [("workflow", summary["workflow_seconds"])] + list(summary["steps"].items()):
+        print(f"{name:<15} {stats['mean']:>7.2f} {stats['p50']:>7.2f} {stats['p95']:>7.2f}")
+    print(f"\n{'source':<26} {'llm calls':>9} {'tokens':>9}")
+    for source, totals in sorted(summary["by_source"].items()):
+        print(f"{source:<26} {totals['llm_calls']:>9} {totals['total_tokens']:>9}")
+    print(f"{'total':<26} {summary['llm_calls']:>9} {summary['total_tokens']:>9}")
+    print(f"\nPica calls: {summary['pica_calls']} | estimated cost ${summary['estimated_cost_usd']:.4f}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"settings": vars(args), "summary": summary, "runs": runs}, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,287 @@
+"""
+Bulk onboarding - run the onboarding workflow over a file of customers
+
+Customers are streamed from a CSV (with a header row) or JSONL file and
+onboarded by a bounded pool of workers, each running its own
+BusinessAutomationWorkflow. All workers share the process-wide LLM and Pica
+rate limits (see rate_limits.py), so the pool size sets the parallelism and
+the rate limits keep it within provider quotas.
+
+Every finished customer is appended to the output JSONL with its
+WorkflowResult. The output doubles as the progress record: running the same
+command again skips customers already completed, and resumes the others from
+their workflow checkpoints.
+
+Usage:
+    python bulk_onboarding.py leads.csv --output tmp/onboarding_results.jsonl --workers 4 --llm-rpm 300 --pica-rpm 120
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, Optional
+
+from agno.storage.sqlite import SqliteStorage
+from pydantic import ValidationError
+
+from business_automation_workflow import BusinessAutomationWorkflow, Customer
+from rate_limits import configure_rate_limit
+
+# Statuses that are final; other customers are tried again on the next run
+FINAL_STATUSES = ("completed", "invalid")
+
+
+def read_customers(path: str) -> Iterator[Dict[str, Any]]:
+    """Stream customer records from a CSV or JSONL file."""
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.lower().endswith(".csv"):
+            for row in csv.DictReader(f):
+                yield {key.strip(): (value or "").strip() for key, value in row.items() if key}
+        else:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def count_customers(path: str) -> int:
+    """Number of records in a customer file, for progress and ETA."""
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.lower().endswith(".csv"):
+            # DictReader, like read_customers, so blank lines are not counted
+            return sum(1 for _ in csv.DictReader(f))
+        return sum(1 for line in f if line.strip())
+
+
+def customer_key(customer: Dict[str, Any]) -> str:
+    """Identity of a customer across runs: the email, or a hash of the record without one."""
+    email = str(customer.get("email") or "").strip().lower()
+    if email:
+        return email
+    canonical = json.dumps(customer, sort_keys=True, default=str)
+    return f"sha256:{hashlib.sha256(canonical.encode()).hexdigest()[:16]}"
+
+
+def load_progress(output_path: str) -> Dict[str, str]:
+    """Latest status per customer key from an existing output file."""
+    progress: Dict[str, str] = {}
+    if not os.path.exists(output_path):
+        return progress
+    with open(output_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # partially written last line of an interrupted run
+            progress[record["key"]] = record["status"]
+    return progress
+
+
+class BulkOnboardingRunner:
+    """
+    Onboards customers from a file with a bounded worker pool.
+    """
+
+    def __init__(self,
+                 output_path: str,
+                 workers: int = 4,
+                 db_file: str = "tmp/business_automation.db",
+                 workflow_type: str = "customer_onboarding",
+                 token_budget: Optional[int] = None,
+                 planning_mode: Optional[str] = None,
+                 report_every: float = 10.0):
+        """
+        Args:
+            output_path: JSONL file receiving one record per finished customer
+            workers: Workflows running at once
+            db_file: SQLite file for workflow sessions and checkpoints
+            workflow_type: Workflow type passed to each run
+            token_budget: Token budget per customer run
+            planning_mode: Planning mode of the workflows (default: the workflow's)
+            report_every: Seconds between progress reports
+        """
+        self.output_path = output_path
+        self.workers = max(1, workers)
+        self.workflow_type = workflow_type
+        self.token_budget = token_budget
+        self.planning_mode = planning_mode
+        self.report_every = report_every
+        self.storage = SqliteStorage(
+            table_name="business_automation_workflows",
+            db_file=db_file,
+            auto_upgrade_schema=True
+        )
+        # Create the session table up front; workers creating it at once would race
+        self.storage.mode = "workflow"
+        self.storage.create()
+
+    def run(self, input_path: str) -> Dict[str, Any]:
+        """
+        Onboard every customer in `input_path` that is not already done.
+
+        Returns:
+            Summary with counts per status, elapsed time and throughput
+        """
+        total = count_customers(input_path)
+        progress = load_progress(self.output_path)
+        counts: Dict[str, int] = {}
+        skipped = finished = duplicates = 0
+        # Keys submitted this run; a repeated key would share the first one's session
+        submitted = set()
+        tokens = 0
+        cost = 0.0
+        started = time.monotonic()
+        last_report = started
+
+        os.makedirs(os.path.dirname(self.output_path) or ".", exist_ok=True)
+        with open(self.output_path, "a", encoding="utf-8") as output, \
+                ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="onboarding") as pool:
+            running: Dict[Future, str] = {}
+
+            def collect(block: bool) -> None:
+                nonlocal finished, tokens, cost, last_report
+                if not running:
+                    return
+                done, _ = wait(running, timeout=None if block else 0, return_when=FIRST_COMPLETED)
+                for future in done:
+                    running.pop(future)
+                    record = future.result()
+                    output.write(json.dumps(record, default=str) + "\n")
+                    output.flush()
+                    finished += 1
+                    counts[record["status"]] = counts.get(record["status"], 0) + 1
+                    usage = (record.get("result") or {}).get("usage") or {}
+                    tokens += usage.get("total_tokens", 0)
+                    cost += usage.get("estimated_cost_usd", 0.0)
+                now = time.monotonic()
+                if now - last_report >= self.report_every:
+                    last_report = now
+                    self._report(finished, skipped, total, now - started)
+
+            for row, customer in enumerate(read_customers(input_path), 1):
+                key = customer_key(customer)
+                if progress.get(key) in FINAL_STATUSES:
+                    skipped += 1
+                    continue
+                if key in submitted:
+                    print(f"⚠️ Row {row}: skipping duplicate customer {key}", flush=True)
+                    duplicates += 1
+                    skipped += 1
+                    continue
+                submitted.add(key)
+                # Keep the backlog small so huge files are streamed, not loaded
+                while len(running) >= self.workers * 2:
+                    collect(block=True)
+                future = pool.submit(self._onboard, row, key, customer, key in progress)
+                running[future] = key
+                collect(block=False)
+
+            while running:
+                collect(block=True)
+
+        elapsed = time.monotonic() - started
+        self._report(finished, skipped, total, elapsed)
+        return {
+            "total": total,
+            "skipped": skipped,
+            "duplicates": duplicates,
+            "finished": finished,
+            "by_status": counts,
+            "elapsed_seconds": round(elapsed, 1),
+            "customers_per_minute": round(finished / elapsed * 60, 2) if elapsed else 0.0,
+            "total_tokens": tokens,
+            "estimated_cost_usd": round(cost, 4),
+        }
+
+    def _onboard(self, row: int, key: str, customer: Dict[str, Any], resume: bool) -> Dict[str, Any]:
+        """Run the workflow for one customer and build its output record."""
+        record: Dict[str, Any] = {
+            "key": key,
+            "row": row,
+            "status": "error",
+            "result": None,
+            "error": None,
+        }
+        try:
+            Customer(**customer)
+        except ValidationError as e:
+            record.update(status="invalid", error=str(e))
+            return self._finish(record)
+
+        try:
+            workflow = BusinessAutomationWorkflow(
+                session_id=f"{self.workflow_type}_{key}",
+                storage=self.storage
+            )
+            workflow.use_private_agents()
+            if self.planning_mode:
+                workflow.planning_mode = self.planning_mode
+
+            last_message = None
+            for response in workflow.run(
+                customer_data=customer,
+                workflow_type=self.workflow_type,
+                token_budget=self.token_budget,
+                resume=resume
+            ):
+                last_message = response.content
+
+            result = workflow.last_result
+            if result is None:
+                record["error"] = last_message or "Workflow produced no result"
+            else:
+                record.update(status=result.status, result=result.model_dump())
+        except Exception as e:
+            record["error"] = f"{type(e).__name__}: {e}"
+        return self._finish(record)
+
+    @staticmethod
+    def _finish(record: Dict[str, Any]) -> Dict[str, Any]:
+        record["finished_at"] = datetime.now(timezone.utc).isoformat()
+        return record
+
+    @staticmethod
+    def _report(finished: int, skipped: int, total: int, elapsed: float) -> None:
+        remaining = max(0, total - skipped - finished)
+        rate = finished / elapsed if elapsed > 0 else 0.0
+        eta = f"{remaining / rate / 60:.1f} min" if rate > 0 else "unknown"
+        print(f"[{skipped + finished}/{total}] {finished} onboarded this run, {skipped} skipped | "
+              f"{rate * 60:.1f} customers/min | ETA {eta}", flush=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Onboard customers from a CSV or JSONL file")
+    parser.add_argument("input", help="CSV (with header) or JSONL file of customers")
+    parser.add_argument("--output", default="tmp/onboarding_results.jsonl", help="JSONL file for results and progress")
+    parser.add_argument("--workers", type=int, default=4, help="Workflows running at once")
+    parser.add_argument("--llm-rpm", type=float, help="LLM calls per minute across all workers (default: LLM_RATE_LIMIT)")
+    parser.add_argument("--pica-rpm", type=float, help="Pica requests per minute across all workers (default: PICA_RATE_LIMIT)")
+    parser.add_argument("--token-budget", type=int, help="Token budget per customer (default: WORKFLOW_TOKEN_BUDGET)")
+    parser.add_argument("--planning-mode", choices=("markdown", "structured"), help="Task planning mode")
+    parser.add_argument("--db", default="tmp/business_automation.db", help="SQLite file for sessions and checkpoints")
+    parser.add_argument("--report-every", type=float, default=10.0, help="Seconds between progress reports")
+    args = parser.parse_args()
+
+    if args.llm_rpm is not None:
+        configure_rate_limit("llm", args.llm_rpm)
+    if args.pica_rpm is not None:
+        configure_rate_limit("pica", args.pica_rpm)
+
+    runner = BulkOnboardingRunner(
+        output_path=args.output,
+        workers=args.workers,
+        db_file=args.db,
+        token_budget=args.token_budget,
+        planning_mode=args.planning_mode,
+        report_every=args.report_every
+    )
+    summary = runner.run(args.input)
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -9,30 +9,81 @@ Features:
 - Direct Pica API integration
 - Multiple specialized agents working in sequence
 - platform connections (Gmail, Linear, Notion, Airtable, etc.)
+- Async execution (arun) for running many workflows on one event loop
 """
 
+import asyncio
+import contextvars
+import hashlib
 import json
 import os
-from typing import Dict, List, Any, Iterator, Optional
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from copy import deepcopy
+from typing import AsyncIterator, Awaitable, Callable, Dict, Generator, List, Any, Iterator, Literal, Optional, Tuple
 from textwrap import dedent
 from datetime import datetime
 
 from agno.agent import Agent
+from agno.memory.v2.memory import Memory
 from agno.models.openai import OpenAIChat
 from agno.storage.sqlite import SqliteStorage
 from agno.tools import tool
+from agno.tools.function import Function
 from agno.tools.reasoning import ReasoningTools
 from agno.workflow import Workflow, RunResponse, RunEvent
 from agno.utils.log import logger
 from agno.utils.pprint import pprint_run_response
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, ValidationError
 from dotenv import load_dotenv
 
-from pica_agent_service import PicaAgentService, test_pica_connection, execute_pica_task, get_pica_service
+from pica_agent_service import (
+    PicaAgentService, test_pica_connection, execute_pica_task, execute_pica_action,
+    aexecute_pica_task, aexecute_pica_action, find_pica_actions, get_pica_service
+)
+from pica_jobs import submit_pica_task, get_pica_job
+from usage_tracking import TokenBudgetExceeded, UsageTracker, tracking_scope, usage_from_agno_metrics
+from rate_limits import arate_limited, rate_limited
+from workflow_checkpoint import RunCheckpoint
+from workflow_graph import AsyncStepGraph, StepGraph, WorkflowStep
+from workflow_results import get_result_store
 
 load_dotenv()
 
+# Part of every workflow cache key; bump when the step prompts change
+WORKFLOW_VERSION = "1"
+
+# Platform -> (agent attribute, prompt, label, task kind) for parsed dynamic tasks
+DYNAMIC_TASK_SPECS = {
+    "gmail": (
+        "communication_manager",
+        "Execute this email task: {task}. Use execute_email_task tool to actually send this email.",
+        "📧 Gmail", "email"
+    ),
+    "linear": (
+        "task_coordinator",
+        "Execute this task management operation: {task}. Use execute_task_management tool to actually create this task.",
+        "📋 Linear", "project"
+    ),
+    "notion": (
+        "task_coordinator",
+        "Execute this data operation: {task}. Use execute_data_operation tool to actually create this documentation.",
+        "📝 Notion", "documentation"
+    ),
+    "airtable": (
+        "task_coordinator",
+        "Execute this data operation: {task}. Use execute_data_operation tool to actually create this record.",
+        "📊 Airtable", "data"
+    ),
+    "google-calendar": (
+        "task_coordinator",
+        "Execute this calendar task: {task}. Use execute_calendar_task tool to actually create this event.",
+        "📅 Google Calendar", "scheduling"
+    ),
+}
+
 
 class Customer(BaseModel):
     name: str = Field(..., description="Customer's full name")
@@ -50,6 +101,30 @@ class Task(BaseModel):
     due_date: Optional[str] = Field(None, description="Due date if specified")
 
 
+class PlannedTask(BaseModel):
+    title: str = Field(..., description="Task title")
+    description: str = Field(..., description="Detailed description with everything needed to carry the task out")
+    platform: Literal["gmail", "linear", "notion", "airtable", "google-calendar"] = Field(
+        ..., description="Platform that performs the task"
+    )
+    priority: str = Field(..., description="Task priority: low, medium, high")
+    assigned_to: Optional[str] = Field(None, description="Suggested assignee: sales, support, success")
+    due_date: Optional[str] = Field(None, description="Specific deadline")
+
+    def instruction(self) -> str:
+        """The task as an instruction for the executing agent."""
+        details = [f"priority: {self.priority}"]
+        if self.assigned_to:
+            details.append(f"assignee: {self.assigned_to}")
+        if self.due_date:
+            details.append(f"deadline: {self.due_date}")
+        return f"{self.title}: {self.description} ({', '.join(details)})"
+
+
+class TaskPlan(BaseModel):
+    tasks: List[PlannedTask] = Field(default_factory=list, description="Onboarding tasks in execution order")
+
+
 class WorkflowResult(BaseModel):
     workflow_id: str = Field(..., description="Unique workflow identifier")
     status: str = Field(..., description="Workflow status: completed, failed, in_progress")
@@ -58,6 +133,8 @@ class WorkflowResult(BaseModel):
     emails_sent: List[str] = Field(default_factory=list, description="Emails sent during workflow")
     notes_created: List[str] = Field(default_factory=list, description="Notes created in knowledge systems")
     execution_time: float = Field(..., description="Workflow execution time in seconds")
+    usage: Dict[str, Any] = Field(default_factory=dict, description="Token usage, LLM calls and estimated cost")
+    step_seconds: Dict[str, float] = Field(default_factory=dict, description="Seconds each workflow step ran")
 
 
 @tool
@@ -128,6 +205,171 @@ def execute_calendar_task(task: str) -> str:
         return f"❌ Calendar task failed: {str(e)}"
 
 
+@tool
+def find_platform_actions(platform: str, query: str) -> str:
+    """
+    Find Pica actions on a platform that match what you want to do.
+    
+    Args:
+        platform (str): Pica platform, e.g. "gmail", "linear", "notion"
+        query (str): Short description of the operation, e.g. "send email"
+        
+    Returns:
+        str: Matching actions with their ids, HTTP method, path and path variables
+    """
+    return find_pica_actions(platform, query)
+
+
+@tool
+def execute_platform_action(platform: str, action_id: str, params_json: str = "{}") -> str:
+    """
+    Execute a specific Pica action directly, without the Pica agent.
+    
+    Use this for fully specified operations once you know the action id
+    (from find_platform_actions); it runs in a single request.
+    
+    Args:
+        platform (str): Pica platform the action belongs to
+        action_id (str): Id of the action to execute
+        params_json (str): JSON object with the request body for the action,
+            including values for its path variables
+        
+    Returns:
+        str: Result of the action
+    """
+    try:
+        params = json.loads(params_json) if params_json else {}
+        return execute_pica_action(platform, action_id, params)
+    except Exception as e:
+        return f"❌ Platform action failed: {str(e)}"
+
+
+@tool
+def start_background_task(task: str, platform: str = "") -> str:
+    """
+    Start a long-running platform task in the background and return immediately.
+    
+    Use this when the result is not needed right away; check on it later
+    with check_background_task.
+    
+    Args:
+        task (str): Natural language description of the task
+        platform (str): Pica platform the task targets, e.g. "linear" (optional)
+        
+    Returns:
+        str: The job id to check on
+    """
+    try:
+        job_id = submit_pica_task(task, platform_hint=platform or None)
+        return f"⏳ Started background task {job_id}"
+    except Exception as e:
+        return f"❌ Failed to start background task: {str(e)}"
+
+
+@tool
+def check_background_task(job_id: str) -> str:
+    """
+    Check the status of a background task, and get its result once it has finished.
+    
+    Args:
+        job_id (str): Id returned by start_background_task
+        
+    Returns:
+        str: Status or result of the task
+    """
+    try:
+        return get_pica_job(job_id)
+    except Exception as e:
+        return f"❌ Failed to check background task: {str(e)}"
+
+
+# Tool name -> async twin, swapped into the agents of arun() (see BusinessAutomationWorkflow._async_agent)
+ASYNC_TOOLS: Dict[str, Function] = {}
+
+
+def _async_twin(sync_tool: Function) -> Callable[[Callable], Function]:
+    """Register a coroutine as the async twin of a tool, under the same name and description."""
+    def register(coroutine: Callable) -> Function:
+        coroutine.__doc__ = sync_tool.entrypoint.__doc__
+        ASYNC_TOOLS[sync_tool.name] = tool(name=sync_tool.name)(coroutine)
+        return ASYNC_TOOLS[sync_tool.name]
+    return register
+
+
+@_async_twin(execute_email_task)
+async def aexecute_email_task(task: str) -> str:
+    try:
+        return await aexecute_pica_task(task, platform_hint="gmail")
+    except Exception as e:
+        return f"❌ Email task failed: {str(e)}"
+
+
+@_async_twin(execute_task_management)
+async def aexecute_task_management(task: str) -> str:
+    try:
+        return await aexecute_pica_task(task, platform_hint="linear")
+    except Exception as e:
+        return f"❌ Task management failed: {str(e)}"
+
+
+@_async_twin(execute_data_operation)
+async def aexecute_data_operation(task: str) -> str:
+    try:
+        return await aexecute_pica_task(task, platform_hint="airtable")
+    except Exception as e:
+        return f"❌ Data operation failed: {str(e)}"
+
+
+@_async_twin(execute_calendar_task)
+async def aexecute_calendar_task(task: str) -> str:
+    try:
+        return await aexecute_pica_task(task, platform_hint="google-calendar")
+    except Exception as e:
+        return f"❌ Calendar task failed: {str(e)}"
+
+
+@_async_twin(execute_platform_action)
+async def aexecute_platform_action(platform: str, action_id: str, params_json: str = "{}") -> str:
+    try:
+        params = json.loads(params_json) if params_json else {}
+        return await aexecute_pica_action(platform, action_id, params)
+    except Exception as e:
+        return f"❌ Platform action failed: {str(e)}"
+
+
+def _content_hash(payload: Any) -> str:
+    """SHA-256 of the canonical JSON form of a payload."""
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def _canonical_customer(customer_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Customer data with surrounding whitespace stripped and the email lowercased."""
+    canonical = {}
+    for key, value in customer_data.items():
+        if isinstance(value, str):
+            value = value.strip()
+            if key == "email":
+                value = value.lower()
+        canonical[key] = value
+    return canonical
+
+
+def _agent_fingerprint(agent: Agent) -> Dict[str, Any]:
+    """The parts of an agent's configuration that shape its output."""
+    return {
+        "name": agent.name,
+        "model": agent.model.id if agent.model else None,
+        "description": agent.description,
+        "instructions": agent.instructions,
+        "tools": sorted(
+            getattr(t, "name", None) or getattr(t, "__name__", type(t).__name__)
+            for t in agent.tools or []
+        ),
+        "response_model": agent.response_model.__name__ if agent.response_model else None,
+    }
+
+
 class BusinessAutomationWorkflow(Workflow):
     """
     Business automation workflow.
@@ -182,7 +424,7 @@ class BusinessAutomationWorkflow(Workflow):
     communication_manager: Agent = Agent(
         name="CommunicationAgent", 
         model=OpenAIChat(id="gpt-4o-mini"),
-        tools=[execute_email_task],  
+        tools=[execute_email_task, find_platform_actions, execute_platform_action],  
         description=dedent("""\
         Professional communication specialist with REAL platform execution capabilities.
         You can actually send emails, create communications, and coordinate across platforms
@@ -208,6 +450,8 @@ class BusinessAutomationWorkflow(Workflow):
            
         IMPORTANT: When asked to send emails or create communications, 
         use the execute_email_task tool to actually perform the operation!
+        For fully specified sends (exact recipient, subject and body), you can instead
+        look up the action with find_platform_actions and run it with execute_platform_action.
         """),
         show_tool_calls=True,
         markdown=True
@@ -216,7 +460,11 @@ class BusinessAutomationWorkflow(Workflow):
     task_coordinator: Agent = Agent(
         name="TaskManagementAgent",
         model=OpenAIChat(id="gpt-4o-mini"),
-        tools=[execute_task_management, execute_data_operation, execute_calendar_task],  
+        tools=[
+            execute_task_management, execute_data_operation, execute_calendar_task,
+            find_platform_actions, execute_platform_action,
+            start_background_task, check_background_task
+        ],  
         description=dedent("""\
         Expert task management specialist with REAL platform execution capabilities.
         You can actually create tasks, manage projects, and schedule meetings through
@@ -243,16 +491,66 @@ class BusinessAutomationWorkflow(Workflow):
         
         IMPORTANT: When asked to create tasks, schedule meetings, or manage projects,
         use the appropriate execution tools to actually perform the operations!
+        When every field of an operation is known, find_platform_actions plus
+        execute_platform_action performs it in a single request.
+        Independent, long-running operations can be started with start_background_task
+        so they run while you continue; collect them with check_background_task.
         """),
         show_tool_calls=True,
         markdown=True
     )
+    
+    task_planner: Agent = Agent(
+        name="TaskPlanningAgent",
+        model=OpenAIChat(id="gpt-4o-mini"),
+        description=dedent("""\
+        Onboarding task planner. You turn a customer analysis into a concrete,
+        typed task plan; other agents carry the tasks out.
+        """),
+        instructions=dedent("""\
+        You are TaskPlanner-X. Plan tasks, never perform them.
+        
+        For every task:
+        - Pick the single platform that performs it
+        - Write a description that is complete on its own: recipients, names,
+          dates and content, with no placeholders
+        - Set a priority, a suggested assignee and a specific deadline
+        """),
+        response_model=TaskPlan
+    )
+
+    # How long cached workflow and step results stay valid (seconds)
+    cache_ttl: int = int(os.getenv("WORKFLOW_CACHE_TTL", "86400"))
+    # "markdown": task_coordinator writes the tasks as markdown, which is parsed for execution
+    # "structured": tool-less task_planner returns a TaskPlan that is executed as-is
+    planning_mode: str = os.getenv("WORKFLOW_PLANNING_MODE", "markdown")
+    # Result of the latest run (or the cached result it returned), for batch callers
+    last_result: Optional[WorkflowResult] = None
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        # Guards session_state while steps write to it from several threads. Each
+        # workflow has its own, so concurrent workflows never wait on each other.
+        self._state_lock = threading.RLock()
+        # Orders session writes, so an older snapshot never overwrites a newer one
+        self._save_lock = threading.Lock()
+        self._state_version = 0
+        self._saved_version = 0
+
+    def update_run_method(self):
+        super().update_run_method()
+        # agno only routes one of run() and arun() through its run wrapper when a
+        # subclass defines both; run() needs it too for session storage and memory
+        if self.__class__.run is not Workflow.run:
+            object.__setattr__(self, "run", self.run_workflow.__get__(self))
 
     def run(
         self, 
         customer_data: Dict[str, Any],
         workflow_type: str = "customer_onboarding",
-        use_cache: bool = True
+        use_cache: bool = True,
+        token_budget: Optional[int] = None,
+        resume: bool = False
     ) -> Iterator[RunResponse]:
         """
         Main workflow execution method.
@@ -260,199 +558,909 @@ class BusinessAutomationWorkflow(Workflow):
         Args:
             customer_data: Customer information and context
             workflow_type: Type of workflow to execute
-            use_cache: Whether to use cached results for efficiency
+            use_cache: Whether to reuse cached results: a completed run for the same
+                customer data, or the outputs of individual LLM steps
+            token_budget: Maximum LLM tokens the run may use, across the workflow
+                agents and the Pica agent (default: WORKFLOW_TOKEN_BUDGET, or unlimited)
+            resume: Continue the last unfinished run for the same customer data in this
+                session: completed steps are restored from its checkpoint and platform
+                tasks it already executed are skipped
         """
-        start_time = datetime.now()
-        workflow_id = f"{workflow_type}_{customer_data.get('email', 'unknown')}_{int(start_time.timestamp())}"
-        
-        logger.info(f"🚀 Starting {workflow_type} workflow for {customer_data.get('name', 'unknown')}")
-        
-        if use_cache:
-            cached_result = self.get_cached_workflow_result(workflow_id)
-            if cached_result:
-                yield RunResponse(
-                    content=f"✅ Retrieved cached workflow result for {customer_data.get('name')}"
-                )
-                return
+        start_time, workflow_id, cache_key = self._start_run(customer_data, workflow_type)
+        cached_response = self._cached_run_response(cache_key, customer_data) if use_cache else None
+        if cached_response:
+            yield cached_response
+            return
 
         pica_status = test_pica_connection()
+        yield self._connection_response(pica_status)
         if not pica_status["success"]:
-            yield RunResponse(
-                content=f"❌ Pica connection failed: {pica_status['error']}"
-            )
             return
+
+        checkpoint = self.open_checkpoint(cache_key, workflow_id, resume)
+        if checkpoint.resumed:
+            workflow_id = checkpoint.workflow_id
+            yield RunResponse(content=f"⏩ Resuming workflow {workflow_id} from its last checkpoint")
+
+        tracker = self._new_tracker(token_budget)
+        platform_results: List[str] = []
+        platform_failures: List[str] = []
+        status = "completed"
+        step_results: Dict[str, Any] = {}
+        step_seconds: Dict[str, float] = {}
         
-        yield RunResponse(
-            content=f"🔗 Connected to {pica_status['platform_count']} platforms: {', '.join(pica_status['connected_platforms'])}"
+        try:
+            step_results = yield from self._run_steps(
+                customer_data, pica_status, tracker, platform_results, platform_failures,
+                use_cache, checkpoint, step_seconds
+            )
+        except TokenBudgetExceeded as e:
+            status = "budget_exceeded"
+            yield RunResponse(content=f"🛑 **Stopping early:** {e}")
+        else:
+            if platform_failures:
+                status = "incomplete"
+
+        yield self._finish_run(
+            customer_data, workflow_id, cache_key, start_time, status,
+            step_results, step_seconds, tracker, platform_results, platform_failures
         )
 
-        yield RunResponse(content="🧠 **Step 1: Analyzing customer data and planning workflow...**")
+    async def arun(
+        self,
+        customer_data: Dict[str, Any],
+        workflow_type: str = "customer_onboarding",
+        use_cache: bool = True,
+        token_budget: Optional[int] = None,
+        resume: bool = False
+    ) -> AsyncIterator[RunResponse]:
+        """
+        Async counterpart of run(), for running many workflows on one event loop.
         
-        analysis_prompt = f"""
-        Analyze this customer and create a comprehensive onboarding strategy:
+        Yields the same RunResponses as run(). The agents run through their async
+        API with async twins of the Pica tools, independent steps and platform
+        tasks interleave as asyncio tasks, and blocking calls (the connection
+        probe, checkpoint writes, the result store) run in worker threads. Every agent call uses a
+        private copy of the agent, so concurrent runs need no use_private_agents().
         
-        Customer Data: {json.dumps(customer_data, indent=2)}
-        Available Platforms: {', '.join(pica_status['connected_platforms'])}
+        Args:
+            customer_data: Customer information and context
+            workflow_type: Type of workflow to execute
+            use_cache: Whether to reuse cached results, as in run()
+            token_budget: Maximum LLM tokens the run may use, as in run()
+            resume: Continue the last unfinished run for the same customer data, as in run()
+        """
+        start_time, workflow_id, cache_key = self._start_run(customer_data, workflow_type)
+        # Result store reads and writes can wait on a batch flush, so keep them off the event loop
+        cached_response = (
+            await asyncio.to_thread(self._cached_run_response, cache_key, customer_data) if use_cache else None
+        )
+        if cached_response:
+            yield cached_response
+            return
+
+        pica_status = await asyncio.to_thread(test_pica_connection)
+        yield self._connection_response(pica_status)
+        if not pica_status["success"]:
+            return
+
+        checkpoint = self.open_checkpoint(cache_key, workflow_id, resume)
+        if checkpoint.resumed:
+            workflow_id = checkpoint.workflow_id
+            yield RunResponse(content=f"⏩ Resuming workflow {workflow_id} from its last checkpoint")
+
+        tracker = self._new_tracker(token_budget)
+        platform_results: List[str] = []
+        platform_failures: List[str] = []
+        status = "completed"
+        step_results: Dict[str, Any] = {}
+        step_seconds: Dict[str, float] = {}
+
+        try:
+            async for response in self._arun_steps(
+                customer_data, pica_status, tracker, platform_results, platform_failures,
+                step_results, use_cache, checkpoint, step_seconds
+            ):
+                yield response
+        except TokenBudgetExceeded as e:
+            status = "budget_exceeded"
+            yield RunResponse(content=f"🛑 **Stopping early:** {e}")
+        else:
+            if platform_failures:
+                status = "incomplete"
+
+        yield await asyncio.to_thread(
+            self._finish_run, customer_data, workflow_id, cache_key, start_time, status,
+            step_results, step_seconds, tracker, platform_results, platform_failures
+        )
+
+    def _start_run(self, customer_data: Dict[str, Any], workflow_type: str) -> Tuple[datetime, str, str]:
+        """
+        Common start of run() and arun().
         
-        Please provide:
-        1. Customer priority assessment (high/medium/low)
-        2. Recommended onboarding approach
-        3. Key tasks that should be created
-        4. Communication strategy
-        5. Success metrics to track
+        Returns:
+            Start time, workflow id and cache key of the run
         """
+        if self.planning_mode not in ("markdown", "structured"):
+            raise ValueError(f"Unknown planning mode: {self.planning_mode}")
         
-        analysis_response = self.business_analyst.run(analysis_prompt)
-        customer_analysis = analysis_response.content
+        self.last_result = None
+        start_time = datetime.now()
+        workflow_id = f"{workflow_type}_{customer_data.get('email', 'unknown')}_{int(start_time.timestamp())}"
         
-        yield RunResponse(content=f"✅ **Customer Analysis Complete:**\n{customer_analysis}")
-
-        yield RunResponse(content="📋 **Step 2: Creating and assigning tasks...**")
+        logger.info(f"🚀 Starting {workflow_type} workflow for {customer_data.get('name', 'unknown')}")
         
-        task_creation_prompt = f"""
-        Based on this customer analysis, create specific tasks for the onboarding workflow:
+        cache_key = self.workflow_cache_key(customer_data, workflow_type)
+        self.prune_cache()
+        return start_time, workflow_id, cache_key
+
+    def _cached_run_response(self, cache_key: str, customer_data: Dict[str, Any]) -> Optional[RunResponse]:
+        """Return a cached result of the run as its only response, if there is one."""
+        cached_result = self.get_cached_workflow_result(cache_key)
+        if not cached_result:
+            return None
+        self.last_result = cached_result
+        return RunResponse(
+            content=f"✅ Retrieved cached workflow result for {customer_data.get('name')} "
+                    f"(workflow {cached_result.workflow_id})"
+        )
+
+    @staticmethod
+    def _connection_response(pica_status: Dict[str, Any]) -> RunResponse:
+        if not pica_status["success"]:
+            return RunResponse(content=f"❌ Pica connection failed: {pica_status['error']}")
+        return RunResponse(
+            content=f"🔗 Connected to {pica_status['platform_count']} platforms: {', '.join(pica_status['connected_platforms'])}"
+        )
+
+    @staticmethod
+    def _new_tracker(token_budget: Optional[int]) -> UsageTracker:
+        if token_budget is None:
+            token_budget = int(os.getenv("WORKFLOW_TOKEN_BUDGET", "0")) or None
+        return UsageTracker(max_tokens=token_budget)
+
+    def _finish_run(
+        self,
+        customer_data: Dict[str, Any],
+        workflow_id: str,
+        cache_key: str,
+        start_time: datetime,
+        status: str,
+        step_results: Dict[str, Any],
+        step_seconds: Dict[str, float],
+        tracker: UsageTracker,
+        platform_results: List[str],
+        platform_failures: List[str]
+    ) -> RunResponse:
+        """Store the result of a run, cache it if it completed, and build the summary response."""
+        execution_time = (datetime.now() - start_time).total_seconds()
         
-        {customer_analysis}
+        tasks_created = [
+            Task(title="Welcome Call", description="Schedule and conduct welcome call", priority="high"),
+            Task(title="Account Setup", description="Configure customer account and permissions", priority="high"),
+            Task(title="Training Session", description="Provide product training", priority="medium"),
+        ]
+        if isinstance(step_results.get("tasks"), dict):
+            tasks_created = [
+                Task(title=t.title, description=t.description, priority=t.priority,
+                     assigned_to=t.assigned_to, due_date=t.due_date)
+                for t in TaskPlan(**step_results["tasks"]).tasks
+            ]
         
-        IMPORTANT: Create tasks that explicitly specify these platforms:
-        - Email tasks: "using Gmail"
-        - Project management tasks: "using Linear" 
-        - Documentation tasks: "using Notion"
-        - Calendar/scheduling tasks: "using Google Calendar"
-        - Data entry tasks: "using Airtable"
+        workflow_result = WorkflowResult(
+            workflow_id=workflow_id,
+            status=status,
+            customer_data=Customer(**customer_data),
+            tasks_created=tasks_created,
+            emails_sent=["Welcome email", "Getting started guide"],
+            notes_created=["Customer profile in Notion", "Onboarding checklist"],
+            execution_time=execution_time,
+            usage=tracker.to_dict(),
+            step_seconds={name: round(seconds, 3) for name, seconds in step_seconds.items()}
+        )
         
-        Create 5 specific, actionable tasks:
-        1. ONE email task (must specify "using Gmail")
-        2. TWO Linear project tasks (must specify "using Linear")
-        3. ONE Notion documentation task (must specify "using Notion") 
-        4. ONE Airtable data task (must specify "using Airtable")
+        self.last_result = workflow_result
+        get_result_store().put(workflow_result.model_dump(), cache_key)
+        if status == "completed":
+            self.cache_workflow_result(cache_key, workflow_result)
+            self.clear_checkpoint(cache_key)
         
-        Each task should have:
-        - Clear title and detailed description with platform specified
-        - Priority level (high/medium/low)
-        - Suggested assignee (sales, support, success)
-        - Specific deadline
+        if status == "completed":
+            headline = "🎉 **Workflow Complete!**"
+            status_line = "✅ Completed Successfully\n\n" \
+                          "All customer onboarding tasks have been automated across your connected platforms!"
+        elif status == "incomplete":
+            headline = "⚠️ **Workflow Finished With Errors**"
+            status_line = f"{len(platform_failures)} platform task(s) failed; " \
+                          "run again with resume=True to retry only those"
+        else:
+            headline = "🛑 **Workflow Stopped**"
+            status_line = f"Stopped after reaching the token budget of {tracker.max_tokens} tokens"
         
-        Format each task as:
-        **Task X: [Title]**
-        - Description: [Detailed description] using [Platform]
-        - Priority: [Level]
-        - Assignee: [Person]
-        - Deadline: [Date]
-        """
+        return RunResponse(
+            content=f"{headline}\n\n"
+                   f"**Summary:**\n"
+                   f"• Customer: {customer_data.get('name')} from {customer_data.get('company')}\n"
+                   f"• Workflow ID: {workflow_id}\n"
+                   f"• Platform Integrations: {len(platform_results)}\n"
+                   f"• Execution Time: {execution_time:.2f} seconds\n"
+                   f"• LLM Usage: {tracker.total.total_tokens} tokens in {tracker.total.llm_calls} calls "
+                   f"(~${tracker.total.cost_usd:.4f})\n"
+                   f"• Status: {status_line}"
+        )
+
+    def _analysis_prompt(self, customer_data: Dict[str, Any], pica_status: Dict[str, Any]) -> str:
+        return f"""
+            Analyze this customer and create a comprehensive onboarding strategy:
         
-        task_response = self.task_coordinator.run(task_creation_prompt)
-        tasks_created = task_response.content
+            Customer Data: {json.dumps(customer_data, indent=2)}
+            Available Platforms: {', '.join(pica_status['connected_platforms'])}
         
-        yield RunResponse(content=f"✅ **Tasks Created:**\n{tasks_created}")
+            Please provide:
+            1. Customer priority assessment (high/medium/low)
+            2. Recommended onboarding approach
+            3. Key tasks that should be created
+            4. Communication strategy
+            5. Success metrics to track
+            """
 
-        yield RunResponse(content="✉️ **Step 3: Preparing customer communications...**")
+    def _task_creation_prompt(self, customer_analysis: str) -> str:
+        return f"""
+            Based on this customer analysis, create specific tasks for the onboarding workflow:
         
-        communication_prompt = f"""
-        Create a personalized welcome email and communication plan for this customer:
+            {customer_analysis}
         
-        Customer: {customer_data.get('name')} from {customer_data.get('company')} having email {customer_data.get('email')}
-        Analysis: {customer_analysis}
+            IMPORTANT: Create tasks that explicitly specify these platforms:
+            - Email tasks: "using Gmail"
+            - Project management tasks: "using Linear" 
+            - Documentation tasks: "using Notion"
+            - Calendar/scheduling tasks: "using Google Calendar"
+            - Data entry tasks: "using Airtable"
         
-        Available communication platforms: {[p for p in pica_status['connected_platforms'] if p in ['gmail', 'resend', 'outlook-mail']]}
+            Create 5 specific, actionable tasks:
+            1. ONE email task (must specify "using Gmail")
+            2. TWO Linear project tasks (must specify "using Linear")
+            3. ONE Notion documentation task (must specify "using Notion") 
+            4. ONE Airtable data task (must specify "using Airtable")
         
-        Create:
-        1. Personalized welcome email (subject + body)
-        2. Follow-up communication sequence (3 touchpoints)
-        3. Internal team notifications
+            Each task should have:
+            - Clear title and detailed description with platform specified
+            - Priority level (high/medium/low)
+            - Suggested assignee (sales, support, success)
+            - Specific deadline
         
-        Make it professional, warm, and value-focused.
-        """
+            Format each task as:
+            **Task X: [Title]**
+            - Description: [Detailed description] using [Platform]
+            - Priority: [Level]
+            - Assignee: [Person]
+            - Deadline: [Date]
+            """
+
+    def _task_planning_prompt(self, customer_analysis: str) -> str:
+        return f"""
+            Based on this customer analysis, plan the tasks of the onboarding workflow:
+            
+            {customer_analysis}
+            
+            Plan 5 specific, actionable tasks:
+            1. ONE email task (platform "gmail")
+            2. TWO project tasks (platform "linear")
+            3. ONE documentation task (platform "notion")
+            4. ONE data entry task (platform "airtable")
+            
+            Scheduling tasks use platform "google-calendar". Suggested assignees are
+            sales, support or success.
+            """
+
+    def _communication_prompt(
+        self,
+        customer_data: Dict[str, Any],
+        customer_analysis: str,
+        pica_status: Dict[str, Any]
+    ) -> str:
+        return f"""
+            Create a personalized welcome email and communication plan for this customer:
         
-        communication_response = self.communication_manager.run(communication_prompt)
-        communication_plan = communication_response.content
+            Customer: {customer_data.get('name')} from {customer_data.get('company')} having email {customer_data.get('email')}
+            Analysis: {customer_analysis}
         
-        yield RunResponse(content=f"✅ **Communication Plan Ready:**\n{communication_plan}")
-
-        yield RunResponse(content="🔗 **Step 4: Executing dynamic tasks via Pica...**")
+            Available communication platforms: {[p for p in pica_status['connected_platforms'] if p in ['gmail', 'resend', 'outlook-mail']]}
         
-        yield RunResponse(content="🔍 **Parsing dynamic tasks from AI analysis...**")
-        platform_tasks = self.parse_dynamic_tasks(tasks_created)
+            Create:
+            1. Personalized welcome email (subject + body)
+            2. Follow-up communication sequence (3 touchpoints)
+            3. Internal team notifications
         
+            Make it professional, warm, and value-focused.
+            """
+
+    def _task_plan_response(self, task_plan: Dict[str, Any], cached: bool) -> RunResponse:
+        return RunResponse(
+            content=f"✅ **Task Plan Created{' (cached)' if cached else ''}:**\n"
+                    f"{self.format_task_plan(TaskPlan(**task_plan))}"
+        )
+
+    @staticmethod
+    def _restored_step_response(label: str, saved: Any) -> RunResponse:
+        shown = json.dumps(saved, indent=2) if isinstance(saved, dict) else saved
+        return RunResponse(content=f"⏩ **{label} restored from checkpoint:**\n{shown}")
+
+    def _route_platform_tasks(self, tasks_created: Any) -> Tuple[Dict[str, List[str]], List[RunResponse]]:
+        """
+        Platform tasks of the task step's output: a TaskPlan dict, or markdown to parse.
+        
+        Returns:
+            Tasks by platform, and the RunResponses reporting them
+        """
+        responses = []
+        if isinstance(tasks_created, dict):
+            platform_tasks = self.plan_to_platform_tasks(TaskPlan(**tasks_created))
+        else:
+            responses.append(RunResponse(content="🔍 **Parsing dynamic tasks from AI analysis...**"))
+            platform_tasks = self.parse_dynamic_tasks(tasks_created)
+    
         task_summary = []
         for platform, tasks in platform_tasks.items():
             if tasks:
                 task_summary.append(f"• {platform.title()}: {len(tasks)} tasks")
-        
+    
         if task_summary:
-            yield RunResponse(content=f"📋 **Dynamic tasks parsed:**\n" + "\n".join(task_summary))
+            responses.append(RunResponse(content=f"📋 **Dynamic tasks parsed:**\n" + "\n".join(task_summary)))
         else:
-            yield RunResponse(content="⚠️ No dynamic tasks found, falling back to default execution...")
+            responses.append(RunResponse(content="⚠️ No dynamic tasks found, falling back to default execution..."))
+        return platform_tasks, responses
+
+    @staticmethod
+    def _fallback_tasks(customer_data: Dict[str, Any]) -> List[Tuple[str, str]]:
+        """(platform, task) pairs executed when no dynamic tasks could be parsed."""
+        return [
+            ("gmail", f"Send welcome email to {customer_data.get('email')} for {customer_data.get('name')} from {customer_data.get('company')} using Gmail"),
+            ("linear", f"Create onboarding project task for {customer_data.get('name')} from {customer_data.get('company')} using Linear"),
+        ]
+
+    @staticmethod
+    def _collect_platform_result(response: RunResponse, platform_results: List[str], platform_failures: List[str]):
+        if response.content.startswith("✅"):
+            platform_results.append(response.content.split(":")[1].strip())
+        elif response.content.startswith("⚠️"):
+            platform_failures.append(response.content)
+
+    def _run_steps(
+        self,
+        customer_data: Dict[str, Any],
+        pica_status: Dict[str, Any],
+        tracker: UsageTracker,
+        platform_results: List[str],
+        platform_failures: List[str],
+        use_cache: bool = True,
+        checkpoint: Optional[RunCheckpoint] = None,
+        step_seconds: Optional[Dict[str, float]] = None
+    ) -> Generator[RunResponse, None, Dict[str, Any]]:
+        """
+        Run the analysis, task, communication and platform execution steps.
         
-        platform_results = []
-        if any(platform_tasks.values()): 
-            yield RunResponse(content="⚡ **Executing dynamic tasks through Pica...**")
-            for response in self.execute_dynamic_tasks(platform_tasks, customer_data):
-                yield response
-                if "executed" in response.content:
-                    platform_results.append(response.content.split(":")[1].strip())
-        else:
-            yield RunResponse(content="🔄 **Using fallback execution...**")
-            try:
-                fallback_email = f"Send welcome email to {customer_data.get('email')} for {customer_data.get('name')} from {customer_data.get('company')} using Gmail"
-                gmail_result = self.communication_manager.run(
-                    f"Execute this email task: {fallback_email}. Use execute_email_task tool to actually send this email."
+        Task creation and the communication plan only need the analysis, so they
+        run concurrently; platform execution waits for both, as it reuses their agents.
+        With a checkpoint, each step's output is saved as soon as it completes and
+        steps already in the checkpoint are restored instead of re-run.
+        
+        Args:
+            customer_data: Customer information and context
+            pica_status: Result of the Pica connection check
+            tracker: Usage tracker of the run
+            platform_results: Collects a line per executed platform integration
+            platform_failures: Collects a line per failed platform integration
+            use_cache: Whether the LLM steps may reuse cached outputs
+            checkpoint: Checkpoint of the run, if any
+            step_seconds: Receives the seconds each completed step ran
+            
+        Returns:
+            Outputs of the steps by name
+        """
+        def analyze_customer(results: Dict[str, Any]) -> Iterator[RunResponse]:
+            yield RunResponse(content="🧠 **Step 1: Analyzing customer data and planning workflow...**")
+        
+            customer_analysis, cached = self._run_step_agent(
+                self.business_analyst, self._analysis_prompt(customer_data, pica_status), tracker, use_cache
+            )
+        
+            yield RunResponse(content=f"✅ **Customer Analysis Complete{' (cached)' if cached else ''}:**\n{customer_analysis}")
+            return customer_analysis
+        
+        def create_tasks(results: Dict[str, Any]) -> Iterator[RunResponse]:
+            customer_analysis = results["analysis"]
+            
+            yield RunResponse(content="📋 **Step 2: Creating and assigning tasks...**")
+            
+            if self.planning_mode == "structured":
+                task_plan, cached = self._run_step_agent(
+                    self.task_planner, self._task_planning_prompt(customer_analysis), tracker, use_cache
                 )
-                platform_results.append("📧 Gmail: Fallback email task executed")
-                yield RunResponse(content=f"✅ {platform_results[-1]}")
-                
-                fallback_linear = f"Create onboarding project task for {customer_data.get('name')} from {customer_data.get('company')} using Linear"
-                linear_result = self.task_coordinator.run(
-                    f"Execute this task management operation: {fallback_linear}. Use execute_task_management tool to actually create this task."
+                if task_plan is not None:
+                    yield self._task_plan_response(task_plan, cached)
+                    return task_plan
+                yield RunResponse(content="⚠️ Task plan could not be parsed; falling back to markdown tasks...")
+        
+            tasks_created, cached = self._run_step_agent(
+                self.task_coordinator, self._task_creation_prompt(customer_analysis), tracker, use_cache
+            )
+        
+            yield RunResponse(content=f"✅ **Tasks Created{' (cached)' if cached else ''}:**\n{tasks_created}")
+            return tasks_created
+        
+        def plan_communication(results: Dict[str, Any]) -> Iterator[RunResponse]:
+            customer_analysis = results["analysis"]
+            
+            yield RunResponse(content="✉️ **Step 3: Preparing customer communications...**")
+        
+            communication_plan, cached = self._run_step_agent(
+                self.communication_manager,
+                self._communication_prompt(customer_data, customer_analysis, pica_status),
+                tracker, use_cache
+            )
+        
+            yield RunResponse(content=f"✅ **Communication Plan Ready{' (cached)' if cached else ''}:**\n{communication_plan}")
+            return communication_plan
+        
+        def execute_platform_tasks(results: Dict[str, Any]) -> Iterator[RunResponse]:
+            yield RunResponse(content="🔗 **Step 4: Executing dynamic tasks via Pica...**")
+        
+            platform_tasks, responses = self._route_platform_tasks(results["tasks"])
+            yield from responses
+        
+            if any(platform_tasks.values()): 
+                yield RunResponse(content="⚡ **Executing dynamic tasks through Pica...**")
+                for response in self.execute_dynamic_tasks(platform_tasks, customer_data, tracker, checkpoint=checkpoint):
+                    yield response
+                    self._collect_platform_result(response, platform_results, platform_failures)
+            else:
+                yield RunResponse(content="🔄 **Using fallback execution...**")
+                try:
+                    for platform, task in self._fallback_tasks(customer_data):
+                        if not self._already_executed(checkpoint, platform, task):
+                            self._execute_dynamic_task(platform, task, customer_data, tracker)
+                            self._mark_executed(checkpoint, platform, task)
+                        label, kind = DYNAMIC_TASK_SPECS[platform][2:4]
+                        platform_results.append(f"{label}: Fallback {kind} task executed")
+                        yield RunResponse(content=f"✅ {platform_results[-1]}")
+        
+                except TokenBudgetExceeded:
+                    raise
+                except Exception as e:
+                    platform_failures.append(str(e))
+                    yield RunResponse(content=f"⚠️ Fallback execution error: {str(e)}")
+                    yield RunResponse(content="📝 Continuing with workflow completion...")
+        
+        def checkpointed(name: str, label: str, step: Callable[[Dict[str, Any]], Iterator[RunResponse]]):
+            def run_step(results: Dict[str, Any]) -> Iterator[RunResponse]:
+                saved = checkpoint.step_output(name) if checkpoint else None
+                if saved is not None:
+                    yield self._restored_step_response(label, saved)
+                    return saved
+                output = yield from step(results)
+                if checkpoint:
+                    checkpoint.complete_step(name, output)
+                return output
+            return run_step
+        
+        graph = StepGraph([
+            WorkflowStep("analysis", checkpointed("analysis", "Customer Analysis", analyze_customer)),
+            WorkflowStep("tasks", checkpointed("tasks", "Tasks", create_tasks), depends_on=("analysis",)),
+            WorkflowStep(
+                "communication",
+                checkpointed("communication", "Communication Plan", plan_communication),
+                depends_on=("analysis",)
+            ),
+            WorkflowStep("execution", execute_platform_tasks, depends_on=("tasks", "communication")),
+        ])
+        return (yield from graph.run(step_seconds))
+
+    async def _arun_steps(
+        self,
+        customer_data: Dict[str, Any],
+        pica_status: Dict[str, Any],
+        tracker: UsageTracker,
+        platform_results: List[str],
+        platform_failures: List[str],
+        step_results: Dict[str, Any],
+        use_cache: bool = True,
+        checkpoint: Optional[RunCheckpoint] = None,
+        step_seconds: Optional[Dict[str, float]] = None
+    ) -> AsyncIterator[RunResponse]:
+        """
+        Async counterpart of _run_steps, with the same steps, dependencies and checkpoints.
+        
+        Args:
+            step_results: Receives the outputs of the steps by name
+            (others as in _run_steps)
+        """
+        Emit = Callable[[RunResponse], None]
+
+        async def analyze_customer(results: Dict[str, Any], emit: Emit) -> str:
+            emit(RunResponse(content="🧠 **Step 1: Analyzing customer data and planning workflow...**"))
+
+            customer_analysis, cached = await self._arun_step_agent(
+                self.business_analyst, self._analysis_prompt(customer_data, pica_status), tracker, use_cache
+            )
+
+            emit(RunResponse(content=f"✅ **Customer Analysis Complete{' (cached)' if cached else ''}:**\n{customer_analysis}"))
+            return customer_analysis
+
+        async def create_tasks(results: Dict[str, Any], emit: Emit) -> Any:
+            customer_analysis = results["analysis"]
+
+            emit(RunResponse(content="📋 **Step 2: Creating and assigning tasks...**"))
+
+            if self.planning_mode == "structured":
+                task_plan, cached = await self._arun_step_agent(
+                    self.task_planner, self._task_planning_prompt(customer_analysis), tracker, use_cache
                 )
-                platform_results.append("📋 Linear: Fallback project task executed")
-                yield RunResponse(content=f"✅ {platform_results[-1]}")
-                
-            except Exception as e:
-                yield RunResponse(content=f"⚠️ Fallback execution error: {str(e)}")
-                yield RunResponse(content="📝 Continuing with workflow completion...")
+                if task_plan is not None:
+                    emit(self._task_plan_response(task_plan, cached))
+                    return task_plan
+                emit(RunResponse(content="⚠️ Task plan could not be parsed; falling back to markdown tasks..."))
 
-        execution_time = (datetime.now() - start_time).total_seconds()
+            tasks_created, cached = await self._arun_step_agent(
+                self.task_coordinator, self._task_creation_prompt(customer_analysis), tracker, use_cache
+            )
+
+            emit(RunResponse(content=f"✅ **Tasks Created{' (cached)' if cached else ''}:**\n{tasks_created}"))
+            return tasks_created
+
+        async def plan_communication(results: Dict[str, Any], emit: Emit) -> str:
+            customer_analysis = results["analysis"]
+
+            emit(RunResponse(content="✉️ **Step 3: Preparing customer communications...**"))
+
+            communication_plan, cached = await self._arun_step_agent(
+                self.communication_manager,
+                self._communication_prompt(customer_data, customer_analysis, pica_status),
+                tracker, use_cache
+            )
+
+            emit(RunResponse(content=f"✅ **Communication Plan Ready{' (cached)' if cached else ''}:**\n{communication_plan}"))
+            return communication_plan
+
+        async def execute_platform_tasks(results: Dict[str, Any], emit: Emit) -> None:
+            emit(RunResponse(content="🔗 **Step 4: Executing dynamic tasks via Pica...**"))
+
+            platform_tasks, responses = self._route_platform_tasks(results["tasks"])
+            for response in responses:
+                emit(response)
+
+            if any(platform_tasks.values()):
+                emit(RunResponse(content="⚡ **Executing dynamic tasks through Pica...**"))
+                async for response in self.aexecute_dynamic_tasks(
+                    platform_tasks, customer_data, tracker, checkpoint=checkpoint
+                ):
+                    emit(response)
+                    self._collect_platform_result(response, platform_results, platform_failures)
+            else:
+                emit(RunResponse(content="🔄 **Using fallback execution...**"))
+                try:
+                    for platform, task in self._fallback_tasks(customer_data):
+                        if not self._already_executed(checkpoint, platform, task):
+                            await self._aexecute_dynamic_task(platform, task, customer_data, tracker)
+                            await asyncio.to_thread(self._mark_executed, checkpoint, platform, task)
+                        label, kind = DYNAMIC_TASK_SPECS[platform][2:4]
+                        platform_results.append(f"{label}: Fallback {kind} task executed")
+                        emit(RunResponse(content=f"✅ {platform_results[-1]}"))
+
+                except TokenBudgetExceeded:
+                    raise
+                except Exception as e:
+                    platform_failures.append(str(e))
+                    emit(RunResponse(content=f"⚠️ Fallback execution error: {str(e)}"))
+                    emit(RunResponse(content="📝 Continuing with workflow completion..."))
+
+        def checkpointed(name: str, label: str, step: Callable[[Dict[str, Any], Emit], Awaitable[Any]]):
+            async def run_step(results: Dict[str, Any], emit: Emit) -> Any:
+                saved = checkpoint.step_output(name) if checkpoint else None
+                if saved is not None:
+                    emit(self._restored_step_response(label, saved))
+                    return saved
+                output = await step(results, emit)
+                if checkpoint:
+                    # Writes the session to storage, so keep it off the event loop
+                    await asyncio.to_thread(checkpoint.complete_step, name, output)
+                return output
+            return run_step
+
+        graph = AsyncStepGraph([
+            WorkflowStep("analysis", checkpointed("analysis", "Customer Analysis", analyze_customer)),
+            WorkflowStep("tasks", checkpointed("tasks", "Tasks", create_tasks), depends_on=("analysis",)),
+            WorkflowStep(
+                "communication",
+                checkpointed("communication", "Communication Plan", plan_communication),
+                depends_on=("analysis",)
+            ),
+            WorkflowStep("execution", execute_platform_tasks, depends_on=("tasks", "communication")),
+        ])
+        async for response in graph.run(step_results, step_seconds):
+            yield response
+
+    def use_private_agents(self):
+        """
+        Give this workflow instance its own copies of the agents.
         
-        workflow_result = WorkflowResult(
-            workflow_id=workflow_id,
-            status="completed",
-            customer_data=Customer(**customer_data),
-            tasks_created=[
-                Task(title="Welcome Call", description="Schedule and conduct welcome call", priority="high"),
-                Task(title="Account Setup", description="Configure customer account and permissions", priority="high"),
-                Task(title="Training Session", description="Provide product training", priority="medium"),
-            ],
-            emails_sent=["Welcome email", "Getting started guide"],
-            notes_created=["Customer profile in Notion", "Onboarding checklist"],
-            execution_time=execution_time
-        )
+        The agents are class attributes shared by every instance, and agno keeps
+        per-run state on them, so workflows running concurrently in one process
+        each need private copies.
+        """
+        for name in dir(type(self)):
+            value = getattr(type(self), name, None)
+            if isinstance(value, Agent):
+                setattr(self, name, value.deep_copy(update={"session_id": self.session_id}))
+
+    def _run_agent(self, agent: Agent, prompt: str, tracker: Optional[UsageTracker] = None) -> RunResponse:
+        """
+        Run a workflow agent and record its token usage.
         
-        self.cache_workflow_result(workflow_id, workflow_result)
+        Pica tasks the agent triggers through its tools are recorded in the same
+        tracker. Raises TokenBudgetExceeded if the run's budget is already spent.
+        The run counts once against the process-wide "llm" rate limit.
+        """
+        if tracker is None:
+            rate_limited("llm")
+            return agent.run(prompt)
         
-        yield RunResponse(
-            content=f"🎉 **Workflow Complete!**\n\n"
-                   f"**Summary:**\n"
-                   f"• Customer: {customer_data.get('name')} from {customer_data.get('company')}\n"
-                   f"• Workflow ID: {workflow_id}\n"
-                   f"• Platform Integrations: {len(platform_results)}\n"
-                   f"• Execution Time: {execution_time:.2f} seconds\n"
-                   f"• Status: ✅ Completed Successfully\n\n"
-                   f"All customer onboarding tasks have been automated across your connected platforms!"
-        )
+        tracker.check()
+        rate_limited("llm")
+        with tracking_scope(tracker):
+            response = agent.run(prompt)
+        tracker.record(usage_from_agno_metrics(response.metrics, agent.model.id), agent.name)
+        return response
+
+    def _run_step_agent(
+        self,
+        agent: Agent,
+        prompt: str,
+        tracker: UsageTracker,
+        use_cache: bool = True
+    ) -> Tuple[Optional[Any], bool]:
+        """
+        Run the agent of an LLM step, reusing an earlier output where possible.
+        
+        Outputs are cached by a hash of the agent's configuration and the fully
+        rendered prompt, so a step is only re-run when something it depends on
+        changed; a new task prompt still reuses the cached analysis.
+        
+        Returns:
+            The step output and whether it came from the cache. The output is None
+            if an agent with a response_model returned something that is not one;
+            such output is never cached.
+        """
+        key, content = self._cached_step_output(agent, prompt, use_cache)
+        if content is not None:
+            return content, True
+        
+        content = self._run_agent(agent, prompt, tracker).content
+        if not self._valid_step_output(agent, content):
+            logger.warning(f"{agent.name} did not return a valid {agent.response_model.__name__}")
+            return None, False
+        return self._store_step_output(key, content), False
+
+    async def _arun_agent(self, agent: Agent, prompt: str, tracker: Optional[UsageTracker] = None) -> RunResponse:
+        """
+        Async counterpart of _run_agent: runs a private async copy of the agent
+        (see _async_agent) and waits for the "llm" rate limit without blocking
+        the event loop.
+        """
+        agent = self._async_agent(agent)
+        if tracker is None:
+            await arate_limited("llm")
+            return await agent.arun(prompt)
+        
+        tracker.check()
+        await arate_limited("llm")
+        with tracking_scope(tracker):
+            response = await agent.arun(prompt)
+        tracker.record(usage_from_agno_metrics(response.metrics, agent.model.id), agent.name)
+        return response
+
+    async def _arun_step_agent(
+        self,
+        agent: Agent,
+        prompt: str,
+        tracker: UsageTracker,
+        use_cache: bool = True
+    ) -> Tuple[Optional[Any], bool]:
+        """Async counterpart of _run_step_agent, sharing its step cache."""
+        key, content = self._cached_step_output(agent, prompt, use_cache)
+        if content is not None:
+            return content, True
+        
+        content = (await self._arun_agent(agent, prompt, tracker)).content
+        if not self._valid_step_output(agent, content):
+            logger.warning(f"{agent.name} did not return a valid {agent.response_model.__name__}")
+            return None, False
+        return self._store_step_output(key, content), False
+
+    def _cached_step_output(self, agent: Agent, prompt: str, use_cache: bool) -> Tuple[str, Optional[Any]]:
+        """
+        Returns:
+            The step cache key of an agent and prompt, and the cached output if
+            it may be reused
+        """
+        key = _content_hash({"agent": _agent_fingerprint(agent), "prompt": prompt})
+        with self._state_lock:
+            entry = self.session_state.setdefault("step_cache", {}).get(key)
+        if (use_cache and entry and time.time() - entry["cached_at"] < self.cache_ttl
+                and self._valid_step_output(agent, entry["content"])):
+            logger.info(f"Reusing cached {agent.name} output")
+            return key, entry["content"]
+        return key, None
+
+    @staticmethod
+    def _valid_step_output(agent: Agent, content: Any) -> bool:
+        """
+        Whether a step output fits the agent's response_model, if it has one.
+        
+        agno leaves output it could not parse as text, and cached structured
+        output is a dict.
+        """
+        if agent.response_model is None or isinstance(content, agent.response_model):
+            return True
+        if not isinstance(content, dict):
+            return False
+        try:
+            agent.response_model.model_validate(content)
+            return True
+        except ValidationError:
+            return False
+
+    def _store_step_output(self, key: str, content: Any) -> Any:
+        if isinstance(content, BaseModel):
+            # Structured output is kept as a dict so it can be stored in session_state
+            content = content.model_dump()
+        with self._state_lock:
+            self.session_state.setdefault("step_cache", {})[key] = {"content": content, "cached_at": time.time()}
+        return content
 
-    def get_cached_workflow_result(self, workflow_id: str) -> Optional[WorkflowResult]:
-        """Get cached workflow result from session state."""
+    def _async_agent(self, agent: Agent) -> Agent:
+        """
+        Copy of an agent for arun(), with its Pica tools swapped for their async twins.
+        
+        Agent.arun() would run the sync tools in worker threads; the twins await
+        the async Pica service instead. The twins keep the names and descriptions
+        of the sync tools, so prompts, tool calls and step cache keys are unchanged.
+        """
+        tools = [ASYNC_TOOLS.get(getattr(t, "name", None), t) for t in agent.tools or []]
+        # agno keeps per-agent state on tool objects, so the copy gets its own
+        return agent.deep_copy(update={"tools": deepcopy(tools), "session_id": self.session_id})
+
+    def workflow_cache_key(self, customer_data: Dict[str, Any], workflow_type: str) -> str:
+        """
+        Content address of a workflow run.
+        
+        Hashes the canonicalized customer data, the workflow type, WORKFLOW_VERSION,
+        the planning mode and the configuration of every agent, so changing a prompt
+        or a model invalidates earlier results.
+        """
+        return _content_hash({
+            "customer": _canonical_customer(customer_data),
+            "workflow_type": workflow_type,
+            "version": WORKFLOW_VERSION,
+            "planning_mode": self.planning_mode,
+            "agents": [
+                _agent_fingerprint(agent)
+                for agent in (self.business_analyst, self.task_coordinator, self.communication_manager, self.task_planner)
+            ],
+        })
+
+    def get_cached_workflow_result(self, cache_key: str) -> Optional[WorkflowResult]:
+        """Get a cached workflow result, if it has not expired."""
         logger.info("Checking for cached workflow result")
-        cached_data = self.session_state.get("workflow_results", {}).get(workflow_id)
-        return WorkflowResult(**cached_data) if cached_data else None
+        entry = self.session_state.get("workflow_results", {}).get(cache_key)
+        if not entry or "workflow_id" not in entry or time.time() - entry["cached_at"] >= self.cache_ttl:
+            return None
+        stored = get_result_store().get(entry["workflow_id"])
+        return WorkflowResult(**stored) if stored else None
 
-    def cache_workflow_result(self, workflow_id: str, result: WorkflowResult):
-        """Cache workflow result in session state."""
-        logger.info(f"Caching workflow result for {workflow_id}")
+    def cache_workflow_result(self, cache_key: str, result: WorkflowResult):
+        """
+        Cache a workflow result for reuse.
+        
+        The result itself lives in the result store (see workflow_results.py);
+        session state only keeps a pointer to it, so the session stays small.
+        """
+        logger.info(f"Caching workflow result for {result.workflow_id}")
         if "workflow_results" not in self.session_state:
             self.session_state["workflow_results"] = {}
-        self.session_state["workflow_results"][workflow_id] = result.model_dump()
+        self.session_state["workflow_results"][cache_key] = {
+            "workflow_id": result.workflow_id,
+            "cached_at": time.time()
+        }
+
+    def prune_cache(self):
+        """Drop expired workflow and step results from session state."""
+        now = time.time()
+        for name, stamp in (("workflow_results", "cached_at"), ("step_cache", "cached_at"), ("checkpoints", "updated_at")):
+            entries = self.session_state.get(name)
+            if entries:
+                self.session_state[name] = {
+                    key: entry for key, entry in entries.items()
+                    if isinstance(entry, dict) and now - entry.get(stamp, 0) < self.cache_ttl
+                }
+
+    def open_checkpoint(self, cache_key: str, workflow_id: str, resume: bool = False) -> RunCheckpoint:
+        """
+        Get the checkpoint for a run, stored in session_state under its cache key.
+        
+        Args:
+            cache_key: Content address of the run (see workflow_cache_key)
+            workflow_id: Id of the new run
+            resume: Reuse an unfinished checkpoint instead of starting a fresh one
+        """
+        with self._state_lock:
+            checkpoints = self.session_state.setdefault("checkpoints", {})
+            if not resume or cache_key not in checkpoints:
+                checkpoints[cache_key] = RunCheckpoint.new_state(workflow_id)
+            return RunCheckpoint(checkpoints[cache_key], self.save_session, self._state_lock)
+
+    def save_session(self):
+        """
+        Write the session, including session_state, to storage in the middle of a run.
+        
+        The session is snapshotted under the state lock and written outside it, so
+        other steps keep updating session_state while the storage write runs.
+        """
+        if self.storage is None:
+            return
+        with self._state_lock:
+            if isinstance(self.memory, Memory):
+                # Memory only gets an entry for the session once a run has finished
+                if self.memory.runs is None:
+                    self.memory.runs = {}
+                self.memory.runs.setdefault(self.session_id, [])
+            self._state_version += 1
+            version = self._state_version
+            session = self.get_workflow_session()
+        with self._save_lock:
+            if version > self._saved_version:
+                self.workflow_session = self.storage.upsert(session=session)
+                self._saved_version = version
+
+    def clear_checkpoint(self, cache_key: str):
+        """Drop the checkpoint of a run that completed."""
+        with self._state_lock:
+            self.session_state.get("checkpoints", {}).pop(cache_key, None)
+
+    @staticmethod
+    def _already_executed(checkpoint: Optional[RunCheckpoint], platform: str, task: str) -> bool:
+        return checkpoint is not None and checkpoint.is_executed(RunCheckpoint.task_key(platform, task))
+
+    @staticmethod
+    def _mark_executed(checkpoint: Optional[RunCheckpoint], platform: str, task: str):
+        if checkpoint is not None:
+            checkpoint.mark_executed(RunCheckpoint.task_key(platform, task))
+
+    @staticmethod
+    def format_task_plan(plan: TaskPlan) -> str:
+        """Render a task plan in the markdown format of the task creation step."""
+        lines = []
+        for number, task in enumerate(plan.tasks, 1):
+            lines.append(f"**Task {number}: {task.title}**")
+            lines.append(f"- Description: {task.description}")
+            lines.append(f"- Platform: {task.platform}")
+            lines.append(f"- Priority: {task.priority}")
+            lines.append(f"- Assignee: {task.assigned_to or 'unassigned'}")
+            lines.append(f"- Deadline: {task.due_date or 'none'}")
+        return "\n".join(lines)
+
+    @staticmethod
+    def plan_to_platform_tasks(plan: TaskPlan) -> Dict[str, List[str]]:
+        """
+        Route the tasks of a plan by their platform field.
+        
+        Returns:
+            Dictionary with platform categories and their tasks, as parse_dynamic_tasks
+        """
+        platform_tasks: Dict[str, List[str]] = {platform: [] for platform in DYNAMIC_TASK_SPECS}
+        for task in plan.tasks:
+            platform_tasks[task.platform].append(task.instruction())
+        return platform_tasks
 
     def parse_dynamic_tasks(self, tasks_content: str) -> Dict[str, List[str]]:
         """
@@ -509,53 +1517,184 @@ class BusinessAutomationWorkflow(Workflow):
         elif "using google calendar" in task_lower or "calendar" in task_lower:
             platform_tasks["google-calendar"].append(task_content)
     
-    def execute_dynamic_tasks(self, platform_tasks: Dict[str, List[str]], customer_data: Dict[str, Any]) -> Iterator[RunResponse]:
+    def execute_dynamic_tasks(
+        self,
+        platform_tasks: Dict[str, List[str]],
+        customer_data: Dict[str, Any],
+        tracker: Optional[UsageTracker] = None,
+        max_concurrency: Optional[int] = None,
+        platform_concurrency: Optional[int] = None,
+        checkpoint: Optional[RunCheckpoint] = None
+    ) -> Iterator[RunResponse]:
         """
         Execute the dynamically parsed tasks through Pica.
         
+        Tasks run concurrently and a RunResponse is yielded as each one finishes,
+        so the order follows completion rather than the parsed order. A failed
+        task is reported and the others carry on; once the token budget is spent
+        no further tasks are started and TokenBudgetExceeded is raised after the
+        running ones finish.
+        
         Args:
             platform_tasks: Dictionary of categorized tasks by platform
             customer_data: Customer information for context
+            tracker: Usage tracker of the run, if any
+            max_concurrency: Maximum tasks running at once
+                (default: WORKFLOW_TASK_CONCURRENCY, or 4)
+            platform_concurrency: Maximum tasks running at once per platform
+                (default: WORKFLOW_PLATFORM_CONCURRENCY, or 2)
+            checkpoint: Checkpoint of the run; tasks it lists as executed are
+                skipped and newly executed tasks are added to it
         """
-        try:
-            for gmail_task in platform_tasks.get("gmail", []):
-                task_description = self._extract_task_description(gmail_task, customer_data)
-                gmail_result = self.communication_manager.run(
-                    f"Execute this email task: {task_description}. Use execute_email_task tool to actually send this email."
-                )
-                yield RunResponse(content="✅ 📧 Gmail: Dynamic email task executed")
-            
-            for linear_task in platform_tasks.get("linear", []):
-                task_description = self._extract_task_description(linear_task, customer_data)
-                linear_result = self.task_coordinator.run(
-                    f"Execute this task management operation: {task_description}. Use execute_task_management tool to actually create this task."
-                )
-                yield RunResponse(content="✅ 📋 Linear: Dynamic project task executed")
-                
-            for notion_task in platform_tasks.get("notion", []):
-                task_description = self._extract_task_description(notion_task, customer_data)
-                notion_result = self.task_coordinator.run(
-                    f"Execute this data operation: {task_description}. Use execute_data_operation tool to actually create this documentation."
-                )
-                yield RunResponse(content="✅ 📝 Notion: Dynamic documentation task executed")
-            
-            for airtable_task in platform_tasks.get("airtable", []):
-                task_description = self._extract_task_description(airtable_task, customer_data)
-                airtable_result = self.task_coordinator.run(
-                    f"Execute this data operation: {task_description}. Use execute_data_operation tool to actually create this record."
-                )
-                yield RunResponse(content="✅ 📊 Airtable: Dynamic data task executed")
-                
-            for calendar_task in platform_tasks.get("google-calendar", []):
-                task_description = self._extract_task_description(calendar_task, customer_data)
-                calendar_result = self.task_coordinator.run(
-                    f"Execute this calendar task: {task_description}. Use execute_calendar_task tool to actually create this event."
-                )
-                yield RunResponse(content="✅ 📅 Google Calendar: Dynamic scheduling task executed")
+        max_concurrency, platform_concurrency = self._task_concurrency(max_concurrency, platform_concurrency)
+        pending, executed = self._pending_dynamic_tasks(platform_tasks, checkpoint)
+        yield from executed
+        running: Dict[Future, Tuple[str, str]] = {}
+        budget_error: Optional[TokenBudgetExceeded] = None
+        
+        with ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="dynamic-task") as pool:
+            while pending or running:
+                # Start whatever fits under the global and per-platform limits
+                for platform, task in list(pending):
+                    if budget_error or len(running) >= max_concurrency:
+                        break
+                    if sum(1 for p, _ in running.values() if p == platform) >= platform_concurrency:
+                        continue
+                    pending.remove((platform, task))
+                    future = pool.submit(
+                        contextvars.copy_context().run,
+                        self._execute_dynamic_task, platform, task, customer_data, tracker
+                    )
+                    running[future] = (platform, task)
+                if budget_error:
+                    pending.clear()
+                if not running:
+                    break
                 
-        except Exception as e:
-            yield RunResponse(content=f"⚠️ Dynamic task execution error: {str(e)}")
-            yield RunResponse(content="📝 Continuing with workflow completion...")
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    platform, task = running.pop(future)
+                    label, kind = DYNAMIC_TASK_SPECS[platform][2:4]
+                    try:
+                        future.result()
+                    except TokenBudgetExceeded as e:
+                        budget_error = budget_error or e
+                    except Exception as e:
+                        yield RunResponse(content=f"⚠️ {label}: Dynamic {kind} task failed - {e}")
+                    else:
+                        self._mark_executed(checkpoint, platform, task)
+                        yield RunResponse(content=f"✅ {label}: Dynamic {kind} task executed")
+        
+        if budget_error:
+            raise budget_error
+    
+    def _execute_dynamic_task(
+        self,
+        platform: str,
+        task: str,
+        customer_data: Dict[str, Any],
+        tracker: Optional[UsageTracker]
+    ) -> RunResponse:
+        """Run one parsed platform task on a private copy of the responsible agent."""
+        agent_name, prompt = DYNAMIC_TASK_SPECS[platform][:2]
+        task_description = self._extract_task_description(task, customer_data)
+        # Agent runs keep per-run state on the agent, so concurrent tasks each get a copy
+        agent = getattr(self, agent_name).deep_copy()
+        return self._run_agent(agent, prompt.format(task=task_description), tracker)
+    
+    async def aexecute_dynamic_tasks(
+        self,
+        platform_tasks: Dict[str, List[str]],
+        customer_data: Dict[str, Any],
+        tracker: Optional[UsageTracker] = None,
+        max_concurrency: Optional[int] = None,
+        platform_concurrency: Optional[int] = None,
+        checkpoint: Optional[RunCheckpoint] = None
+    ) -> AsyncIterator[RunResponse]:
+        """
+        Async counterpart of execute_dynamic_tasks, with the same limits, reporting
+        and checkpointing. The tasks run as asyncio tasks on the caller's event loop.
+        """
+        max_concurrency, platform_concurrency = self._task_concurrency(max_concurrency, platform_concurrency)
+        pending, executed = self._pending_dynamic_tasks(platform_tasks, checkpoint)
+        for response in executed:
+            yield response
+        
+        slots = asyncio.Semaphore(max_concurrency)
+        platform_slots = {platform: asyncio.Semaphore(platform_concurrency) for platform in DYNAMIC_TASK_SPECS}
+        budget_error: Optional[TokenBudgetExceeded] = None
+        
+        async def execute(platform: str, task: str) -> Optional[RunResponse]:
+            nonlocal budget_error
+            label, kind = DYNAMIC_TASK_SPECS[platform][2:4]
+            async with platform_slots[platform], slots:
+                if budget_error:
+                    return None
+                try:
+                    await self._aexecute_dynamic_task(platform, task, customer_data, tracker)
+                except TokenBudgetExceeded as e:
+                    budget_error = budget_error or e
+                    return None
+                except Exception as e:
+                    return RunResponse(content=f"⚠️ {label}: Dynamic {kind} task failed - {e}")
+            if checkpoint is not None:
+                await asyncio.to_thread(self._mark_executed, checkpoint, platform, task)
+            return RunResponse(content=f"✅ {label}: Dynamic {kind} task executed")
+        
+        running = [asyncio.create_task(execute(platform, task)) for platform, task in pending]
+        try:
+            for finished in asyncio.as_completed(running):
+                response = await finished
+                if response is not None:
+                    yield response
+        finally:
+            for task in running:
+                task.cancel()
+        
+        if budget_error:
+            raise budget_error
+    
+    async def _aexecute_dynamic_task(
+        self,
+        platform: str,
+        task: str,
+        customer_data: Dict[str, Any],
+        tracker: Optional[UsageTracker]
+    ) -> RunResponse:
+        """Async counterpart of _execute_dynamic_task."""
+        agent_name, prompt = DYNAMIC_TASK_SPECS[platform][:2]
+        task_description = self._extract_task_description(task, customer_data)
+        return await self._arun_agent(getattr(self, agent_name), prompt.format(task=task_description), tracker)
+    
+    @staticmethod
+    def _task_concurrency(max_concurrency: Optional[int], platform_concurrency: Optional[int]) -> Tuple[int, int]:
+        """Overall and per-platform task limits, defaulting to WORKFLOW_TASK_CONCURRENCY and WORKFLOW_PLATFORM_CONCURRENCY."""
+        if max_concurrency is None:
+            max_concurrency = int(os.getenv("WORKFLOW_TASK_CONCURRENCY", "4"))
+        if platform_concurrency is None:
+            platform_concurrency = int(os.getenv("WORKFLOW_PLATFORM_CONCURRENCY", "2"))
+        return max(1, max_concurrency), max(1, platform_concurrency)
+    
+    def _pending_dynamic_tasks(
+        self,
+        platform_tasks: Dict[str, List[str]],
+        checkpoint: Optional[RunCheckpoint]
+    ) -> Tuple[List[Tuple[str, str]], List[RunResponse]]:
+        """
+        Returns:
+            The (platform, task) pairs still to execute, and a RunResponse for
+            each task the checkpoint lists as executed by an earlier run
+        """
+        pending = []
+        executed = []
+        for platform in DYNAMIC_TASK_SPECS:
+            for task in platform_tasks.get(platform, []):
+                if self._already_executed(checkpoint, platform, task):
+                    label, kind = DYNAMIC_TASK_SPECS[platform][2:4]
+                    executed.append(RunResponse(content=f"✅ {label}: Dynamic {kind} task executed (earlier run)"))
+                else:
+                    pending.append((platform, task))
+        return pending, executed
     
     def _extract_task_description(self, task_content: str, customer_data: Dict[str, Any]) -> str:
         """Extract and contextualize task description from AI-generated content."""
@@ -0,0 +1,321 @@
+"""
+ActionCatalogIndex - Local index of Pica actions with BM25 retrieval
+
+The Pica agent normally spends its first LLM turns calling
+get_available_actions to find the right action for a task. This index keeps
+a local copy of each connected platform's action catalog (id, title, method,
+path and path parameters), persisted as JSON and refreshed per platform when
+it goes stale, and ranks actions for a task description with BM25. The top
+matches are handed to the agent up front so it can go straight to
+get_action_knowledge / execute.
+"""
+
+import json
+import math
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import Counter
+from typing import Dict, Any, Iterable, List, Optional
+
+import requests
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_PATH_VARIABLE = re.compile(r"\{\{([^}]+)\}\}")
+
+# Words that carry no signal for picking an action
+_STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "into", "is", "it",
+    "of", "on", "or", "the", "this", "to", "using", "via", "with", "their", "our", "your",
+}
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens without stopwords, with a crude plural fold."""
+    tokens = []
+    for token in _TOKEN.findall(text.lower()):
+        if token in _STOPWORDS:
+            continue
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+class BM25:
+    """Okapi BM25 over a fixed list of token lists."""
+
+    def __init__(self, documents: List[List[str]], k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.term_counts = [Counter(doc) for doc in documents]
+        self.lengths = [len(doc) for doc in documents]
+        self.avg_length = (sum(self.lengths) / len(documents)) if documents else 0.0
+
+        document_frequency: Counter = Counter()
+        for counts in self.term_counts:
+            document_frequency.update(counts.keys())
+        total = len(documents)
+        self.idf = {
+            term: math.log(1 + (total - df + 0.5) / (df + 0.5))
+            for term, df in document_frequency.items()
+        }
+
+    def scores(self, query: List[str]) -> List[float]:
+        results = []
+        for counts, length in zip(self.term_counts, self.lengths):
+            score = 0.0
+            norm = self.k1 * (1 - self.b + self.b * length / self.avg_length) if self.avg_length else self.k1
+            for term in query:
+                tf = counts.get(term)
+                if tf:
+                    score += self.idf[term] * tf * (self.k1 + 1) / (tf + norm)
+            results.append(score)
+        return results
+
+
+class ActionCatalogIndex:
+    """
+    Persisted, incrementally refreshed catalog of Pica actions per platform.
+    """
+
+    def __init__(self,
+                 pica_secret: str,
+                 server_url: str = "https://api.picaos.com",
+                 path: str = "tmp/pica_action_index.json",
+                 ttl: float = 24 * 3600,
+                 timeout: float = 30,
+                 failure_backoff: float = 300,
+                 session: Optional[requests.Session] = None):
+        """
+        Initialize the index and load any previously persisted catalog.
+
+        Args:
+            pica_secret: Pica API secret key
+            server_url: Pica server URL
+            path: JSON file the catalog is persisted to
+            ttl: Seconds before a platform's catalog is refreshed
+            timeout: HTTP timeout for catalog requests
+            failure_backoff: Seconds before a platform whose fetch failed is tried again
+            session: Optional shared requests session
+        """
+        self.pica_secret = pica_secret
+        self.knowledge_url = f"{server_url}/v1/knowledge"
+        self.path = path
+        self.ttl = ttl
+        self.timeout = timeout
+        self.failure_backoff = failure_backoff
+        self.session = session or requests.Session()
+
+        self._platforms: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._refreshing: set = set()
+        self._failed_at: Dict[str, float] = {}
+        self._load()
+        self._rebuild()
+
+    def ensure(self, platforms: Iterable[str]) -> None:
+        """
+        Make sure the catalogs of `platforms` are available.
+
+        Platforms never indexed are fetched now; stale ones keep serving
+        while they are refreshed in the background. Platforms whose last
+        fetch failed are skipped until `failure_backoff` has passed.
+        """
+        missing, stale = [], []
+        now = time.time()
+        with self._lock:
+            for platform in platforms:
+                if self._backing_off_locked(platform, now):
+                    continue
+                entry = self._platforms.get(platform)
+                if entry is None:
+                    missing.append(platform)
+                elif now - entry["fetched_at"] > self.ttl and platform not in self._refreshing:
+                    self._refreshing.add(platform)
+                    stale.append(platform)
+
+        if missing:
+            self.refresh(missing)
+        if stale:
+            threading.Thread(target=self._background_refresh, args=(stale,), daemon=True).start()
+
+    def refresh(self, platforms: Iterable[str]) -> None:
+        """Re-fetch the catalogs of `platforms`, persist and re-index."""
+        updated = {}
+        for platform in platforms:
+            try:
+                updated[platform] = {
+                    "fetched_at": time.time(),
+                    "actions": [self._summarize(row, platform) for row in self._fetch_actions(platform)],
+                }
+            except Exception:
+                # Keep whatever we had; the agent can still search on its own
+                with self._lock:
+                    self._failed_at[platform] = time.time()
+                continue
+
+        if updated:
+            with self._lock:
+                for platform in updated:
+                    self._failed_at.pop(platform, None)
+                self._platforms.update(updated)
+                self._rebuild_locked()
+            self._save()
+
+    def search(self, query: str, platforms: Optional[Iterable[str]] = None, k: int = 5) -> List[Dict[str, Any]]:
+        """
+        Rank indexed actions for a task description.
+
+        Args:
+            query: Natural language task description
+            platforms: Restrict results to these platforms
+            k: Number of actions to return
+
+        Returns:
+            Up to `k` action summaries, best first
+        """
+        with self._lock:
+            actions, bm25 = self._actions, self._bm25
+        if not actions or bm25 is None:
+            return []
+
+        allowed = set(platforms) if platforms is not None else None
+        scored = [
+            (score, action)
+            for score, action in zip(bm25.scores(tokenize(query)), actions)
+            if score > 0 and (allowed is None or action["platform"] in allowed)
+        ]
+        scored.sort(key=lambda pair: pair[0], reverse=True)
+        return [action for _, action in scored[:k]]
+
+    def get_action(self, action_id: str, platform: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up an action by id, fetching the platform's catalog if it is not indexed.
+
+        Args:
+            action_id: Pica action id
+            platform: Platform the action belongs to
+
+        Returns:
+            The action summary, or None if the platform has no such action
+        """
+        for attempt in range(2):
+            with self._lock:
+                entry = self._platforms.get(platform)
+                actions = entry["actions"] if entry else []
+            for action in actions:
+                if action["id"] == action_id:
+                    return action
+            if attempt == 0:
+                with self._lock:
+                    if self._backing_off_locked(platform, time.time()):
+                        return None
+                # Unknown id: the cached catalog may predate the action
+                self.refresh([platform])
+        return None
+
+    @staticmethod
+    def build_path(action: Dict[str, Any], variables: Dict[str, Any]) -> str:
+        """Fill the {{variable}} placeholders of an action's path."""
+        missing = [name for name in action["parameters"] if name not in variables]
+        if missing:
+            raise ValueError(f"Missing required path variables: {', '.join(missing)}")
+        return _PATH_VARIABLE.sub(lambda match: str(variables[match.group(1)]), action["path"])
+
+    @staticmethod
+    def format_for_prompt(actions: List[Dict[str, Any]]) -> str:
+        """Render ranked actions as a short block for the agent's input."""
+        lines = []
+        for action in actions:
+            params = f" (path params: {', '.join(action['parameters'])})" if action["parameters"] else ""
+            lines.append(
+                f"- [{action['platform']}] {action['title']} — {action['method']} {action['path']}"
+                f"{params} — action id: {action['id']}"
+            )
+        return "\n".join(lines)
+
+    def _backing_off_locked(self, platform: str, now: float) -> bool:
+        failed_at = self._failed_at.get(platform)
+        return failed_at is not None and now - failed_at < self.failure_backoff
+
+    def _background_refresh(self, platforms: List[str]) -> None:
+        try:
+            self.refresh(platforms)
+        finally:
+            with self._lock:
+                self._refreshing.difference_update(platforms)
+
+    def _fetch_actions(self, platform: str) -> List[Dict[str, Any]]:
+        rows: List[Dict[str, Any]] = []
+        skip, limit = 0, 100
+        while True:
+            response = self.session.get(
+                self.knowledge_url,
+                params={"supported": "true", "connectionPlatform": platform, "skip": skip, "limit": limit},
+                headers={"x-pica-secret": self.pica_secret},
+                timeout=self.timeout
+            )
+            response.raise_for_status()
+            data = response.json()
+            page = data.get("rows", [])
+            rows.extend(page)
+            skip += limit
+            if not page or len(rows) >= data.get("total", 0):
+                return rows
+
+    @staticmethod
+    def _summarize(row: Dict[str, Any], platform: str) -> Dict[str, Any]:
+        path = row.get("path") or ""
+        return {
+            "id": row.get("_id") or row.get("systemId"),
+            "platform": row.get("connectionPlatform") or platform,
+            "title": row.get("title") or "Untitled Action",
+            "method": (row.get("method") or "").upper(),
+            "path": path,
+            "parameters": _PATH_VARIABLE.findall(path),
+            "tags": row.get("tags") or [],
+        }
+
+    def _rebuild(self) -> None:
+        with self._lock:
+            self._rebuild_locked()
+
+    def _rebuild_locked(self) -> None:
+        actions = [
+            action
+            for entry in self._platforms.values()
+            for action in entry["actions"]
+            if action.get("id")
+        ]
+        documents = [
+            tokenize(" ".join([action["title"], action["title"], action["path"], " ".join(action["tags"])]))
+            for action in actions
+        ]
+        self._actions = actions
+        self._bm25 = BM25(documents) if documents else None
+
+    def _load(self) -> None:
+        try:
+            with open(self.path) as f:
+                self._platforms = json.load(f).get("platforms", {})
+        except (OSError, ValueError):
+            self._platforms = {}
+
+    def _save(self) -> None:
+        with self._lock:
+            data = json.dumps({"version": 1, "platforms": self._platforms})
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # A temp file per writer, so concurrent refreshes never share one
+        with tempfile.NamedTemporaryFile("w", dir=directory or ".", prefix=".pica_action_index.",
+                                         suffix=".tmp", delete=False) as f:
+            f.write(data)
+        try:
+            os.replace(f.name, self.path)
+        except OSError:
+            os.remove(f.name)
+            raise
@@ -5,18 +5,349 @@ This service provides a clean interface between Agno's workflow system
 and Pica's platform integrations using the official pica_langchain package.
 """
 
+import asyncio
+import json
 import os
-from typing import Dict, Any, Optional
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Dict, Any, Callable, Deque, Iterator, AsyncIterator, List, Optional, Tuple
 from dotenv import load_dotenv
 
+import requests
+from requests.adapters import HTTPAdapter
+
 from langchain_openai import ChatOpenAI
-from langchain.agents import AgentType
-from pica_langchain import PicaClient, create_pica_agent
+from langchain.agents import AgentType, initialize_agent
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.tools import BaseTool, StructuredTool
+from pica_langchain import PicaClient, get_tools_from_client
 from pica_langchain.models import PicaClientOptions
 
+from pica_action_index import ActionCatalogIndex
+from pica_compaction import OutputCompactor
+from pica_parallel_agent import create_parallel_agent
+from pica_task_cache import TaskResultCache, classify_task
+from rate_limits import LLMRateLimitCallbackHandler, rate_limited
+from usage_tracking import TokenUsage, UsageCallbackHandler
+
 load_dotenv()
 
 
+class ConnectionProbe:
+    """
+    Cheap, cached check of the Pica connections API.
+
+    Fetches the account's connections directly (no LLM involved) and caches
+    the result for `ttl` seconds. Once the cached result goes stale it is
+    still served while a single background refresh runs, so callers never
+    wait on the network after the first probe.
+    """
+
+    def __init__(self,
+                 pica_secret: str,
+                 server_url: str = "https://api.picaos.com",
+                 ttl: float = 300,
+                 timeout: float = 10,
+                 session: Optional[requests.Session] = None):
+        self.pica_secret = pica_secret
+        self.connections_url = f"{server_url}/v1/vault/connections"
+        self.ttl = ttl
+        self.timeout = timeout
+        self.session = session or requests.Session()
+
+        self._result: Optional[Dict[str, Any]] = None
+        self._fetched_at = 0.0
+        self._lock = threading.Lock()
+        self._refreshing = False
+
+    def get(self, force_refresh: bool = False) -> Dict[str, Any]:
+        """
+        Get the connection status, fetching it only if nothing is cached.
+
+        Args:
+            force_refresh: Fetch synchronously even if a cached result exists
+
+        Returns:
+            Dictionary with success flag, connections and connected platform names
+        """
+        with self._lock:
+            result = self._result
+            stale = time.monotonic() - self._fetched_at > self.ttl
+            start_refresh = result is not None and stale and not self._refreshing and not force_refresh
+            if start_refresh:
+                self._refreshing = True
+
+        if result is None or force_refresh:
+            return self.refresh()
+        if start_refresh:
+            threading.Thread(target=self._background_refresh, daemon=True).start()
+        return result
+
+    def refresh(self) -> Dict[str, Any]:
+        """Fetch connections from Pica now and update the cache."""
+        try:
+            connections = self._fetch_connections()
+            active = [conn for conn in connections if conn.get("active", True)]
+            platforms = sorted({conn["platform"] for conn in active if conn.get("platform")})
+            result = {
+                "success": True,
+                "connections": [
+                    {"platform": conn.get("platform"), "key": conn.get("key")}
+                    for conn in active
+                ],
+                "connected_platforms": platforms,
+                "platform_count": len(platforms),
+                "error": None,
+            }
+        except Exception as e:
+            result = {
+                "success": False,
+                "connections": [],
+                "connected_platforms": [],
+                "platform_count": 0,
+                "error": f"Failed to fetch Pica connections: {str(e)}",
+            }
+
+        with self._lock:
+            # Keep serving the last good result if a background refresh fails
+            if result["success"] or self._result is None or not self._result["success"]:
+                self._result = result
+            self._fetched_at = time.monotonic()
+        return result
+
+    def connection_keys(self, platform: str) -> List[str]:
+        """Connection keys of the active connections for `platform`."""
+        return [
+            conn["key"] for conn in self.get()["connections"]
+            if conn["platform"] == platform and conn.get("key")
+        ]
+
+    def _background_refresh(self) -> None:
+        try:
+            self.refresh()
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+    def _fetch_connections(self) -> List[Dict[str, Any]]:
+        rows: List[Dict[str, Any]] = []
+        skip, limit = 0, 100
+        while True:
+            response = self.session.get(
+                self.connections_url,
+                params={"skip": skip, "limit": limit},
+                headers={"x-pica-secret": self.pica_secret},
+                timeout=self.timeout
+            )
+            response.raise_for_status()
+            data = response.json()
+            page = data.get("rows", [])
+            rows.extend(page)
+            skip += limit
+            if not page or len(rows) >= data.get("total", 0):
+                return rows
+
+
+def _offload_async(tool: BaseTool, transform: Optional[Callable[[Any, Dict[str, Any]], Any]] = None) -> BaseTool:
+    """
+    Wrap a Pica tool so its async path runs in a worker thread.
+
+    The pica_langchain tools implement `_arun` by calling their blocking
+    `_run`, which would stall the event loop for the whole HTTP request.
+    `transform`, if given, post-processes the output with the call's arguments.
+    Every call counts against the "pica" rate limit.
+    """
+    def run(**kwargs):
+        rate_limited("pica")
+        output = tool._run(**kwargs)
+        return transform(output, kwargs) if transform else output
+
+    async def arun(**kwargs):
+        return await asyncio.to_thread(run, **kwargs)
+
+    return StructuredTool(
+        name=tool.name,
+        description=tool.description,
+        args_schema=tool.args_schema,
+        func=run,
+        coroutine=arun
+    )
+
+
+class _ThreadWaiter:
+    """A synchronous checkout waiting for an executor."""
+
+    def __init__(self):
+        self.agent: Any = None
+        self.ready = threading.Event()
+
+    def hand_over(self, agent: Any) -> bool:
+        self.agent = agent
+        self.ready.set()
+        return True
+
+
+class _LoopWaiter:
+    """An async checkout waiting for an executor on its event loop."""
+
+    def __init__(self, pool: "AgentPool", loop: asyncio.AbstractEventLoop):
+        self.pool = pool
+        self.loop = loop
+        self.future: asyncio.Future = loop.create_future()
+
+    def hand_over(self, agent: Any) -> bool:
+        if self.future.done():
+            return False
+        try:
+            self.loop.call_soon_threadsafe(self._resolve, agent)
+        except RuntimeError:
+            # The waiter's loop is closed
+            return False
+        return True
+
+    def _resolve(self, agent: Any) -> None:
+        if self.future.done():
+            # Cancelled or timed out after the hand-over; pass the executor on
+            self.pool.checkin(agent)
+        else:
+            self.future.set_result(agent)
+
+
+class AgentPool:
+    """
+    Fixed-size pool of agent executors with thread-safe checkout.
+
+    Each executor is used by one task at a time; callers that find the pool
+    empty wait until one is returned or `timeout` expires. Waiters, sync and
+    async alike, are served in arrival order: a returned executor is handed
+    straight to the oldest waiter, so no waiter is passed over and async
+    waiters are woken on their own loop without polling.
+    """
+
+    def __init__(self, factory: Callable[[], Any], size: int):
+        self.size = size
+        self._idle: Deque[Any] = deque(factory() for _ in range(size))
+        self._waiters: Deque[Any] = deque()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def checkout(self, timeout: Optional[float] = None) -> Iterator[Any]:
+        """
+        Borrow an executor for the duration of the block.
+        
+        Raises:
+            TimeoutError: If no executor became free within `timeout` seconds
+        """
+        waiter = _ThreadWaiter()
+        agent = self._take_or_wait(waiter)
+        if agent is None:
+            if not waiter.ready.wait(timeout) and self._withdraw(waiter):
+                raise TimeoutError(f"No Pica agent became available within {timeout}s")
+            agent = waiter.agent
+        try:
+            yield agent
+        finally:
+            self.checkin(agent)
+
+    @asynccontextmanager
+    async def acheckout(self, timeout: Optional[float] = None) -> AsyncIterator[Any]:
+        """Async counterpart of checkout() that waits without blocking the event loop."""
+        waiter = _LoopWaiter(self, asyncio.get_running_loop())
+        agent = self._take_or_wait(waiter)
+        if agent is None:
+            try:
+                agent = await asyncio.wait_for(waiter.future, timeout)
+            except asyncio.TimeoutError:
+                # An executor handed over meanwhile is passed on by _LoopWaiter._resolve
+                self._withdraw(waiter)
+                raise TimeoutError(f"No Pica agent became available within {timeout}s")
+            except asyncio.CancelledError:
+                self._withdraw(waiter)
+                raise
+        try:
+            yield agent
+        finally:
+            self.checkin(agent)
+
+    def checkin(self, agent: Any) -> None:
+        """Return an executor: to the oldest waiter, or to the idle executors."""
+        with self._lock:
+            while self._waiters:
+                if self._waiters.popleft().hand_over(agent):
+                    return
+            self._idle.append(agent)
+
+    def available(self) -> int:
+        with self._lock:
+            return len(self._idle)
+
+    def _take_or_wait(self, waiter: Any) -> Optional[Any]:
+        """An idle executor, or None after queueing `waiter`."""
+        with self._lock:
+            if self._idle:
+                return self._idle.popleft()
+            self._waiters.append(waiter)
+            return None
+
+    def _withdraw(self, waiter: Any) -> bool:
+        """Stop waiting. Returns False if an executor was already handed to `waiter`."""
+        with self._lock:
+            try:
+                self._waiters.remove(waiter)
+                return True
+            except ValueError:
+                return False
+
+
+class _ScopedPicaClient(PicaClient):
+    """
+    PicaClient for a platform-scoped agent.
+
+    Skips the connector catalog fetch: the "Available Platforms" section it
+    feeds lists every platform Pica supports, which an agent limited to one
+    platform's connections has no use for and which would make its prompt
+    larger than the all-connectors agent's. Initializing therefore costs one
+    small request (the scoped connections) instead of two.
+    """
+
+    def _initialize_connection_definitions(self) -> None:
+        self.connection_definitions = []
+
+
+class ActionMethodRecorder(BaseCallbackHandler):
+    """
+    Records the HTTP methods of the Pica actions an agent executes during one
+    task, and how many tool calls failed.
+    """
+    
+    def __init__(self):
+        self.methods: List[str] = []
+        self.tool_errors = 0
+    
+    def on_tool_start(self, serialized, input_str, inputs=None, **kwargs):
+        name = (serialized or {}).get("name") or kwargs.get("name")
+        if name == "execute":
+            self.methods.append(str((inputs or {}).get("method") or "UNKNOWN").upper())
+    
+    def on_tool_end(self, output, **kwargs):
+        # Pica tools report failures as a JSON payload with "success": false
+        try:
+            payload = json.loads(str(getattr(output, "content", output)))
+        except ValueError:
+            return
+        if isinstance(payload, dict) and payload.get("success") is False:
+            self.tool_errors += 1
+    
+    def on_tool_error(self, error, **kwargs):
+        self.tool_errors += 1
+    
+    @property
+    def mutated(self) -> bool:
+        return any(method != "GET" for method in self.methods)
+
+
 class PicaAgentService:
     """
     Service class that provides proper Pica integration for Agno workflows.
@@ -29,7 +360,13 @@ class PicaAgentService:
                  model: str = "gpt-4o",
                  temperature: float = 0,
                  server_url: str = "https://api.picaos.com",
-                 verbose: bool = True):
+                 verbose: bool = True,
+                 pool_size: Optional[int] = None,
+                 scoped_pool_size: Optional[int] = None,
+                 checkout_timeout: float = 120,
+                 action_top_k: Optional[int] = None,
+                 agent_mode: Optional[str] = None,
+                 tool_concurrency: Optional[int] = None):
         """
         Initialize the Pica agent service.
         
@@ -40,10 +377,35 @@ class PicaAgentService:
             temperature: LLM temperature setting
             server_url: Pica server URL
             verbose: Enable verbose logging
+            pool_size: Number of agent executors that can run tasks at once
+                (default: PICA_AGENT_POOL_SIZE, or 4)
+            scoped_pool_size: Executors per platform-scoped agent
+                (default: PICA_SCOPED_POOL_SIZE, or 2)
+            checkout_timeout: Seconds a task waits for a free executor
+            action_top_k: Number of pre-selected actions given to the agent with
+                each task (default: PICA_ACTION_TOP_K, or 5; 0 disables)
+            agent_mode: "functions" for one tool call per model turn, or "parallel"
+                to run several tool calls from one model response concurrently
+                (default: PICA_AGENT_MODE, or "functions")
+            tool_concurrency: Maximum concurrent tool calls in "parallel" mode
+                (default: PICA_TOOL_CONCURRENCY, or 4)
+        
+        The HTTP timeout for direct action calls comes from PICA_HTTP_TIMEOUT
+        (default 30 seconds). Results of read-only tasks are cached for
+        PICA_TASK_CACHE_TTL seconds (default 300), up to PICA_TASK_CACHE_SIZE
+        entries (default 128; 0 disables). Action output given to LLMs is
+        compacted to about PICA_OUTPUT_MAX_CHARS characters (default 4000;
+        0 disables), keeping PICA_OUTPUT_MAX_ITEMS items per list (default 10).
         """
         self.pica_secret = pica_secret or os.getenv("PICA_SECRET")
         self.openai_api_key = openai_api_key or os.getenv("OPENAI_API_KEY")
         self.verbose = verbose
+        self.server_url = server_url
+        self.checkout_timeout = checkout_timeout
+        self.agent_mode = (agent_mode or os.getenv("PICA_AGENT_MODE", "functions")).lower()
+        self.tool_concurrency = tool_concurrency or int(os.getenv("PICA_TOOL_CONCURRENCY", "4"))
+        self.http_timeout = float(os.getenv("PICA_HTTP_TIMEOUT", "30"))
+        self.scoped_pool_size = scoped_pool_size or int(os.getenv("PICA_SCOPED_POOL_SIZE", "2"))
         
         if not self.pica_secret:
             raise ValueError("PICA_SECRET is required but not found in environment variables")
@@ -51,6 +413,40 @@ class PicaAgentService:
         if not self.openai_api_key:
             raise ValueError("OPENAI_API_KEY is required but not found in environment variables")
         
+        if self.agent_mode not in ("functions", "parallel"):
+            raise ValueError(f"Unknown PICA_AGENT_MODE: {self.agent_mode} (expected 'functions' or 'parallel')")
+        
+        # Shared connection pool for direct (non-LLM) calls to the Pica API
+        self.http = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=20)
+        self.http.mount("https://", adapter)
+        self.http.mount("http://", adapter)
+        
+        self.connection_probe = ConnectionProbe(
+            self.pica_secret,
+            server_url=server_url,
+            ttl=float(os.getenv("PICA_CONNECTION_CACHE_TTL", "300")),
+            session=self.http
+        )
+        
+        self.action_top_k = action_top_k if action_top_k is not None else int(os.getenv("PICA_ACTION_TOP_K", "5"))
+        self.action_index = ActionCatalogIndex(
+            self.pica_secret,
+            server_url=server_url,
+            path=os.getenv("PICA_ACTION_INDEX_PATH", "tmp/pica_action_index.json"),
+            session=self.http
+        )
+        
+        self.compactor = OutputCompactor(
+            max_chars=int(os.getenv("PICA_OUTPUT_MAX_CHARS", "4000")),
+            max_items=int(os.getenv("PICA_OUTPUT_MAX_ITEMS", "10"))
+        )
+        
+        self.task_cache = TaskResultCache(
+            max_entries=int(os.getenv("PICA_TASK_CACHE_SIZE", "128")),
+            ttl_seconds=float(os.getenv("PICA_TASK_CACHE_TTL", "300"))
+        )
+        
         self.pica_client = PicaClient(
             secret=self.pica_secret,
             options=PicaClientOptions(
@@ -65,38 +461,259 @@ class PicaAgentService:
             openai_api_key=self.openai_api_key
         )
         
-        self.pica_agent = create_pica_agent(
-            client=self.pica_client,
-            llm=self.llm,
-            agent_type=AgentType.OPENAI_FUNCTIONS,
-            verbose=self.verbose
+        # Executors share the client, the LLM and the tools; only the executor
+        # itself is checked out, so tasks never share one concurrently
+        self.pica_tools = self._wrap_tools(self.pica_client)
+        self.agent_pool = AgentPool(
+            lambda: self._create_agent(self.pica_client, self.pica_tools),
+            size=pool_size or int(os.getenv("PICA_AGENT_POOL_SIZE", "4"))
+        )
+        
+        # Agents limited to one platform's connections, keyed by connection keys
+        self._scoped_pools: Dict[Tuple[str, ...], AgentPool] = {}
+        self._scoped_pools_lock = threading.Lock()
+    
+    def _wrap_tools(self, client: PicaClient) -> List[BaseTool]:
+        """Pica tools for an agent, with compacted output from the execute tool."""
+        return [
+            _offload_async(tool, self._compact_execute_output if tool.name == "execute" else None)
+            for tool in get_tools_from_client(client)
+        ]
+    
+    def _compact_execute_output(self, output: str, arguments: Dict[str, Any]) -> str:
+        """Shrink the JSON an execute call returns before the agent sees it."""
+        if not self.compactor.enabled or len(output) <= self.compactor.max_chars:
+            return output
+        platform = arguments.get("platform")
+        try:
+            response = json.loads(output)
+        except ValueError:
+            return self.compactor.compact_text(output, platform)
+        if not isinstance(response, dict):
+            return self.compactor.compact_text(output, platform)
+        
+        # The echoed request adds nothing the agent does not already know
+        response.pop("request_config", None)
+        if "data" in response:
+            response["data"] = self.compactor.compact(response["data"], platform)
+        return json.dumps(response, default=str)
+    
+    def get_full_payload(self, ref: str) -> Optional[Any]:
+        """
+        Get the full payload behind a compacted output.
+        
+        Args:
+            ref: The `_full_payload_ref` value (or "full output" reference) of a compact output
+            
+        Returns:
+            The original payload, or None if it has been evicted
+        """
+        return self.compactor.store.get(ref)
+    
+    def _create_agent(self, client: PicaClient, tools: List[BaseTool]):
+        """Build one Pica agent executor (equivalent to pica_langchain's create_pica_agent)."""
+        if self.agent_mode == "parallel":
+            return create_parallel_agent(
+                self.llm,
+                tools,
+                client.system,
+                max_concurrency=self.tool_concurrency,
+                verbose=self.verbose
+            )
+        return initialize_agent(
+            tools,
+            self.llm,
+            agent=AgentType.OPENAI_FUNCTIONS,
+            verbose=self.verbose,
+            agent_kwargs={"system_message": client.system}
+        )
+    
+    def _pool_for(self, platform: Optional[str]) -> AgentPool:
+        """
+        Get the agent pool for a task on `platform`.
+        
+        An agent scoped to the platform's connections has them in its system
+        prompt (the all-connectors client is never initialized, so its prompt
+        lists none) and no platform catalog, so the scoped prompt is only a
+        line per connection longer than the all-connectors one. Scoped pools
+        are built on first use and cached per connection set; tasks without a
+        platform, or for a platform with no active connection, use the
+        all-connectors pool.
+        """
+        if not platform:
+            return self.agent_pool
+        
+        connection_keys = tuple(sorted(self.connection_probe.connection_keys(platform.lower())))
+        if not connection_keys:
+            return self.agent_pool
+        
+        with self._scoped_pools_lock:
+            pool = self._scoped_pools.get(connection_keys)
+        if pool is not None:
+            return pool
+        
+        # Initializing the client is a network round trip, so build the pool
+        # outside the lock and keep whichever pool was inserted first
+        client = _ScopedPicaClient(
+            secret=self.pica_secret,
+            options=PicaClientOptions(
+                connectors=list(connection_keys),
+                server_url=self.server_url
+            )
         )
+        client.initialize()
+        tools = self._wrap_tools(client)
+        pool = AgentPool(lambda: self._create_agent(client, tools), size=self.scoped_pool_size)
+        if self.verbose:
+            print(f"🎯 Scoped {platform} agent: {len(client.system)} prompt chars "
+                  f"(all-connectors agent: {len(self.pica_client.system)})")
+        with self._scoped_pools_lock:
+            return self._scoped_pools.setdefault(connection_keys, pool)
     
-    def execute_task(self, task_description: str) -> Dict[str, Any]:
+    def _prepare_input(self, task_description: str, platform: Optional[str]) -> str:
+        """
+        Add the best-matching actions from the local catalog to the agent's input,
+        so it can skip the get_available_actions discovery round trips.
+        """
+        if self.action_top_k <= 0:
+            return task_description
+        
+        try:
+            platforms = [platform.lower()] if platform else self.connection_probe.get()["connected_platforms"]
+            self.action_index.ensure(platforms)
+            actions = self.action_index.search(task_description, platforms, k=self.action_top_k)
+        except Exception:
+            return task_description
+        
+        if not actions:
+            return task_description
+        
+        return f"{task_description}\n\n" \
+               f"Relevant Pica actions for this task (use these action ids directly " \
+               f"instead of searching for available actions):\n" \
+               f"{self.action_index.format_for_prompt(actions)}"
+    
+    def _cached_result(self, task_description: str, platform: Optional[str], kind: str) -> Optional[Dict[str, Any]]:
+        """Serve a read-only task from the result cache, if possible."""
+        if kind != "read":
+            return None
+        cached = self.task_cache.get(task_description, platform)
+        if cached is not None:
+            if self.verbose:
+                print(f"♻️ Using cached result for Pica task: {task_description[:100]}")
+            cached["cached"] = True
+            cached["usage"] = TokenUsage().to_dict()
+        return cached
+    
+    def _record_result(self,
+                       task_description: str,
+                       platform: Optional[str],
+                       kind: str,
+                       recorder: ActionMethodRecorder,
+                       response: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Cache a successful read, or invalidate the platform after a successful write.
+        
+        A task classified as a read that still executed a non-GET action is
+        treated as a write. Reads during which a tool call failed are not
+        cached, since the agent's answer may just describe the failure.
+        """
+        if kind == "write" or recorder.mutated:
+            self.task_cache.invalidate(platform)
+        elif response.get("success") and not recorder.tool_errors:
+            self.task_cache.put(task_description, platform, response)
+        return response
+    
+    def execute_task(self, task_description: str, platform: Optional[str] = None) -> Dict[str, Any]:
         """
         Execute a task through Pica's platform integrations.
         
         Args:
             task_description: Natural language description of the task to execute
+            platform: Pica platform the task targets (e.g. "gmail"); scopes the
+                agent to that platform's connections
             
         Returns:
-            Dictionary containing the execution result and metadata
+            Dictionary containing the execution result and metadata, including token usage
         """
+        kind = classify_task(task_description)
+        cached = self._cached_result(task_description, platform, kind)
+        if cached is not None:
+            return cached
+        
+        recorder = ActionMethodRecorder()
+        usage = UsageCallbackHandler(model=getattr(self.llm, "model_name", None))
         try:
             if self.verbose:
                 print(f"🔄 Executing Pica task: {task_description[:100]}...")
             
-            result = self.pica_agent.invoke({"input": task_description})
+            agent_input = self._prepare_input(task_description, platform)
+            with self._pool_for(platform).checkout(timeout=self.checkout_timeout) as agent:
+                result = agent.invoke({"input": agent_input}, config={"callbacks": [recorder, usage, LLMRateLimitCallbackHandler()]})
             
             if self.verbose:
                 print("✅ Pica task completed successfully")
             
-            return {
+            return self._record_result(task_description, platform, kind, recorder, {
                 "success": True,
                 "result": result,
                 "task": task_description,
-                "execution_method": "pica_langchain"
+                "execution_method": "pica_langchain",
+                "usage": usage.usage.to_dict()
+            })
+            
+        except Exception as e:
+            error_msg = str(e)
+            if self.verbose:
+                print(f"❌ Pica task failed: {error_msg}")
+                
+            return {
+                "success": False,
+                "error": error_msg,
+                "task": task_description,
+                "execution_method": "pica_langchain",
+                "usage": usage.usage.to_dict()
             }
+    
+    async def aexecute_task(self, task_description: str, platform: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Execute a task through Pica's platform integrations without blocking the event loop.
+        
+        Many calls can run concurrently, up to the size of the agent pool.
+        
+        Args:
+            task_description: Natural language description of the task to execute
+            platform: Pica platform the task targets; see execute_task
+            
+        Returns:
+            Dictionary containing the execution result and metadata, including token usage
+        """
+        kind = classify_task(task_description)
+        cached = self._cached_result(task_description, platform, kind)
+        if cached is not None:
+            return cached
+        
+        recorder = ActionMethodRecorder()
+        usage = UsageCallbackHandler(model=getattr(self.llm, "model_name", None))
+        try:
+            if self.verbose:
+                print(f"🔄 Executing Pica task: {task_description[:100]}...")
+            
+            agent_input = await asyncio.to_thread(self._prepare_input, task_description, platform)
+            pool = await asyncio.to_thread(self._pool_for, platform)
+            async with pool.acheckout(timeout=self.checkout_timeout) as agent:
+                result = await agent.ainvoke({"input": agent_input}, config={"callbacks": [recorder, usage, LLMRateLimitCallbackHandler()]})
+            
+            if self.verbose:
+                print("✅ Pica task completed successfully")
+            
+            return self._record_result(task_description, platform, kind, recorder, {
+                "success": True,
+                "result": result,
+                "task": task_description,
+                "execution_method": "pica_langchain",
+                "usage": usage.usage.to_dict()
+            })
             
         except Exception as e:
             error_msg = str(e)
@@ -107,9 +724,129 @@ class PicaAgentService:
                 "success": False,
                 "error": error_msg,
                 "task": task_description,
-                "execution_method": "pica_langchain"
+                "execution_method": "pica_langchain",
+                "usage": usage.usage.to_dict()
             }
     
+    def find_actions(self, platform: str, query: str, k: int = 5) -> List[Dict[str, Any]]:
+        """
+        Search the local action catalog of a platform without involving the LLM.
+        
+        Args:
+            platform: Pica platform (e.g. "gmail")
+            query: What the action should do
+            k: Maximum number of actions to return
+            
+        Returns:
+            Matching action summaries (id, title, method, path, parameters), best first
+        """
+        platform = platform.lower()
+        self.action_index.ensure([platform])
+        return self.action_index.search(query, [platform], k=k)
+    
+    def execute_action(self,
+                       platform: str,
+                       action_id: str,
+                       params: Optional[Dict[str, Any]] = None,
+                       query_params: Optional[Dict[str, Any]] = None,
+                       connection_key: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Execute a known Pica action directly, in a single passthrough request.
+        
+        For fully specified operations (e.g. "send this email to this address")
+        this skips the agent and its LLM round trips entirely.
+        
+        Args:
+            platform: Pica platform the action belongs to (e.g. "gmail")
+            action_id: Pica action id
+            params: Request body; values for the action's path variables
+                (e.g. userId) are taken from here as well
+            query_params: Optional query string parameters
+            connection_key: Connection to use (default: the platform's first
+                active connection)
+            
+        Returns:
+            Dictionary containing the execution result and metadata
+        """
+        platform = platform.lower()
+        task = f"{platform} action {action_id}"
+        try:
+            action = self.action_index.get_action(action_id, platform)
+            if action is None:
+                raise ValueError(f"Unknown {platform} action: {action_id}")
+            task = f"{action['title']} ({platform})"
+            
+            if connection_key is None:
+                keys = self.connection_probe.connection_keys(platform)
+                if not keys:
+                    raise ValueError(f"Connection not found. Please add a {platform} connection first.")
+                connection_key = keys[0]
+            
+            body = dict(params or {})
+            path_variables = {name: body.pop(name) for name in action["parameters"] if name in body}
+            path = self.action_index.build_path(action, path_variables)
+            if "custom" in action["tags"]:
+                body["connectionKey"] = connection_key
+            
+            if self.verbose:
+                print(f"⚡ Executing Pica action directly: {task}")
+            
+            rate_limited("pica")
+            response = self.http.request(
+                action["method"] or "GET",
+                f"{self.server_url}/v1/passthrough{path if path.startswith('/') else '/' + path}",
+                headers={
+                    "x-pica-secret": self.pica_secret,
+                    "x-pica-connection-key": connection_key,
+                    "x-pica-action-id": action_id,
+                },
+                params=query_params,
+                json=body if body and action["method"] != "GET" else None,
+                timeout=self.http_timeout
+            )
+            response.raise_for_status()
+            try:
+                data = response.json()
+            except ValueError:
+                data = response.text
+            
+            if action["method"] != "GET":
+                self.task_cache.invalidate(platform)
+            
+            return {
+                "success": True,
+                "result": data,
+                "task": task,
+                "platform": platform,
+                "action_id": action_id,
+                "execution_method": "direct_action"
+            }
+            
+        except Exception as e:
+            error_msg = str(e)
+            if self.verbose:
+                print(f"❌ Pica action failed: {error_msg}")
+                
+            return {
+                "success": False,
+                "error": error_msg,
+                "task": task,
+                "platform": platform,
+                "action_id": action_id,
+                "execution_method": "direct_action"
+            }
+    
+    async def aexecute_action(self,
+                              platform: str,
+                              action_id: str,
+                              params: Optional[Dict[str, Any]] = None,
+                              query_params: Optional[Dict[str, Any]] = None,
+                              connection_key: Optional[str] = None) -> Dict[str, Any]:
+        """Async counterpart of execute_action."""
+        return await asyncio.to_thread(
+            self.execute_action, platform, action_id, params, query_params, connection_key
+        )
+    
     def execute_email_task(self, task_description: str) -> str:
         """
         Execute an email-related task through Gmail integration.
@@ -123,7 +860,7 @@ class PicaAgentService:
         if "gmail" not in task_description.lower():
             task_description += " using Gmail"
             
-        result = self.execute_task(task_description)
+        result = self.execute_task(task_description, platform="gmail")
         return self._format_task_result(result, "Email")
     
     def execute_task_management(self, task_description: str) -> str:
@@ -137,12 +874,13 @@ class PicaAgentService:
             Formatted result string
         """
         platforms = ["linear", "notion"]
-        has_platform = any(platform in task_description.lower() for platform in platforms)
+        platform = next((p for p in platforms if p in task_description.lower()), None)
         
-        if not has_platform:
+        if not platform:
+            platform = "linear"
             task_description += " using Linear"
             
-        result = self.execute_task(task_description)
+        result = self.execute_task(task_description, platform=platform)
         return self._format_task_result(result, "Task Management")
     
     def execute_data_operation(self, task_description: str) -> str:
@@ -156,12 +894,13 @@ class PicaAgentService:
             Formatted result string
         """
         platforms = ["airtable", "notion", "google-sheets"]
-        has_platform = any(platform in task_description.lower() for platform in platforms)
+        platform = next((p for p in platforms if p in task_description.lower()), None)
         
-        if not has_platform:
+        if not platform:
+            platform = "airtable"
             task_description += " using Airtable"
             
-        result = self.execute_task(task_description)
+        result = self.execute_task(task_description, platform=platform)
         return self._format_task_result(result, "Data Operation")
     
     def execute_calendar_task(self, task_description: str) -> str:
@@ -177,7 +916,7 @@ class PicaAgentService:
         if "google calendar" not in task_description.lower() and "calendar" not in task_description.lower():
             task_description += " using Google Calendar"
             
-        result = self.execute_task(task_description)
+        result = self.execute_task(task_description, platform="google-calendar")
         return self._format_task_result(result, "Calendar")
     
     def _format_task_result(self, result: Dict[str, Any], task_type: str) -> str:
@@ -193,7 +932,12 @@ class PicaAgentService:
         """
         if result["success"]:
             task_result = result.get("result", {})
-            output = task_result.get("output", "") if isinstance(task_result, dict) else str(task_result)
+            if result.get("execution_method") == "direct_action":
+                compacted = self.compactor.compact(task_result, result.get("platform"))
+                output = json.dumps(compacted, default=str) if isinstance(compacted, (dict, list)) else str(compacted)
+            else:
+                output = task_result.get("output", "") if isinstance(task_result, dict) else str(task_result)
+                output = self.compactor.compact_text(output)
             
             return f"✅ {task_type} task completed successfully\n" \
                    f"Task: {result['task']}\n" \
@@ -210,43 +954,52 @@ class PicaAgentService:
         Returns:
             Dictionary with platform connection information
         """
-        try:
-            
+        status = self.connection_probe.get()
+        if status["success"]:
             return {
                 "success": True,
-                "connected_platforms": [],  
-                "platform_count": 0,
-                "message": "Connected platforms available through Pica client"
-            }
-        except Exception as e:
-            return {
-                "success": False,
-                "error": str(e),
-                "connected_platforms": [],
-                "platform_count": 0
+                "connected_platforms": status["connected_platforms"],
+                "platform_count": status["platform_count"],
+                "message": f"{status['platform_count']} platforms connected through Pica"
             }
+        return {
+            "success": False,
+            "error": status["error"],
+            "connected_platforms": [],
+            "platform_count": 0
+        }
     
-    def test_connection(self) -> Dict[str, Any]:
+    def test_connection(self, force_refresh: bool = False) -> Dict[str, Any]:
         """
         Test the Pica connection and return status.
         
+        Probes the Pica connections API directly rather than running an agent
+        task; the result is cached (see ConnectionProbe).
+        
+        Args:
+            force_refresh: Bypass the cached probe result
+        
         Returns:
             Dictionary with connection test results
         """
         try:
-            test_result = self.execute_task("List available platforms and connections")
+            status = self.connection_probe.get(force_refresh=force_refresh)
             
             return {
-                "success": test_result["success"],
+                "success": status["success"],
+                "error": status["error"],
+                "connected_platforms": status["connected_platforms"],
+                "platform_count": status["platform_count"],
                 "pica_secret_configured": bool(self.pica_secret),
                 "openai_configured": bool(self.openai_api_key),
-                "agent_created": bool(self.pica_agent),
-                "test_result": test_result
+                "agent_created": self.agent_pool.size > 0
             }
         except Exception as e:
             return {
                 "success": False,
                 "error": str(e),
+                "connected_platforms": [],
+                "platform_count": 0,
                 "pica_secret_configured": bool(self.pica_secret),
                 "openai_configured": bool(self.openai_api_key),
                 "agent_created": False
@@ -254,12 +1007,15 @@ class PicaAgentService:
 
 
 _pica_service = None
+_pica_service_lock = threading.Lock()
 
 def get_pica_service() -> PicaAgentService:
-    """Get or create the global Pica agent service instance."""
+    """Get or create the global Pica agent service instance (thread-safe)."""
     global _pica_service
     if _pica_service is None:
-        _pica_service = PicaAgentService()
+        with _pica_service_lock:
+            if _pica_service is None:
+                _pica_service = PicaAgentService()
     return _pica_service
 
 
@@ -269,7 +1025,8 @@ def execute_pica_task(task_description: str, platform_hint: Optional[str] = None
     
     Args:
         task_description: Natural language task description
-        platform_hint: Optional platform preference
+        platform_hint: Optional platform preference; also scopes the agent
+            to that platform's connections
         
     Returns:
         Formatted result string
@@ -281,13 +1038,104 @@ def execute_pica_task(task_description: str, platform_hint: Optional[str] = None
             if platform_hint.lower() not in task_description.lower():
                 task_description += f" using {platform_hint}"
         
-        result = service.execute_task(task_description)
+        result = service.execute_task(task_description, platform=platform_hint)
         return service._format_task_result(result, "Platform Task")
         
     except Exception as e:
         return f"❌ Failed to execute Pica task: {str(e)}"
 
 
+async def aexecute_pica_task(task_description: str, platform_hint: Optional[str] = None) -> str:
+    """
+    Async counterpart of execute_pica_task.
+    
+    Args:
+        task_description: Natural language task description
+        platform_hint: Optional platform preference; also scopes the agent
+            to that platform's connections
+        
+    Returns:
+        Formatted result string
+    """
+    try:
+        service = await asyncio.to_thread(get_pica_service)
+        
+        if platform_hint:
+            if platform_hint.lower() not in task_description.lower():
+                task_description += f" using {platform_hint}"
+        
+        result = await service.aexecute_task(task_description, platform=platform_hint)
+        return service._format_task_result(result, "Platform Task")
+        
+    except Exception as e:
+        return f"❌ Failed to execute Pica task: {str(e)}"
+
+
+def execute_pica_action(platform: str, action_id: str, params: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Convenience function to execute a known Pica action using the global service instance.
+    
+    Args:
+        platform: Pica platform the action belongs to
+        action_id: Pica action id
+        params: Request body, including any path variables
+        
+    Returns:
+        Formatted result string
+    """
+    try:
+        service = get_pica_service()
+        result = service.execute_action(platform, action_id, params)
+        return service._format_task_result(result, "Platform Action")
+        
+    except Exception as e:
+        return f"❌ Failed to execute Pica action: {str(e)}"
+
+
+async def aexecute_pica_action(platform: str, action_id: str, params: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Async counterpart of execute_pica_action.
+    
+    Args:
+        platform: Pica platform the action belongs to
+        action_id: Pica action id
+        params: Request body, including any path variables
+    
+    Returns:
+        Formatted result string
+    """
+    try:
+        service = await asyncio.to_thread(get_pica_service)
+        result = await service.aexecute_action(platform, action_id, params)
+        return service._format_task_result(result, "Platform Action")
+    
+    except Exception as e:
+        return f"❌ Failed to execute Pica action: {str(e)}"
+
+
+def find_pica_actions(platform: str, query: str, k: int = 5) -> str:
+    """
+    Convenience function to search a platform's Pica actions using the global service instance.
+    
+    Args:
+        platform: Pica platform to search
+        query: What the action should do
+        k: Maximum number of actions to return
+        
+    Returns:
+        Formatted list of matching actions
+    """
+    try:
+        service = get_pica_service()
+        actions = service.find_actions(platform, query, k=k)
+        if not actions:
+            return f"No {platform} actions found for: {query}"
+        return service.action_index.format_for_prompt(actions)
+        
+    except Exception as e:
+        return f"❌ Failed to search Pica actions: {str(e)}"
+
+
 def test_pica_connection() -> Dict[str, Any]:
     """
     Test Pica connection using the global service instance.
@@ -301,8 +1149,8 @@ def test_pica_connection() -> Dict[str, Any]:
         
         return {
             "success": connection_result["success"],
-            "connected_platforms": [],  
-            "platform_count": 0, 
+            "connected_platforms": connection_result.get("connected_platforms", []),
+            "platform_count": connection_result.get("platform_count", 0),
             "pica_secret_configured": connection_result.get("pica_secret_configured", False),
             "openai_configured": connection_result.get("openai_configured", False),
             "agent_created": connection_result.get("agent_created", False),
@@ -0,0 +1,153 @@
+"""
+Compaction of Pica action output before it re-enters an LLM context
+
+Raw action responses (full Gmail message lists, Airtable record dumps) are
+passed back to the Pica agent as tool output, and the agent's answer is then
+repeated into the workflow agents' prompts. Every later model turn pays for
+those tokens. This module shrinks them in three ways:
+
+- list items are projected to the fields that matter for their platform
+- long lists are cut to a few items plus a count of what was left out
+- long strings and the overall JSON are held to a character budget
+
+The untouched payload is kept in a PayloadStore, and the compact version
+carries its reference, so callers that need the full data can still get it.
+"""
+
+import json
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+# Fields kept for records in list responses, per platform. Records without
+# any of these fields are left as they are.
+PLATFORM_PROJECTIONS: Dict[str, Tuple[str, ...]] = {
+    "gmail": ("id", "threadId", "snippet", "subject", "from", "to", "date", "labelIds"),
+    "linear": ("id", "identifier", "title", "name", "key", "state", "priority", "assignee", "url", "dueDate"),
+    "notion": ("id", "object", "url", "title", "created_time", "last_edited_time", "parent"),
+    "airtable": ("id", "name", "createdTime", "fields"),
+    "google-calendar": ("id", "summary", "start", "end", "status", "htmlLink", "attendees"),
+    "google-sheets": ("spreadsheetId", "properties", "range", "values"),
+}
+
+REF_KEY = "_full_payload_ref"
+
+
+class PayloadStore:
+    """Thread-safe LRU store of full payloads, addressed by reference strings."""
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._payloads: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, payload: Any) -> str:
+        ref = f"payload:{uuid.uuid4().hex[:16]}"
+        with self._lock:
+            self._payloads[ref] = payload
+            while len(self._payloads) > self.max_entries:
+                self._payloads.popitem(last=False)
+        return ref
+
+    def get(self, ref: str) -> Optional[Any]:
+        with self._lock:
+            payload = self._payloads.get(ref)
+            if payload is not None:
+                self._payloads.move_to_end(ref)
+            return payload
+
+
+class OutputCompactor:
+    """
+    Projects, truncates and size-limits action payloads.
+    """
+
+    def __init__(self,
+                 max_chars: int = 4000,
+                 max_items: int = 10,
+                 max_string: int = 500,
+                 store: Optional[PayloadStore] = None):
+        """
+        Args:
+            max_chars: Size budget for the serialized compact payload (0 disables compaction)
+            max_items: Items kept from each list
+            max_string: Characters kept from each string value
+            store: Where full payloads are kept for later retrieval
+        """
+        self.max_chars = max_chars
+        self.max_items = max_items
+        self.max_string = max_string
+        self.store = store or PayloadStore()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_chars > 0
+
+    def compact(self, payload: Any, platform: Optional[str] = None) -> Any:
+        """
+        Compact a payload, storing the original when anything was dropped.
+
+        Returns:
+            The payload itself if it already fits, otherwise a compact copy
+            (a dict payload gets a `_full_payload_ref` key; other payloads are
+            wrapped as {"data": ..., "_full_payload_ref": ...})
+        """
+        if not self.enabled or _size(payload) <= self.max_chars:
+            return payload
+
+        projection = PLATFORM_PROJECTIONS.get((platform or "").lower())
+        max_items, max_string = self.max_items, self.max_string
+        compacted = self._shrink(payload, projection, max_items, max_string)
+        # Tighten the limits until the result fits the budget
+        while _size(compacted) > self.max_chars and (max_items > 1 or max_string > 50):
+            max_items = max(1, max_items // 2)
+            max_string = max(50, max_string // 2)
+            compacted = self._shrink(payload, projection, max_items, max_string)
+
+        ref = self.store.put(payload)
+        if _size(compacted) > self.max_chars:
+            text = json.dumps(compacted, default=str)
+            compacted = {"truncated_json": text[:self.max_chars] + f"…[+{len(text) - self.max_chars} chars]"}
+        if isinstance(compacted, dict):
+            return {**compacted, REF_KEY: ref}
+        return {"data": compacted, REF_KEY: ref}
+
+    def compact_text(self, text: str, platform: Optional[str] = None) -> str:
+        """Compact a JSON document given as text; other text is only size-limited."""
+        if not self.enabled or len(text) <= self.max_chars:
+            return text
+        try:
+            payload = json.loads(text)
+        except ValueError:
+            ref = self.store.put(text)
+            return f"{text[:self.max_chars]}…[+{len(text) - self.max_chars} chars, full output: {ref}]"
+        return json.dumps(self.compact(payload, platform), default=str)
+
+    def _shrink(self, value: Any, projection: Optional[Tuple[str, ...]], max_items: int, max_string: int) -> Any:
+        if isinstance(value, dict):
+            return {k: self._shrink(v, projection, max_items, max_string) for k, v in value.items()}
+        if isinstance(value, list):
+            items = [
+                self._shrink(_project(item, projection), projection, max_items, max_string)
+                for item in value[:max_items]
+            ]
+            if len(value) > max_items:
+                items.append({"_truncated": f"{len(value) - max_items} more items ({len(value)} total)"})
+            return items
+        if isinstance(value, str) and len(value) > max_string:
+            return f"{value[:max_string]}…[+{len(value) - max_string} chars]"
+        return value
+
+
+def _project(item: Any, projection: Optional[Tuple[str, ...]]) -> Any:
+    if not projection or not isinstance(item, dict):
+        return item
+    projected = {key: item[key] for key in projection if key in item}
+    return projected or item
+
+
+def _size(payload: Any) -> int:
+    if isinstance(payload, str):
+        return len(payload)
+    return len(json.dumps(payload, default=str))
@@ -0,0 +1,392 @@
+"""
+PicaJobQueue - Background execution of long-running Pica tasks
+
+A Pica task can take tens of seconds, and execute_task blocks its caller the
+whole time. Jobs let a workflow hand the task off and keep going: submit()
+returns a job id at once, a bounded pool of worker threads runs the jobs,
+and callers poll status()/wait() or register a completion callback.
+
+Job state lives in SQLite, so jobs survive a restart. Queued jobs are picked
+up again on startup. A job that was already running when the process died
+is only re-run if it is safe to repeat (a read-only task); otherwise it is
+marked failed, since the platform may already have seen part of it.
+
+A job runs under the usage tracker of the workflow run that submitted it
+(see usage_tracking.py), so its LLM tokens count against that run's token
+budget. Submitting is refused once the budget is spent. Jobs resumed after a
+restart have no tracker.
+"""
+
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Dict, Any, Callable, List, Optional
+
+from pica_agent_service import get_pica_service
+from pica_task_cache import classify_task
+from usage_tracking import UsageTracker, current_tracker, tracking_scope
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+_FINISHED = (SUCCEEDED, FAILED)
+_STOP = object()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pica_jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    idempotent INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    result TEXT,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_pica_jobs_status ON pica_jobs (status, created_at);
+"""
+
+
+class JobStore:
+    """SQLite persistence for job state."""
+
+    def __init__(self, path: str = "tmp/pica_jobs.db"):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+
+    def insert(self, job_id: str, kind: str, payload: Dict[str, Any], idempotent: bool) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO pica_jobs (id, kind, payload, idempotent, status, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, kind, json.dumps(payload, default=str), int(idempotent), QUEUED, time.time())
+            )
+
+    def claim(self, job_id: str) -> bool:
+        """
+        Move a queued job to running.
+
+        Returns:
+            False if the job was not queued anymore (e.g. another process
+            sharing the database claimed it first)
+        """
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "UPDATE pica_jobs SET status = ?, started_at = ?, attempts = attempts + 1 "
+                "WHERE id = ? AND status = ?",
+                (RUNNING, time.time(), job_id, QUEUED)
+            )
+        return cursor.rowcount == 1
+
+    def finish(self, job_id: str, status: str, result: Any = None, error: Optional[str] = None) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE pica_jobs SET status = ?, result = ?, error = ?, finished_at = ? WHERE id = ?",
+                (status, json.dumps(result, default=str) if result is not None else None,
+                 error, time.time(), job_id)
+            )
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM pica_jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_dict(row) if row else None
+
+    def recover(self) -> List[str]:
+        """
+        Prepare unfinished jobs after a restart.
+
+        Returns:
+            Ids of the jobs to run again, oldest first
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE pica_jobs SET status = ?, error = ?, finished_at = ? "
+                "WHERE status = ? AND idempotent = 0",
+                (FAILED, "Interrupted by a restart; not retried because it may have partially run",
+                 time.time(), RUNNING)
+            )
+            self._conn.execute("UPDATE pica_jobs SET status = ? WHERE status = ?", (QUEUED, RUNNING))
+            rows = self._conn.execute(
+                "SELECT id FROM pica_jobs WHERE status = ? ORDER BY created_at", (QUEUED,)
+            ).fetchall()
+        return [row["id"] for row in rows]
+
+    def purge(self, older_than: float) -> int:
+        """Delete finished jobs older than `older_than` seconds."""
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "DELETE FROM pica_jobs WHERE status IN (?, ?) AND finished_at < ?",
+                (*_FINISHED, time.time() - older_than)
+            )
+        return cursor.rowcount
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> Dict[str, Any]:
+        job = dict(row)
+        job["payload"] = json.loads(job["payload"])
+        job["result"] = json.loads(job["result"]) if job["result"] is not None else None
+        job["idempotent"] = bool(job["idempotent"])
+        return job
+
+
+class PicaJobQueue:
+    """
+    Runs Pica tasks and actions on a bounded pool of background workers.
+    """
+
+    def __init__(self,
+                 service,
+                 workers: int = 4,
+                 db_path: str = "tmp/pica_jobs.db",
+                 retention: float = 7 * 24 * 3600):
+        """
+        Initialize the queue and resume jobs left over from a previous run.
+
+        Args:
+            service: PicaAgentService that executes the jobs
+            workers: Number of jobs that run at once
+            db_path: SQLite file the job state is kept in
+            retention: Seconds finished jobs are kept before being purged
+        """
+        self.service = service
+        self.store = JobStore(db_path)
+        self.store.purge(retention)
+
+        self._pending: "queue.Queue[Any]" = queue.Queue()
+        self._callbacks: Dict[str, List[Callable[[Dict[str, Any]], None]]] = {}
+        self._done: Dict[str, threading.Event] = {}
+        # Usage tracker of the run that submitted each job (in memory only)
+        self._trackers: Dict[str, UsageTracker] = {}
+        self._lock = threading.Lock()
+        self._closed = False
+
+        for job_id in self.store.recover():
+            self._pending.put(job_id)
+
+        self._workers = [
+            threading.Thread(target=self._work, name=f"pica-job-worker-{i}", daemon=True)
+            for i in range(max(1, workers))
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def submit_task(self,
+                    task_description: str,
+                    platform: Optional[str] = None,
+                    callback: Optional[Callable[[Dict[str, Any]], None]] = None) -> str:
+        """
+        Queue a natural-language Pica task.
+
+        Args:
+            task_description: Task for the Pica agent
+            platform: Pica platform the task targets
+            callback: Called with the finished job (see status())
+
+        Returns:
+            The job id
+        """
+        payload = {"task_description": task_description, "platform": platform}
+        return self._submit("task", payload, classify_task(task_description) == "read", callback)
+
+    def submit_action(self,
+                      platform: str,
+                      action_id: str,
+                      params: Optional[Dict[str, Any]] = None,
+                      callback: Optional[Callable[[Dict[str, Any]], None]] = None) -> str:
+        """
+        Queue a direct Pica action (see PicaAgentService.execute_action).
+
+        Returns:
+            The job id
+        """
+        payload = {"platform": platform, "action_id": action_id, "params": params}
+        return self._submit("action", payload, False, callback)
+
+    def status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Current state of a job.
+
+        Returns:
+            Job dict with id, kind, payload, status (queued/running/succeeded/failed),
+            result, error and timestamps, or None if the job is unknown
+        """
+        return self.store.get(job_id)
+
+    def wait(self, job_id: str, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Block until a job finishes or `timeout` expires.
+
+        Returns:
+            The job dict, finished or not, or None if the job is unknown
+        """
+        with self._lock:
+            event = self._done.setdefault(job_id, threading.Event())
+        # Checked after registering the event so a job finishing in between is not missed
+        job = self.store.get(job_id)
+        if job is None or job["status"] in _FINISHED:
+            with self._lock:
+                self._done.pop(job_id, None)
+            return job
+        event.wait(timeout)
+        return self.store.get(job_id)
+
+    def add_callback(self, job_id: str, callback: Callable[[Dict[str, Any]], None]) -> None:
+        """Call `callback` with the job once it finishes (immediately if it already has)."""
+        with self._lock:
+            job = self.store.get(job_id)
+            if job is not None and job["status"] not in _FINISHED:
+                self._callbacks.setdefault(job_id, []).append(callback)
+                return
+        if job is not None:
+            self._run_callback(callback, job)
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Stop the workers after their current job; queued jobs resume on next start."""
+        if self._closed:
+            return
+        self._closed = True
+        for _ in self._workers:
+            self._pending.put(_STOP)
+        for worker in self._workers:
+            worker.join(timeout=timeout)
+        self.store.close()
+
+    def _submit(self, kind: str, payload: Dict[str, Any], idempotent: bool,
+                callback: Optional[Callable[[Dict[str, Any]], None]]) -> str:
+        if self._closed:
+            raise RuntimeError("Job queue is closed")
+        tracker = current_tracker()
+        if tracker is not None:
+            # Raises TokenBudgetExceeded; a spent budget starts no new work
+            tracker.check()
+        job_id = uuid.uuid4().hex
+        self.store.insert(job_id, kind, payload, idempotent)
+        with self._lock:
+            if callback is not None:
+                self._callbacks[job_id] = [callback]
+            if tracker is not None:
+                self._trackers[job_id] = tracker
+        self._pending.put(job_id)
+        return job_id
+
+    def _work(self) -> None:
+        while True:
+            job_id = self._pending.get()
+            if job_id is _STOP:
+                return
+            with self._lock:
+                tracker = self._trackers.pop(job_id, None)
+            job = self.store.get(job_id)
+            if job is None or job["status"] != QUEUED or not self.store.claim(job_id):
+                continue
+
+            try:
+                # The Pica agent's usage callbacks record into, and are stopped by, the submitting run's tracker
+                with tracking_scope(tracker):
+                    result = self._execute(job)
+                status = SUCCEEDED if result.get("success") else FAILED
+                self.store.finish(job_id, status, result=result, error=result.get("error"))
+            except Exception as e:
+                self.store.finish(job_id, FAILED, error=str(e))
+            self._complete(job_id)
+
+    def _execute(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        payload = job["payload"]
+        if job["kind"] == "action":
+            return self.service.execute_action(payload["platform"], payload["action_id"], payload.get("params"))
+        return self.service.execute_task(payload["task_description"], platform=payload.get("platform"))
+
+    def _complete(self, job_id: str) -> None:
+        with self._lock:
+            callbacks = self._callbacks.pop(job_id, [])
+            event = self._done.pop(job_id, None)
+        if event is not None:
+            event.set()
+        if callbacks:
+            job = self.store.get(job_id)
+            for callback in callbacks:
+                self._run_callback(callback, job)
+
+    @staticmethod
+    def _run_callback(callback: Callable[[Dict[str, Any]], None], job: Dict[str, Any]) -> None:
+        try:
+            callback(job)
+        except Exception as e:
+            print(f"⚠️ Pica job callback failed for {job['id']}: {e}")
+
+
+_job_queue = None
+_job_queue_lock = threading.Lock()
+
+
+def get_job_queue() -> PicaJobQueue:
+    """Get or create the global job queue (PICA_JOB_WORKERS, PICA_JOB_DB)."""
+    global _job_queue
+    if _job_queue is None:
+        with _job_queue_lock:
+            if _job_queue is None:
+                _job_queue = PicaJobQueue(
+                    get_pica_service(),
+                    workers=int(os.getenv("PICA_JOB_WORKERS", "4")),
+                    db_path=os.getenv("PICA_JOB_DB", "tmp/pica_jobs.db")
+                )
+    return _job_queue
+
+
+def submit_pica_task(task_description: str,
+                     platform_hint: Optional[str] = None,
+                     callback: Optional[Callable[[Dict[str, Any]], None]] = None) -> str:
+    """
+    Queue a Pica task on the global job queue.
+
+    Args:
+        task_description: Natural language task description
+        platform_hint: Optional platform the task targets
+        callback: Called with the finished job
+        
+    Returns:
+        The job id
+    """
+    if platform_hint and platform_hint.lower() not in task_description.lower():
+        task_description += f" using {platform_hint}"
+    return get_job_queue().submit_task(task_description, platform=platform_hint, callback=callback)
+
+
+def get_pica_job(job_id: str) -> str:
+    """
+    Describe the state of a queued Pica task for display.
+
+    Args:
+        job_id: Id returned by submit_pica_task
+        
+    Returns:
+        Formatted status string, including the result once the job has finished
+    """
+    job = get_job_queue().status(job_id)
+    if job is None:
+        return f"❌ Unknown Pica job: {job_id}"
+    if job["status"] not in _FINISHED:
+        return f"⏳ Pica job {job_id} is {job['status']}"
+    if job["result"] is not None:
+        return get_pica_service()._format_task_result(job["result"], "Background")
+    return f"❌ Background task failed\nError: {job['error']}"
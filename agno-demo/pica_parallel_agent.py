@@ -0,0 +1,166 @@
+"""
+Parallel tool-calling Pica agent
+
+The OPENAI_FUNCTIONS agent gets one function call per model turn, so a task
+like "create three Linear issues and notify in Gmail" costs a model round
+trip per action. This agent uses OpenAI tool calling instead: the model can
+request several tool calls in one response, and ParallelAgentExecutor runs
+them concurrently (at most `max_concurrency` at a time) before asking the
+model for its next step.
+"""
+
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Union
+
+from langchain.agents import AgentExecutor, create_openai_tools_agent
+from langchain.agents.agent import ExceptionTool
+from langchain_core.agents import AgentAction, AgentFinish, AgentStep
+from langchain_core.exceptions import OutputParserException
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import SystemMessage
+from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+from langchain_core.tools import BaseTool
+from pydantic import PrivateAttr
+
+
+class ParallelAgentExecutor(AgentExecutor):
+    """AgentExecutor that runs the tool calls of one model response concurrently."""
+
+    max_concurrency: int = 4
+
+    _semaphores: Dict[Any, asyncio.Semaphore] = PrivateAttr(default_factory=dict)
+
+    def _iter_next_step(
+        self,
+        name_to_tool_map: Dict[str, BaseTool],
+        color_mapping: Dict[str, str],
+        inputs: Dict[str, str],
+        intermediate_steps: List[tuple],
+        run_manager=None,
+    ) -> Iterator[Union[AgentFinish, AgentAction, AgentStep]]:
+        try:
+            output = self._action_agent.plan(
+                self._prepare_intermediate_steps(intermediate_steps),
+                callbacks=run_manager.get_child() if run_manager else None,
+                **inputs,
+            )
+        except OutputParserException as e:
+            # Rare with tool calling; report it to the model as an observation
+            # without planning again
+            yield from self._parse_error_step(e, run_manager)
+            return
+
+        if isinstance(output, AgentFinish):
+            yield output
+            return
+
+        actions = [output] if isinstance(output, AgentAction) else list(output)
+        yield from actions
+
+        if len(actions) == 1:
+            yield self._perform_agent_action(name_to_tool_map, color_mapping, actions[0], run_manager)
+            return
+
+        # Each action runs in a copy of the caller's context so deadlines and
+        # usage tracking still apply inside the worker threads
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(actions))) as pool:
+            futures = [
+                pool.submit(
+                    contextvars.copy_context().run,
+                    self._perform_agent_action,
+                    name_to_tool_map,
+                    color_mapping,
+                    action,
+                    run_manager,
+                )
+                for action in actions
+            ]
+            for future in futures:
+                yield future.result()
+
+    def _parse_error_step(self, error: OutputParserException, run_manager=None) -> Iterator[Union[AgentAction, AgentStep]]:
+        """Turn a parsing error into an "_Exception" step, as AgentExecutor._iter_next_step does."""
+        if isinstance(self.handle_parsing_errors, bool) and not self.handle_parsing_errors:
+            raise ValueError(
+                "An output parsing error occurred. In order to pass this error back to the agent "
+                "and have it try again, pass `handle_parsing_errors=True` to the AgentExecutor. "
+                f"This is the error: {error}"
+            ) from error
+
+        text = str(error)
+        if isinstance(self.handle_parsing_errors, bool):
+            if error.send_to_llm:
+                observation = str(error.observation)
+                text = str(error.llm_output)
+            else:
+                observation = "Invalid or incomplete response"
+        elif isinstance(self.handle_parsing_errors, str):
+            observation = self.handle_parsing_errors
+        else:
+            observation = self.handle_parsing_errors(error)
+
+        action = AgentAction("_Exception", observation, text)
+        yield action
+        if run_manager:
+            run_manager.on_agent_action(action, color="green")
+        observation = ExceptionTool().run(
+            action.tool_input,
+            verbose=self.verbose,
+            color=None,
+            callbacks=run_manager.get_child() if run_manager else None,
+            **self._action_agent.tool_run_logging_kwargs(),
+        )
+        yield AgentStep(action=action, observation=observation)
+
+    async def _aperform_agent_action(self, *args, **kwargs) -> AgentStep:
+        # The base class already gathers the actions of a step; cap how many run at once
+        async with self._semaphore():
+            return await super()._aperform_agent_action(*args, **kwargs)
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            # Executors are reused across event loops; keep one semaphore per loop
+            self._semaphores = {
+                known: value for known, value in self._semaphores.items() if not known.is_closed()
+            }
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+        return semaphore
+
+
+def create_parallel_agent(
+    llm: BaseChatModel,
+    tools: List[BaseTool],
+    system_message: str,
+    max_concurrency: int = 4,
+    verbose: bool = False,
+) -> ParallelAgentExecutor:
+    """
+    Build a tool-calling agent executor that runs tool calls concurrently.
+
+    Args:
+        llm: Chat model with tool calling support
+        tools: Tools the agent may call
+        system_message: System prompt (used verbatim, not as a template)
+        max_concurrency: Maximum tool calls running at once
+        verbose: Enable verbose logging
+
+    Returns:
+        Agent executor accepting {"input": ...}
+    """
+    prompt = ChatPromptTemplate.from_messages([
+        SystemMessage(content=system_message),
+        ("human", "{input}"),
+        MessagesPlaceholder("agent_scratchpad"),
+    ])
+    agent = create_openai_tools_agent(llm, tools, prompt)
+    return ParallelAgentExecutor(
+        agent=agent,
+        tools=tools,
+        max_concurrency=max(1, max_concurrency),
+        verbose=verbose,
+        handle_parsing_errors=True,
+    )
@@ -0,0 +1,142 @@
+"""
+TaskResultCache - Memoization of read-only Pica task results
+
+Listing Linear teams or Airtable bases gives the same answer run after run,
+yet each request goes through the full Pica agent. Results of read-style
+tasks are cached here by normalized task text and platform, with a TTL and
+LRU eviction. Mutating tasks are never cached, and a successful one drops
+the cached reads of the platform it touched, since they may now be stale.
+"""
+
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+_WHITESPACE = re.compile(r"\s+")
+_WORD = re.compile(r"[a-z]+")
+
+# Verbs that mark a task as changing something on the platform
+_WRITE_VERBS = {
+    "add", "archive", "assign", "book", "cancel", "close", "comment", "create", "delete",
+    "draft", "edit", "insert", "invite", "mark", "merge", "move", "post", "publish", "remove",
+    "rename", "reply", "reschedule", "schedule", "send", "set", "share", "submit", "update",
+    "upload", "upsert", "write",
+}
+# Verbs that mark a task as only reading from the platform
+_READ_VERBS = {
+    "check", "count", "describe", "fetch", "find", "get", "list", "lookup", "read",
+    "retrieve", "search", "show", "summarize", "view",
+}
+
+_ANY_PLATFORM = "*"
+
+
+def normalize_task(task_description: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace."""
+    text = _PUNCTUATION.sub(" ", task_description.lower())
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def classify_task(task_description: str) -> str:
+    """
+    Classify a task as "read" or "write".
+
+    A task is a read only if it uses a read verb and no write verb; anything
+    ambiguous counts as a write so it is never served from the cache.
+    """
+    words = set(_WORD.findall(task_description.lower()))
+    if words & _WRITE_VERBS:
+        return "write"
+    if words & _READ_VERBS:
+        return "read"
+    return "write"
+
+
+class TaskResultCache:
+    """Thread-safe TTL + LRU cache of read-only task results, partitioned by platform."""
+
+    def __init__(self, max_entries: int = 128, ttl_seconds: float = 300):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[Dict[str, Any], float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    @staticmethod
+    def _key(task_description: str, platform: Optional[str]) -> Tuple[str, str]:
+        return (platform.lower() if platform else _ANY_PLATFORM, normalize_task(task_description))
+
+    def get(self, task_description: str, platform: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Return a copy of the cached result for the task, if fresh."""
+        if not self.enabled:
+            return None
+        key = self._key(task_description, platform)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] <= time.monotonic():
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return dict(entry[0])
+
+    def put(self, task_description: str, platform: Optional[str], result: Dict[str, Any]) -> None:
+        # Failed results are never served from the cache
+        if not self.enabled or not result.get("success"):
+            return
+        key = self._key(task_description, platform)
+        with self._lock:
+            self._entries[key] = (dict(result), time.monotonic() + self.ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, platform: Optional[str] = None) -> int:
+        """
+        Drop cached reads that a write on `platform` may have made stale.
+
+        Unscoped entries are always dropped, since they may have read from any
+        platform; a write with no platform drops everything.
+
+        Returns:
+            Number of entries removed
+        """
+        target = platform.lower() if platform else None
+        with self._lock:
+            stale = [
+                key for key in self._entries
+                if target is None or key[0] in (target, _ANY_PLATFORM)
+            ]
+            for key in stale:
+                del self._entries[key]
+            self.invalidations += 1
+            return len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, float]:
+        """Hit/miss counters and the hit ratio since startup."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
@@ -0,0 +1,125 @@
+"""
+Process-wide rate limits for LLM calls and Pica API requests
+
+A single workflow run stays well below provider limits, but many runs in
+parallel (bulk onboarding) do not. Two shared token buckets keep all runs in
+the process under a requests-per-minute limit:
+
+- "llm": every LLM call of the Pica agent, and every workflow agent run
+- "pica": every Pica API request made by the Pica tools and by direct actions
+
+Limits come from LLM_RATE_LIMIT and PICA_RATE_LIMIT (requests per minute,
+0 or unset = unlimited) and can be changed with configure_rate_limit().
+"""
+
+import asyncio
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+RATE_LIMIT_ENV = {
+    "llm": "LLM_RATE_LIMIT",
+    "pica": "PICA_RATE_LIMIT",
+}
+
+
+class RateLimiter:
+    """Thread-safe token bucket allowing `per_minute` acquisitions per minute."""
+
+    def __init__(self, per_minute: float, burst: Optional[int] = None):
+        """
+        Args:
+            per_minute: Sustained rate
+            burst: Acquisitions allowed at once after an idle period
+                (default: one second's worth, at least 1)
+        """
+        self.per_minute = per_minute
+        self.capacity = float(burst or max(1, int(per_minute / 60)))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """
+        Take one token, waiting until one is available.
+
+        Returns:
+            Seconds spent waiting
+        """
+        waited = 0.0
+        while True:
+            delay = self._take()
+            if not delay:
+                return waited
+            time.sleep(delay)
+            waited += delay
+
+    async def aacquire(self) -> float:
+        """Async counterpart of acquire(); waits without blocking the event loop."""
+        waited = 0.0
+        while True:
+            delay = self._take()
+            if not delay:
+                return waited
+            await asyncio.sleep(delay)
+            waited += delay
+
+    def _take(self) -> float:
+        """Take a token if one is available. Returns 0, or the seconds until one is."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.per_minute / 60)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) * 60 / self.per_minute
+
+
+_limiters: Dict[str, Optional[RateLimiter]] = {}
+_limiters_lock = threading.Lock()
+
+
+def configure_rate_limit(name: str, per_minute: Optional[float]) -> Optional[RateLimiter]:
+    """Set the process-wide limit `name` ("llm" or "pica"); 0 or None removes it."""
+    limiter = RateLimiter(per_minute) if per_minute else None
+    with _limiters_lock:
+        _limiters[name] = limiter
+    return limiter
+
+
+def get_rate_limiter(name: str) -> Optional[RateLimiter]:
+    """Get the process-wide limiter `name`, configured from the environment on first use."""
+    if name not in _limiters:
+        with _limiters_lock:
+            if name not in _limiters:
+                per_minute = float(os.getenv(RATE_LIMIT_ENV[name], "0"))
+                _limiters[name] = RateLimiter(per_minute) if per_minute else None
+    return _limiters[name]
+
+
+def rate_limited(name: str) -> float:
+    """Wait for the limiter `name`, if one is set. Returns the seconds waited."""
+    limiter = get_rate_limiter(name)
+    return limiter.acquire() if limiter else 0.0
+
+
+async def arate_limited(name: str) -> float:
+    """Async counterpart of rate_limited()."""
+    limiter = get_rate_limiter(name)
+    return await limiter.aacquire() if limiter else 0.0
+
+
+class LLMRateLimitCallbackHandler(BaseCallbackHandler):
+    """Holds every LLM call of a LangChain agent to the "llm" rate limit."""
+
+    raise_error = True
+
+    def on_llm_start(self, serialized, prompts, **kwargs):
+        rate_limited("llm")
+
+    def on_chat_model_start(self, serialized, messages, **kwargs):
+        rate_limited("llm")
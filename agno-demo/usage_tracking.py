@@ -0,0 +1,218 @@
+"""
+Token and cost accounting for Pica tasks and workflow runs
+
+Usage is collected in two places: a LangChain callback on the Pica agent
+(every LLM call it makes inside execute_task) and the metrics agno attaches
+to each agent response in the workflow. Both feed a UsageTracker for the
+current run. With a token budget set, the tracker also stops runaway runs:
+once the budget is spent, the next LLM call raises TokenBudgetExceeded.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Any, Iterator, Optional
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+# USD per 1M (prompt, completion) tokens
+MODEL_PRICING = {
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4.1": (2.00, 8.00),
+    "gpt-4.1-mini": (0.40, 1.60),
+}
+
+
+def estimate_cost(model: Optional[str], prompt_tokens: int, completion_tokens: int) -> float:
+    """Estimated USD cost of a call, or 0 for models without a known price."""
+    pricing = None
+    if model:
+        # Dated snapshots (gpt-4o-2024-08-06) are priced like their base model
+        pricing = MODEL_PRICING.get(model) or next(
+            (price for name, price in sorted(MODEL_PRICING.items(), key=lambda item: -len(item[0]))
+             if model.startswith(name + "-")),
+            None
+        )
+    if pricing is None:
+        return 0.0
+    return (prompt_tokens * pricing[0] + completion_tokens * pricing[1]) / 1_000_000
+
+
+class TokenUsage:
+    """Token counts, LLM calls, latency and estimated cost."""
+
+    def __init__(self):
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.llm_calls = 0
+        self.llm_latency = 0.0
+        self.cost_usd = 0.0
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    def add(self,
+            prompt_tokens: int = 0,
+            completion_tokens: int = 0,
+            llm_calls: int = 1,
+            latency: float = 0.0,
+            model: Optional[str] = None) -> None:
+        self.prompt_tokens += prompt_tokens
+        self.completion_tokens += completion_tokens
+        self.llm_calls += llm_calls
+        self.llm_latency += latency
+        self.cost_usd += estimate_cost(model, prompt_tokens, completion_tokens)
+
+    def merge(self, other: "TokenUsage") -> None:
+        self.prompt_tokens += other.prompt_tokens
+        self.completion_tokens += other.completion_tokens
+        self.llm_calls += other.llm_calls
+        self.llm_latency += other.llm_latency
+        self.cost_usd += other.cost_usd
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "total_tokens": self.total_tokens,
+            "llm_calls": self.llm_calls,
+            "llm_latency_seconds": round(self.llm_latency, 3),
+            "estimated_cost_usd": round(self.cost_usd, 6),
+        }
+
+
+def usage_from_agno_metrics(metrics: Optional[Dict[str, Any]], model: Optional[str] = None) -> TokenUsage:
+    """
+    Convert the metrics of an agno RunResponse into a TokenUsage.
+
+    agno reports one list entry per model response, so the list lengths give
+    the number of LLM calls.
+    """
+    usage = TokenUsage()
+    if not metrics:
+        return usage
+    prompt = metrics.get("input_tokens") or metrics.get("prompt_tokens") or []
+    completion = metrics.get("output_tokens") or metrics.get("completion_tokens") or []
+    times = metrics.get("time") or []
+    usage.add(
+        prompt_tokens=sum(prompt),
+        completion_tokens=sum(completion),
+        llm_calls=max(len(prompt), len(times)),
+        latency=sum(t for t in times if t),
+        model=model
+    )
+    return usage
+
+
+class TokenBudgetExceeded(Exception):
+    """Raised when a run has spent its token budget."""
+
+
+class UsageTracker:
+    """
+    Thread-safe usage totals for one workflow run, with an optional token budget.
+    """
+
+    def __init__(self, max_tokens: Optional[int] = None):
+        self.max_tokens = max_tokens
+        self.total = TokenUsage()
+        self.by_source: Dict[str, TokenUsage] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def exceeded(self) -> bool:
+        return self.max_tokens is not None and self.total.total_tokens >= self.max_tokens
+
+    def record(self, usage: TokenUsage, source: str) -> None:
+        with self._lock:
+            self.total.merge(usage)
+            self.by_source.setdefault(source, TokenUsage()).merge(usage)
+
+    def check(self) -> None:
+        """Raise TokenBudgetExceeded if the budget is spent."""
+        if self.exceeded:
+            raise TokenBudgetExceeded(
+                f"Token budget exceeded: {self.total.total_tokens} of {self.max_tokens} tokens used"
+            )
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self.total.to_dict(),
+                "token_budget": self.max_tokens,
+                "by_source": {source: usage.to_dict() for source, usage in self.by_source.items()},
+            }
+
+
+_current_tracker: ContextVar[Optional[UsageTracker]] = ContextVar("usage_tracker", default=None)
+
+
+def current_tracker() -> Optional[UsageTracker]:
+    return _current_tracker.get()
+
+
+@contextmanager
+def tracking_scope(tracker: Optional[UsageTracker]) -> Iterator[Optional[UsageTracker]]:
+    """Make `tracker` the current run's tracker for the duration of the block."""
+    token = _current_tracker.set(tracker)
+    try:
+        yield tracker
+    finally:
+        _current_tracker.reset(token)
+
+
+class UsageCallbackHandler(BaseCallbackHandler):
+    """
+    Collects token usage and latency of every LLM call an agent makes.
+
+    Calls are also recorded in the current run's tracker, and a spent budget
+    stops the agent before its next LLM call.
+    """
+
+    raise_error = True
+
+    def __init__(self, model: Optional[str] = None, source: str = "pica_agent"):
+        self.model = model
+        self.source = source
+        self.usage = TokenUsage()
+        self.tracker = current_tracker()
+        self._started: Dict[Any, float] = {}
+
+    def _start(self, run_id) -> None:
+        if self.tracker is not None:
+            self.tracker.check()
+        self._started[run_id] = time.perf_counter()
+
+    def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+        self._start(run_id)
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        self._start(run_id)
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        latency = time.perf_counter() - self._started.pop(run_id, time.perf_counter())
+        prompt_tokens, completion_tokens = self._token_counts(response)
+        call = TokenUsage()
+        call.add(prompt_tokens, completion_tokens, latency=latency, model=self.model)
+        self.usage.merge(call)
+        if self.tracker is not None:
+            self.tracker.record(call, self.source)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._started.pop(run_id, None)
+
+    @staticmethod
+    def _token_counts(response) -> tuple:
+        token_usage = (response.llm_output or {}).get("token_usage") or {}
+        if token_usage:
+            return token_usage.get("prompt_tokens", 0), token_usage.get("completion_tokens", 0)
+        # Fall back to the usage metadata on the generated message
+        for generations in response.generations:
+            for generation in generations:
+                metadata = getattr(getattr(generation, "message", None), "usage_metadata", None)
+                if metadata:
+                    return metadata.get("input_tokens", 0), metadata.get("output_tokens", 0)
+        return 0, 0
@@ -0,0 +1,68 @@
+"""
+RunCheckpoint - Step-level checkpoints for workflow runs
+
+A checkpoint records the output of each workflow step, and each platform task
+that was executed, the moment it completes. It lives in the workflow's
+session_state and is written to the workflow's storage on every update, so a
+run that fails part-way can be resumed: completed steps are restored instead
+of re-running their LLM calls, and executed platform tasks are skipped so
+their side effects (emails sent, issues created) are not repeated.
+"""
+
+import hashlib
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+
+class RunCheckpoint:
+    """Persisted progress of one workflow run."""
+
+    def __init__(self, state: Dict[str, Any], save: Callable[[], Any], lock: Optional[threading.RLock] = None):
+        """
+        Args:
+            state: Checkpoint dict held in session_state (updated in place)
+            save: Writes the session, including session_state, to storage;
+                called without holding `lock`, so it must take its own snapshot
+            lock: Lock guarding session_state, shared with its other writers
+        """
+        self.state = state
+        self._save = save
+        self._lock = lock or threading.RLock()
+
+    @classmethod
+    def new_state(cls, workflow_id: str) -> Dict[str, Any]:
+        return {"workflow_id": workflow_id, "steps": {}, "executed": [], "updated_at": time.time()}
+
+    @property
+    def workflow_id(self) -> str:
+        return self.state["workflow_id"]
+
+    @property
+    def resumed(self) -> bool:
+        """Whether the checkpoint already holds progress from an earlier run."""
+        return bool(self.state["steps"] or self.state["executed"])
+
+    def step_output(self, name: str) -> Optional[Any]:
+        return self.state["steps"].get(name)
+
+    def complete_step(self, name: str, output: Any) -> None:
+        with self._lock:
+            self.state["steps"][name] = output
+            self.state["updated_at"] = time.time()
+        self._save()
+
+    def is_executed(self, key: str) -> bool:
+        return key in self.state["executed"]
+
+    def mark_executed(self, key: str) -> None:
+        with self._lock:
+            if key not in self.state["executed"]:
+                self.state["executed"].append(key)
+            self.state["updated_at"] = time.time()
+        self._save()
+
+    @staticmethod
+    def task_key(platform: str, task: str) -> str:
+        """Stable key of a platform task, used to recognize it on resume."""
+        return f"{platform}:{hashlib.sha256(task.encode()).hexdigest()[:16]}"
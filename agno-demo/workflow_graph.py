@@ -0,0 +1,220 @@
+"""
+StepGraph - Declarative step graph for workflows
+
+Workflow steps are declared with the steps they depend on. Each step starts
+as soon as its dependencies have finished, so independent steps run
+concurrently on a small thread pool. Step output is still yielded as one
+ordered RunResponse stream: steps are replayed in declaration order, the
+current step streaming live and later ones buffered until their turn.
+
+A step is a generator function that receives the results of the steps
+before it, yields RunResponses and returns its result:
+
+    def analysis(results):
+        yield RunResponse(content="Analyzing...")
+        return analyst.run(prompt).content
+
+    graph = StepGraph([
+        WorkflowStep("analysis", analysis),
+        WorkflowStep("tasks", tasks, depends_on=("analysis",)),
+        WorkflowStep("communication", communication, depends_on=("analysis",)),
+    ])
+    for response in graph.run():
+        yield response
+
+AsyncStepGraph does the same on an event loop for async workflows. Its steps
+are coroutine functions that receive the results so far and an `emit`
+callback for their RunResponses, and return their result:
+
+    async def analysis(results, emit):
+        emit(RunResponse(content="Analyzing..."))
+        return (await analyst.arun(prompt)).content
+"""
+
+import asyncio
+import contextvars
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple
+
+from agno.workflow import RunResponse
+
+_DONE = object()
+
+
+@dataclass
+class WorkflowStep:
+    """One node of a StepGraph."""
+
+    name: str
+    run: Callable[[Dict[str, Any]], Iterator[RunResponse]]
+    depends_on: Tuple[str, ...] = ()
+
+
+class StepFailed(Exception):
+    """Raised for a step whose dependency failed, so it never ran."""
+
+
+def _validate_steps(steps: List[WorkflowStep]) -> None:
+    seen = set()
+    for step in steps:
+        if step.name in seen:
+            raise ValueError(f"Duplicate workflow step: {step.name}")
+        missing = [dep for dep in step.depends_on if dep not in seen]
+        if missing:
+            raise ValueError(f"Step {step.name} depends on undeclared or later steps: {', '.join(missing)}")
+        seen.add(step.name)
+
+
+class StepGraph:
+    """Runs workflow steps concurrently where their dependencies allow."""
+
+    def __init__(self, steps: List[WorkflowStep], max_workers: Optional[int] = None):
+        """
+        Args:
+            steps: Steps in the order their output should be streamed; every
+                dependency must be declared before the steps that use it
+            max_workers: Maximum steps running at once (default: number of steps)
+        """
+        _validate_steps(steps)
+        self.steps = steps
+        self.max_workers = max_workers or max(1, len(steps))
+
+    def run(self, timings: Optional[Dict[str, float]] = None) -> Iterator[RunResponse]:
+        """
+        Run all steps and yield their responses in declaration order.
+
+        Returns (as the generator's return value) the results of all steps by
+        name. The first failing step's exception is raised once the stream
+        reaches that step; steps depending on it are not started.
+
+        Args:
+            timings: Receives the seconds each completed step ran, by name
+        """
+        outputs: Dict[str, "queue.Queue[Any]"] = {step.name: queue.Queue() for step in self.steps}
+        results: Dict[str, Any] = {}
+        errors: Dict[str, BaseException] = {}
+        finished: set = set()
+        started: set = set()
+        lock = threading.Lock()
+        # Steps run in copies of the caller's context (usage tracking, deadlines)
+        context = contextvars.copy_context()
+        executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="workflow-step")
+
+        def execute(step: WorkflowStep) -> None:
+            try:
+                failed = [dep for dep in step.depends_on if dep in errors]
+                if failed:
+                    raise StepFailed(f"Step {step.name} skipped because {', '.join(failed)} failed")
+                with lock:
+                    inputs = dict(results)
+                started_at = time.perf_counter()
+                generator = step.run(inputs)
+                while True:
+                    try:
+                        outputs[step.name].put(next(generator))
+                    except StopIteration as stop:
+                        with lock:
+                            results[step.name] = stop.value
+                            if timings is not None:
+                                timings[step.name] = time.perf_counter() - started_at
+                        break
+            except BaseException as e:
+                with lock:
+                    errors[step.name] = e
+            finally:
+                with lock:
+                    finished.add(step.name)
+                outputs[step.name].put(_DONE)
+                schedule()
+
+        def schedule() -> None:
+            with lock:
+                ready = [
+                    step for step in self.steps
+                    if step.name not in started and all(dep in finished for dep in step.depends_on)
+                ]
+                started.update(step.name for step in ready)
+            for step in ready:
+                executor.submit(context.copy().run, execute, step)
+
+        try:
+            schedule()
+            for step in self.steps:
+                while True:
+                    item = outputs[step.name].get()
+                    if item is _DONE:
+                        break
+                    yield item
+                if step.name in errors:
+                    raise errors[step.name]
+        finally:
+            executor.shutdown(wait=False)
+        return results
+
+
+class AsyncStepGraph:
+    """Runs async workflow steps concurrently on the event loop where their dependencies allow."""
+
+    def __init__(self, steps: List[WorkflowStep]):
+        """
+        Args:
+            steps: Steps in the order their output should be streamed; every
+                dependency must be declared before the steps that use it
+        """
+        _validate_steps(steps)
+        self.steps = steps
+
+    async def run(
+        self,
+        results: Dict[str, Any],
+        timings: Optional[Dict[str, float]] = None
+    ) -> AsyncIterator[RunResponse]:
+        """
+        Run all steps and yield their responses in declaration order.
+
+        Async generators cannot return a value, so the results of the steps are
+        stored in `results` by name as they finish. The first failing step's
+        exception is raised once the stream reaches that step; steps depending
+        on it are not started, and closing the stream early cancels the rest.
+
+        Args:
+            results: Receives the result of each step, by name
+            timings: Receives the seconds each completed step ran, by name
+        """
+        outputs: Dict[str, "asyncio.Queue[Any]"] = {step.name: asyncio.Queue() for step in self.steps}
+        tasks: Dict[str, "asyncio.Task[None]"] = {}
+
+        async def execute(step: WorkflowStep) -> None:
+            try:
+                if step.depends_on:
+                    await asyncio.wait([tasks[dep] for dep in step.depends_on])
+                failed = [dep for dep in step.depends_on if tasks[dep].exception() is not None]
+                if failed:
+                    raise StepFailed(f"Step {step.name} skipped because {', '.join(failed)} failed")
+                started_at = time.perf_counter()
+                results[step.name] = await step.run(dict(results), outputs[step.name].put_nowait)
+                if timings is not None:
+                    timings[step.name] = time.perf_counter() - started_at
+            finally:
+                outputs[step.name].put_nowait(_DONE)
+
+        # Each task runs in a copy of the caller's context (usage tracking, deadlines)
+        for step in self.steps:
+            tasks[step.name] = asyncio.create_task(execute(step))
+        try:
+            for step in self.steps:
+                while True:
+                    item = await outputs[step.name].get()
+                    if item is _DONE:
+                        break
+                    yield item
+                await tasks[step.name]
+        finally:
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+
@@ -0,0 +1,198 @@
+"""
+WorkflowResultStore - Indexed storage for workflow results
+
+Workflow results used to live in session_state, which agno serializes into a
+single session row on every save, so each save got slower as history grew.
+Results now go to their own SQLite table, indexed by workflow id, customer
+email and cache key, and session_state only keeps a pointer (the workflow id)
+to the cached one.
+
+Writes are buffered and committed in batches by a background thread; reads
+see buffered results immediately. Old results are evicted by age and by a
+maximum row count.
+"""
+
+import atexit
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, List, Optional
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS workflow_results (
+    workflow_id TEXT PRIMARY KEY,
+    cache_key TEXT,
+    customer_email TEXT,
+    status TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    result TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_workflow_results_email ON workflow_results (customer_email, created_at);
+CREATE INDEX IF NOT EXISTS idx_workflow_results_cache_key ON workflow_results (cache_key, created_at);
+CREATE INDEX IF NOT EXISTS idx_workflow_results_created ON workflow_results (created_at);
+"""
+
+
+class WorkflowResultStore:
+    """SQLite store of workflow results with batched writes and retention."""
+
+    def __init__(self,
+                 path: str = "tmp/workflow_results.db",
+                 retention: float = 30 * 86400,
+                 max_rows: int = 100_000,
+                 batch_size: int = 50,
+                 flush_interval: float = 1.0,
+                 evict_interval: float = 300.0):
+        """
+        Args:
+            path: SQLite database file
+            retention: Seconds results are kept (0 keeps them forever)
+            max_rows: Most results kept; the oldest are evicted first (0 = no limit)
+            batch_size: Buffered results that trigger an immediate flush
+            flush_interval: Seconds between background flushes
+            evict_interval: Minimum seconds between eviction passes
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.retention = retention
+        self.max_rows = max_rows
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.evict_interval = evict_interval
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+
+        self._pending: Dict[str, tuple] = {}
+        self._pending_lock = threading.Lock()
+        # One flush at a time, so an older batch never commits over a newer one
+        self._flush_lock = threading.Lock()
+        self._last_eviction = 0.0
+        self._closed = threading.Event()
+        self._flusher = threading.Thread(target=self._flush_loop, name="workflow-results-flush", daemon=True)
+        self._flusher.start()
+
+    def put(self, result: Dict[str, Any], cache_key: Optional[str] = None) -> None:
+        """Buffer a result (a WorkflowResult dump) for the next batched write."""
+        customer = result.get("customer_data") or {}
+        row = (
+            result["workflow_id"],
+            cache_key,
+            (customer.get("email") or "").strip().lower() or None,
+            result.get("status", "unknown"),
+            time.time(),
+            json.dumps(result, default=str),
+        )
+        with self._pending_lock:
+            self._pending[result["workflow_id"]] = row
+            full = len(self._pending) >= self.batch_size
+        if full:
+            self.flush()
+
+    def get(self, workflow_id: str) -> Optional[Dict[str, Any]]:
+        with self._pending_lock:
+            row = self._pending.get(workflow_id)
+        if row is not None:
+            return json.loads(row[5])
+        with self._lock:
+            stored = self._conn.execute(
+                "SELECT result FROM workflow_results WHERE workflow_id = ?", (workflow_id,)
+            ).fetchone()
+        return json.loads(stored["result"]) if stored else None
+
+    def by_email(self, email: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """Most recent results for a customer, newest first."""
+        self.flush()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT result FROM workflow_results WHERE customer_email = ? ORDER BY created_at DESC LIMIT ?",
+                (email.strip().lower(), limit)
+            ).fetchall()
+        return [json.loads(row["result"]) for row in rows]
+
+    def flush(self) -> int:
+        """Write buffered results in one transaction. Returns the number written."""
+        with self._flush_lock:
+            with self._pending_lock:
+                rows = list(self._pending.values())
+            if rows:
+                # Rows stay buffered until committed, so get() finds them throughout
+                with self._lock, self._conn:
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO workflow_results "
+                        "(workflow_id, cache_key, customer_email, status, created_at, result) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        rows
+                    )
+                with self._pending_lock:
+                    for row in rows:
+                        # Keep a newer version of a result that arrived during the write
+                        if self._pending.get(row[0]) is row:
+                            del self._pending[row[0]]
+        if time.time() - self._last_eviction >= self.evict_interval:
+            self.evict()
+        return len(rows)
+
+    def evict(self) -> int:
+        """Delete results past the retention period or beyond max_rows. Returns the number deleted."""
+        self._last_eviction = time.time()
+        deleted = 0
+        with self._lock, self._conn:
+            if self.retention:
+                deleted += self._conn.execute(
+                    "DELETE FROM workflow_results WHERE created_at < ?", (time.time() - self.retention,)
+                ).rowcount
+            if self.max_rows:
+                deleted += self._conn.execute(
+                    "DELETE FROM workflow_results WHERE workflow_id IN ("
+                    "SELECT workflow_id FROM workflow_results ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_rows,)
+                ).rowcount
+        return deleted
+
+    def close(self) -> None:
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        self._flusher.join(timeout=self.flush_interval + 1)
+        self.flush()
+        with self._lock:
+            self._conn.close()
+
+    def _flush_loop(self) -> None:
+        while not self._closed.wait(self.flush_interval):
+            try:
+                self.flush()
+            except sqlite3.Error:
+                # Keep the thread alive; the rows are retried on the next flush
+                pass
+
+
+_result_store: Optional[WorkflowResultStore] = None
+_result_store_lock = threading.Lock()
+
+
+def get_result_store() -> WorkflowResultStore:
+    """
+    Get or create the global result store
+    (WORKFLOW_RESULTS_DB, WORKFLOW_RESULTS_RETENTION_DAYS, WORKFLOW_RESULTS_MAX_ROWS).
+    """
+    global _result_store
+    if _result_store is None:
+        with _result_store_lock:
+            if _result_store is None:
+                _result_store = WorkflowResultStore(
+                    path=os.getenv("WORKFLOW_RESULTS_DB", "tmp/workflow_results.db"),
+                    retention=float(os.getenv("WORKFLOW_RESULTS_RETENTION_DAYS", "30")) * 86400,
+                    max_rows=int(os.getenv("WORKFLOW_RESULTS_MAX_ROWS", "100000"))
+                )
+                atexit.register(_result_store.close)
+    return _result_store
@@ -0,0 +1,386 @@
+"""
+Workflow service - HTTP API for BusinessAutomationWorkflow runs
+
+POST /runs starts a workflow run and returns its id at once. The run's
+RunResponses are streamed over Server-Sent Events from
+GET /runs/{run_id}/events, and GET /runs/{run_id} returns its status and,
+once finished, its WorkflowResult.
+
+Runs execute with BusinessAutomationWorkflow.arun() on the server's event
+loop. Admission control keeps the load bounded: at most
+WORKFLOW_SERVICE_MAX_CONCURRENCY runs execute at once, up to
+WORKFLOW_SERVICE_QUEUE_SIZE more wait for a slot, and further requests get
+429 Too Many Requests with a Retry-After header. Only one run per customer
+(workflow session) executes at a time; a second one gets 409 Conflict.
+
+Finished runs stay queryable for WORKFLOW_SERVICE_RUN_RETENTION seconds;
+their results are also kept in the workflow result store.
+
+Usage:
+    python workflow_service.py --host 0.0.0.0 --port 8000
+    (or: uvicorn workflow_service:app, configured from the environment)
+
+    curl -X POST localhost:8000/runs -H 'Content-Type: application/json' \\
+        -d '{"customer": {"name": "Ameya Raj", "email": "ameya@picaos.com", "company": "Ameya Industries",
+             "source": "website_form", "interest_level": "high"}}'
+    curl -N localhost:8000/runs/<run_id>/events
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+import uuid
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, List, Literal, Optional
+
+import uvicorn
+from fastapi import FastAPI, Header, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+
+from agno.storage.sqlite import SqliteStorage
+from agno.utils.log import logger
+
+from bulk_onboarding import customer_key
+from business_automation_workflow import BusinessAutomationWorkflow, Customer
+
+QUEUED = "queued"
+RUNNING = "running"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+# Seconds between SSE keep-alive comments on an idle stream
+KEEPALIVE_INTERVAL = 15.0
+
+
+class RunRequest(BaseModel):
+    customer: Customer = Field(..., description="Customer to run the workflow for")
+    workflow_type: str = Field("customer_onboarding", description="Type of workflow to execute")
+    use_cache: bool = Field(True, description="Reuse cached workflow and step results")
+    token_budget: Optional[int] = Field(None, description="Maximum LLM tokens for the run")
+    resume: bool = Field(False, description="Resume the customer's last unfinished run")
+    planning_mode: Optional[Literal["markdown", "structured"]] = Field(
+        None, description="Task planning mode (default: the workflow's)"
+    )
+
+
+class ServiceSaturated(Exception):
+    """Raised when every run slot and queue place is taken."""
+
+
+class RunConflict(Exception):
+    """Raised when the customer already has a run in progress."""
+
+
+@dataclass
+class WorkflowRun:
+    """A workflow run started by the service, with the responses it yielded so far."""
+
+    run_id: str
+    session_id: str
+    request: RunRequest
+    status: str = QUEUED
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    events: List[str] = field(default_factory=list)
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    updated: asyncio.Condition = field(default_factory=asyncio.Condition)
+
+    @property
+    def done(self) -> bool:
+        return self.finished_at is not None
+
+    async def publish(self, content: str) -> None:
+        async with self.updated:
+            self.events.append(content)
+            self.updated.notify_all()
+
+    async def finish(self, status: str, error: Optional[str] = None) -> None:
+        async with self.updated:
+            self.status = status
+            self.error = error
+            self.finished_at = time.time()
+            self.updated.notify_all()
+
+    async def stream(self, start: int = 0) -> AsyncIterator[Optional[int]]:
+        """
+        Yield the index of each event from `start` on as it arrives, until the run
+        finishes. Yields None when KEEPALIVE_INTERVAL passes without an event.
+        """
+        index = start
+        while True:
+            async with self.updated:
+                try:
+                    await asyncio.wait_for(
+                        self.updated.wait_for(lambda: len(self.events) > index or self.done),
+                        timeout=KEEPALIVE_INTERVAL
+                    )
+                except asyncio.TimeoutError:
+                    pass
+                available = len(self.events)
+                done = self.done
+            if index == available and not done:
+                yield None
+            while index < available:
+                yield index
+                index += 1
+            if done and index >= len(self.events):
+                return
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "run_id": self.run_id,
+            "status": self.status,
+            "customer": self.request.customer.model_dump(),
+            "workflow_type": self.request.workflow_type,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "event_count": len(self.events),
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+class WorkflowRunManager:
+    """
+    Runs workflows in the background with a bounded number of slots and a bounded queue.
+    """
+
+    def __init__(self,
+                 max_concurrent: Optional[int] = None,
+                 queue_size: Optional[int] = None,
+                 retention: Optional[float] = None,
+                 db_file: str = "tmp/business_automation.db"):
+        """
+        Args:
+            max_concurrent: Runs executing at once (default: WORKFLOW_SERVICE_MAX_CONCURRENCY, or 8)
+            queue_size: Runs waiting for a slot before requests are rejected
+                (default: WORKFLOW_SERVICE_QUEUE_SIZE, or 32)
+            retention: Seconds finished runs stay queryable
+                (default: WORKFLOW_SERVICE_RUN_RETENTION, or 3600)
+            db_file: SQLite file for workflow sessions and checkpoints
+        """
+        if max_concurrent is None:
+            max_concurrent = int(os.getenv("WORKFLOW_SERVICE_MAX_CONCURRENCY", "8"))
+        if queue_size is None:
+            queue_size = int(os.getenv("WORKFLOW_SERVICE_QUEUE_SIZE", "32"))
+        if retention is None:
+            retention = float(os.getenv("WORKFLOW_SERVICE_RUN_RETENTION", "3600"))
+        self.max_concurrent = max(1, max_concurrent)
+        self.queue_size = max(0, queue_size)
+        self.retention = retention
+
+        self.storage = SqliteStorage(
+            table_name="business_automation_workflows",
+            db_file=db_file,
+            auto_upgrade_schema=True
+        )
+        # Create the session table up front; runs creating it at once would race
+        self.storage.mode = "workflow"
+        self.storage.create()
+
+        self._slots = asyncio.Semaphore(self.max_concurrent)
+        self._runs: Dict[str, WorkflowRun] = {}
+        self._tasks: Dict[str, "asyncio.Task[None]"] = {}
+        self._sessions: Dict[str, str] = {}
+
+    @property
+    def running(self) -> int:
+        return sum(1 for run in self._runs.values() if run.status == RUNNING)
+
+    @property
+    def queued(self) -> int:
+        return sum(1 for run in self._runs.values() if run.status == QUEUED)
+
+    def submit(self, request: RunRequest) -> WorkflowRun:
+        """
+        Admit a run and start it in the background.
+
+        Raises:
+            ServiceSaturated: If all slots and queue places are taken
+            RunConflict: If the customer already has a run in progress
+        """
+        self._evict()
+        session_id = f"{request.workflow_type}_{customer_key(request.customer.model_dump())}"
+        if session_id in self._sessions:
+            raise RunConflict(f"Run {self._sessions[session_id]} is already in progress for this customer")
+        if len(self._sessions) >= self.max_concurrent + self.queue_size:
+            raise ServiceSaturated(f"{len(self._sessions)} workflow runs in progress; try again later")
+
+        run = WorkflowRun(run_id=uuid.uuid4().hex, session_id=session_id, request=request)
+        self._runs[run.run_id] = run
+        self._sessions[session_id] = run.run_id
+        self._tasks[run.run_id] = asyncio.create_task(self._execute(run))
+        logger.info(f"Admitted workflow run {run.run_id} ({self.running} running, {self.queued} queued)")
+        return run
+
+    def get(self, run_id: str) -> Optional[WorkflowRun]:
+        return self._runs.get(run_id)
+
+    async def shutdown(self) -> None:
+        """Cancel runs still in progress; their checkpoints let them be resumed later."""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _execute(self, run: WorkflowRun) -> None:
+        request = run.request
+        try:
+            async with self._slots:
+                run.status = RUNNING
+                run.started_at = time.time()
+                workflow = BusinessAutomationWorkflow(session_id=run.session_id, storage=self.storage)
+                if request.planning_mode:
+                    workflow.planning_mode = request.planning_mode
+
+                async for response in workflow.arun(
+                    customer_data=request.customer.model_dump(),
+                    workflow_type=request.workflow_type,
+                    use_cache=request.use_cache,
+                    token_budget=request.token_budget,
+                    resume=request.resume
+                ):
+                    await run.publish(response.content)
+
+            result = workflow.last_result
+            if result is None:
+                await run.finish(FAILED, run.events[-1] if run.events else "Workflow produced no result")
+            else:
+                run.result = result.model_dump()
+                await run.finish(result.status)
+        except asyncio.CancelledError:
+            await run.finish(CANCELLED, "Service shut down before the run finished")
+            raise
+        except Exception as e:
+            logger.error(f"Workflow run {run.run_id} failed: {e}")
+            await run.finish(FAILED, f"{type(e).__name__}: {e}")
+        finally:
+            self._sessions.pop(run.session_id, None)
+            self._tasks.pop(run.run_id, None)
+
+    def _evict(self) -> None:
+        """Forget finished runs past the retention period."""
+        cutoff = time.time() - self.retention
+        for run_id in [run_id for run_id, run in self._runs.items() if run.done and run.finished_at < cutoff]:
+            del self._runs[run_id]
+
+
+def _sse(event: str, data: Dict[str, Any], event_id: Optional[int] = None) -> str:
+    """Format one Server-Sent Event."""
+    lines = [] if event_id is None else [f"id: {event_id}"]
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, default=str)}")
+    return "\n".join(lines) + "\n\n"
+
+
+def create_app(manager: Optional[WorkflowRunManager] = None) -> FastAPI:
+    """
+    Build the service app.
+
+    Args:
+        manager: Run manager to use (default: one created on startup from the environment)
+    """
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        app.state.manager = manager or WorkflowRunManager()
+        yield
+        await app.state.manager.shutdown()
+
+    app = FastAPI(title="Business Automation Workflow Service", lifespan=lifespan)
+
+    def get_run(request: Request, run_id: str) -> WorkflowRun:
+        run = request.app.state.manager.get(run_id)
+        if run is None:
+            raise HTTPException(status_code=404, detail=f"Unknown workflow run: {run_id}")
+        return run
+
+    @app.post("/runs", status_code=202)
+    async def start_run(body: RunRequest, request: Request) -> Dict[str, Any]:
+        """Start a workflow run; its responses stream from the events URL."""
+        manager: WorkflowRunManager = request.app.state.manager
+        try:
+            run = manager.submit(body)
+        except ServiceSaturated as e:
+            raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "5"})
+        except RunConflict as e:
+            raise HTTPException(status_code=409, detail=str(e))
+        return {
+            "run_id": run.run_id,
+            "status": run.status,
+            "status_url": f"/runs/{run.run_id}",
+            "events_url": f"/runs/{run.run_id}/events",
+        }
+
+    @app.get("/runs/{run_id}")
+    async def run_status(run_id: str, request: Request) -> Dict[str, Any]:
+        """Status of a run, with its WorkflowResult once it has finished."""
+        return get_run(request, run_id).to_dict()
+
+    @app.get("/runs/{run_id}/events")
+    async def run_events(
+        run_id: str,
+        request: Request,
+        last_event_id: Optional[int] = Header(None)
+    ) -> StreamingResponse:
+        """
+        Stream a run's RunResponses as Server-Sent Events.
+
+        Earlier responses are replayed first, from after Last-Event-ID when a
+        client reconnects. A final "end" event carries the run's status.
+        """
+        run = get_run(request, run_id)
+        start = 0 if last_event_id is None else last_event_id + 1
+
+        async def events() -> AsyncIterator[str]:
+            async for index in run.stream(start):
+                if index is None:
+                    yield ": keep-alive\n\n"
+                else:
+                    yield _sse("run_response", {"content": run.events[index]}, index)
+            yield _sse("end", {"status": run.status, "error": run.error})
+
+        return StreamingResponse(
+            events(),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        )
+
+    @app.get("/health")
+    async def health(request: Request) -> Dict[str, Any]:
+        manager: WorkflowRunManager = request.app.state.manager
+        return {
+            "status": "ok",
+            "running": manager.running,
+            "queued": manager.queued,
+            "max_concurrent": manager.max_concurrent,
+            "queue_size": manager.queue_size,
+        }
+
+    return app
+
+
+app = create_app()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve BusinessAutomationWorkflow runs over HTTP")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to listen on")
+    parser.add_argument("--port", type=int, default=8000, help="Port to listen on")
+    parser.add_argument("--max-concurrency", type=int, help="Runs executing at once (default: WORKFLOW_SERVICE_MAX_CONCURRENCY)")
+    parser.add_argument("--queue-size", type=int, help="Runs waiting for a slot (default: WORKFLOW_SERVICE_QUEUE_SIZE)")
+    parser.add_argument("--db", default="tmp/business_automation.db", help="SQLite file for sessions and checkpoints")
+    args = parser.parse_args()
+
+    manager = WorkflowRunManager(max_concurrent=args.max_concurrency, queue_size=args.queue_size, db_file=args.db)
+    uvicorn.run(create_app(manager), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
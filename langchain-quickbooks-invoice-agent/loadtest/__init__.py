@@ -0,0 +1,7 @@
+"""
+Offline load-test harness for the FastAPI chat backend.
+
+Runs the real app against a scripted chat model and a local mock of the Pica
+passthrough API, so throughput can be measured without network access or
+API keys. See `python -m loadtest.run --help`.
+"""
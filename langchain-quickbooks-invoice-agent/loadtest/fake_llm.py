@@ -0,0 +1,57 @@
+"""
+Deterministic chat model that follows the structured-chat agent protocol.
+
+Invoice requests get a createQuickBooksInvoice tool call followed by a final
+answer once the tool's observation comes back; anything else is answered
+directly. A fixed latency stands in for the model's response time.
+"""
+import json
+import time
+from typing import Any, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+SCRIPTED_INVOICE = {
+    "customer_id": "58",
+    "customer_name": "Load Test Customer",
+    "line_items": [
+        {"item_name": "Development Services", "quantity": 1, "unit_price": 12000},
+        {"item_name": "Training Session", "quantity": 1, "unit_price": 1000},
+    ],
+}
+
+
+def _action_blob(action: str, action_input: Any) -> str:
+    blob = json.dumps({"action": action, "action_input": action_input}, indent=2)
+    return f"Thought: scripted step\nAction:\n```\n{blob}\n```"
+
+
+class ScriptedChatModel(BaseChatModel):
+    """Chat model returning scripted structured-chat actions after `latency` seconds."""
+
+    latency: float = 0.05
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted-chat"
+
+    def _respond(self, messages: List[BaseMessage]) -> str:
+        prompt = str(messages[-1].content)
+        if "Observation:" in prompt:
+            observation = prompt.rsplit("Observation:", 1)[1].strip().splitlines()[0]
+            return _action_blob("Final Answer", observation)
+        if "invoice" in prompt.split("User Query:")[-1].lower():
+            return _action_blob("createQuickBooksInvoice", SCRIPTED_INVOICE)
+        return _action_blob("Final Answer", "I can create QuickBooks invoices for your customers.")
+
+    def _generate(self,
+                  messages: List[BaseMessage],
+                  stop: Optional[List[str]] = None,
+                  run_manager: Any = None,
+                  **kwargs: Any) -> ChatResult:
+        if self.latency:
+            time.sleep(self.latency)
+        message = AIMessage(content=self._respond(messages))
+        return ChatResult(generations=[ChatGeneration(message=message)])
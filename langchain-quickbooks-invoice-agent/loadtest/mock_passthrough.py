@@ -0,0 +1,50 @@
+"""
+Local stand-in for the Pica passthrough API.
+
+Answers every POST under /v1/passthrough with a QuickBooks-style invoice after
+a fixed latency. Point the app at it with PICA_BASE_URL.
+"""
+import itertools
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Tuple
+
+
+class _PassthroughHandler(BaseHTTPRequestHandler):
+    latency = 0.02
+    _ids = itertools.count(1)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length) or b"{}")
+        if self.latency:
+            time.sleep(self.latency)
+
+        invoice_id = next(self._ids)
+        total = sum(line.get("Amount", 0) for line in body.get("Line", []))
+        payload = json.dumps({"Invoice": {
+            "Id": str(invoice_id),
+            "DocNumber": f"LT-{invoice_id}",
+            "TotalAmt": total,
+            "Balance": total,
+        }}).encode()
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_mock_passthrough(latency: float = 0.02, port: int = 0) -> Tuple[ThreadingHTTPServer, str]:
+    """Start the mock server in a daemon thread and return it with its base URL."""
+    handler = type("PassthroughHandler", (_PassthroughHandler,), {"latency": latency})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
@@ -0,0 +1,208 @@
+"""
+Drive /api/chat at increasing concurrency and record throughput and latency.
+
+Usage (from the project root):
+
+    python -m loadtest.run --levels 1,4,16,32 --requests 200 --output loadtest-results.json
+    python -m loadtest.run --baseline loadtest-results.json --output new-results.json
+
+The app runs in-process under uvicorn with the scripted model from
+loadtest.fake_llm and the mock Pica server from loadtest.mock_passthrough, so
+no network access or API keys are needed. Event-loop lag is sampled on the
+server's loop: it is how late a timer that should fire every `--lag-interval`
+seconds actually fires, which grows when the loop is blocked.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
+import httpx
+import uvicorn
+
+from .fake_llm import ScriptedChatModel
+from .mock_passthrough import start_mock_passthrough
+
+INVOICE_QUERY = (
+    "Create me an invoice for customer with the id 58 for "
+    "1 Development Services (12000) and 1 Training Session (1000)"
+)
+INFO_QUERY = "What can you do?"
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Offline load test for the chat backend")
+    parser.add_argument("--levels", default="1,4,16,32", help="Comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=200, help="Requests sent at each level")
+    parser.add_argument("--invoice-ratio", type=float, default=0.5, help="Share of requests that create an invoice")
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="Scripted model latency per call (s)")
+    parser.add_argument("--passthrough-latency", type=float, default=0.02, help="Mock Pica latency per call (s)")
+    parser.add_argument("--lag-interval", type=float, default=0.01, help="Event-loop lag sampling interval (s)")
+    parser.add_argument("--response-cache", action="store_true",
+                        help="Leave the response cache on (off by default so every request reaches the agent)")
+    parser.add_argument("--port", type=int, default=8765, help="Port for the app under test")
+    parser.add_argument("--output", default="loadtest-results.json", help="Where to write the JSON results")
+    parser.add_argument("--baseline", help="Earlier results file to compare against")
+    return parser.parse_args()
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(values: List[float]) -> Dict[str, float]:
+    """Latency summary in milliseconds."""
+    return {
+        "p50_ms": round(percentile(values, 50) * 1000, 2),
+        "p90_ms": round(percentile(values, 90) * 1000, 2),
+        "p95_ms": round(percentile(values, 95) * 1000, 2),
+        "p99_ms": round(percentile(values, 99) * 1000, 2),
+        "max_ms": round(max(values, default=0.0) * 1000, 2),
+        "mean_ms": round(statistics.fmean(values) * 1000, 2) if values else 0.0,
+    }
+
+
+class AppServer:
+    """Runs the FastAPI app under uvicorn on its own thread and event loop."""
+
+    def __init__(self, app, port: int, lag_interval: float):
+        self.server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+        self.loop = asyncio.new_event_loop()
+        self.lag_interval = lag_interval
+        self.lag_samples: List[float] = []
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self) -> None:
+        asyncio.set_event_loop(self.loop)
+        monitor = self.loop.create_task(self._monitor_lag())
+        self.loop.run_until_complete(self.server.serve())
+        monitor.cancel()
+        self.loop.run_until_complete(asyncio.gather(monitor, return_exceptions=True))
+
+    async def _monitor_lag(self) -> None:
+        while True:
+            expected = time.perf_counter() + self.lag_interval
+            await asyncio.sleep(self.lag_interval)
+            self.lag_samples.append(max(0.0, time.perf_counter() - expected))
+
+    def start(self) -> None:
+        self._thread.start()
+        while not self.server.started:
+            time.sleep(0.05)
+
+    def stop(self) -> None:
+        self.server.should_exit = True
+        self._thread.join(timeout=10)
+
+
+async def run_level(url: str, concurrency: int, total: int, invoice_ratio: float) -> Dict[str, Any]:
+    """Send `total` chat requests from `concurrency` concurrent clients."""
+    latencies: List[float] = []
+    errors: Dict[str, int] = {}
+    next_index = iter(range(total))
+    invoice_every = round(1 / invoice_ratio) if invoice_ratio > 0 else 0
+
+    async def worker(client: httpx.AsyncClient) -> None:
+        for i in next_index:
+            query = INVOICE_QUERY if invoice_every and i % invoice_every == 0 else INFO_QUERY
+            started = time.perf_counter()
+            try:
+                response = await client.post(url, json={"message": query})
+                status = str(response.status_code)
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+            latencies.append(time.perf_counter() - started)
+            if status != "200":
+                errors[status] = errors.get(status, 0) + 1
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=120) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        duration = time.perf_counter() - started
+
+    return {
+        "concurrency": concurrency,
+        "requests": total,
+        "errors": errors,
+        "duration_s": round(duration, 3),
+        "throughput_rps": round(total / duration, 2) if duration else 0.0,
+        "latency": summarize(latencies),
+    }
+
+
+def compare(results: Dict[str, Any], baseline_path: str) -> None:
+    """Print throughput and p95 changes against an earlier run."""
+    with open(baseline_path) as f:
+        baseline = {level["concurrency"]: level for level in json.load(f)["levels"]}
+
+    print(f"\nCompared with {baseline_path}:")
+    for level in results["levels"]:
+        before = baseline.get(level["concurrency"])
+        if not before:
+            continue
+        rps_change = (level["throughput_rps"] / before["throughput_rps"] - 1) * 100 if before["throughput_rps"] else 0
+        p95_change = level["latency"]["p95_ms"] - before["latency"]["p95_ms"]
+        print(f"  c={level['concurrency']:>3}: throughput {rps_change:+.1f}%  p95 {p95_change:+.1f} ms")
+
+
+def main() -> None:
+    args = parse_args()
+
+    mock_server, mock_url = start_mock_passthrough(latency=args.passthrough_latency)
+    os.environ["PICA_BASE_URL"] = mock_url
+    os.environ.setdefault("OPENAI_API_KEY", "loadtest")
+    os.environ.setdefault("PICA_API_KEY", "loadtest")
+    os.environ.setdefault("QUICKBOOKS_CONNECTION_KEY", "loadtest")
+    if not args.response_cache:
+        os.environ["RESPONSE_CACHE_SIZE"] = "0"
+
+    # Imported after the environment is prepared, since the app reads it on import
+    from src.agent import use_llm
+    from src.backend import app
+
+    use_llm(ScriptedChatModel(latency=args.llm_latency), verbose=False)
+    server = AppServer(app, args.port, args.lag_interval)
+    server.start()
+
+    results: Dict[str, Any] = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "settings": {k: v for k, v in vars(args).items() if k not in ("output", "baseline")},
+        "levels": [],
+    }
+    url = f"http://127.0.0.1:{args.port}/api/chat"
+
+    try:
+        for concurrency in [int(level) for level in args.levels.split(",")]:
+            server.lag_samples.clear()
+            level = asyncio.run(run_level(url, concurrency, args.requests, args.invoice_ratio))
+            level["event_loop_lag"] = summarize(list(server.lag_samples))
+            results["levels"].append(level)
+            print(f"c={concurrency:>3}  {level['throughput_rps']:>8.2f} req/s  "
+                  f"p50 {level['latency']['p50_ms']:>8.1f} ms  p99 {level['latency']['p99_ms']:>8.1f} ms  "
+                  f"loop lag p99 {level['event_loop_lag']['p99_ms']:>6.1f} ms  errors {level['errors'] or 0}")
+    finally:
+        server.stop()
+        mock_server.shutdown()
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    if args.baseline:
+        compare(results, args.baseline)
+
+
+if __name__ == "__main__":
+    main()
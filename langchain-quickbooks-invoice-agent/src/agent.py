@@ -1,34 +1,69 @@
+import hashlib
+import threading
+
 from dotenv import load_dotenv
 from langchain_openai import ChatOpenAI
 from langchain.agents import initialize_agent, AgentType
 from langchain.schema import SystemMessage
+from langchain_core.callbacks import BaseCallbackHandler
+from .config import get_response_cache_settings
+from .deadline import DeadlineCallbackHandler, DeadlineExceeded, current_deadline
 from .quickbooks_tools import CreateQuickBooksInvoiceTool
+from .response_cache import ResponseCache
+from .tenants import current_tenant
 
 load_dotenv()
 
+
+class DeadlineChatOpenAI(ChatOpenAI):
+    """ChatOpenAI that caps every completion call at the request's remaining time."""
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        deadline = current_deadline()
+        if deadline is not None:
+            kwargs["timeout"] = deadline.check()
+        return super()._generate(messages, stop=stop, run_manager=run_manager, **kwargs)
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        deadline = current_deadline()
+        if deadline is not None:
+            kwargs["timeout"] = deadline.check()
+        return await super()._agenerate(messages, stop=stop, run_manager=run_manager, **kwargs)
+
+
 # Initialize the QuickBooks tool
 quickbooks_tool = CreateQuickBooksInvoiceTool()
 
 # Initialize the LLM
-_llm = ChatOpenAI(
+_llm = DeadlineChatOpenAI(
     model="gpt-4o-mini",  # Using a more reliable model
     temperature=0.7
 )
 
+def create_agent(llm, verbose: bool = True):
+    """Build the QuickBooks agent executor around `llm`."""
+    return initialize_agent(
+        tools=[quickbooks_tool],
+        llm=llm,
+        agent=AgentType.STRUCTURED_CHAT_ZERO_SHOT_REACT_DESCRIPTION,
+        verbose=verbose,
+        handle_parsing_errors=True
+    )
+
+
 # Initialize the agent with tools
-_agent = initialize_agent(
-    tools=[quickbooks_tool],
-    llm=_llm,
-    agent=AgentType.STRUCTURED_CHAT_ZERO_SHOT_REACT_DESCRIPTION,
-    verbose=True,
-    handle_parsing_errors=True
-)
+_agent = create_agent(_llm)
 
-def run_agent_query(query: str) -> str:
-    """Run a query through the agent and return the response."""
-    try:
-        # Add system context about QuickBooks capabilities
-        system_context = """You are a helpful business assistant with access to QuickBooks functionality. 
+
+def use_llm(llm, verbose: bool = True) -> None:
+    """Swap the model behind run_agent_query, e.g. for a scripted model in load tests."""
+    global _llm, _agent
+    _llm = llm
+    _agent = create_agent(llm, verbose=verbose)
+
+
+# System context about QuickBooks capabilities
+SYSTEM_CONTEXT = """You are a helpful business assistant with access to QuickBooks functionality. 
         
         You can create invoices in QuickBooks using the createQuickBooksInvoice tool. 
         Important constraints:
@@ -38,8 +73,78 @@ def run_agent_query(query: str) -> str:
         - Line item amounts are automatically calculated as quantity × unit_price
         
         When asked to create invoices, make sure to validate the total amount and gather all required information before proceeding. Always ask for quantity and unit price for each line item. Items are referenced by their display names."""
-        
-        response = _agent.run(f"{system_context}\n\nUser Query: {query}")
-        return str(response)
+
+# Cached responses are only valid for the prompt that produced them
+PROMPT_VERSION = hashlib.sha256(SYSTEM_CONTEXT.encode()).hexdigest()[:12]
+
+# Tools with side effects; turns that ran one of these are never cached
+MUTATING_TOOLS = {quickbooks_tool.name}
+
+# Pseudo-tool LangChain runs when the model output could not be parsed;
+# such turns end in a recovery message, not an answer worth caching
+PARSE_ERROR_TOOL = "_Exception"
+UNCACHEABLE_TOOLS = MUTATING_TOOLS | {PARSE_ERROR_TOOL}
+
+
+class ToolUseRecorder(BaseCallbackHandler):
+    """Records the names of the tools the agent runs during one turn."""
+
+    def __init__(self):
+        self.tools_used = []
+
+    def on_tool_start(self, serialized, input_str, **kwargs):
+        self.tools_used.append((serialized or {}).get("name") or kwargs.get("name"))
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    """Get the response cache partition of the current tenant."""
+    global _default_cache
+
+    def create_cache():
+        settings = get_response_cache_settings()
+        return ResponseCache(PROMPT_VERSION, **settings)
+
+    tenant = current_tenant()
+    if tenant is not None:
+        return tenant.partition("response_cache", create_cache)
+    if _default_cache is None:
+        with _default_cache_lock:
+            if _default_cache is None:
+                _default_cache = create_cache()
+    return _default_cache
+
+
+def run_agent_query(query: str) -> str:
+    """
+    Run a query through the agent and return the response.
+
+    Answers to read-only queries are served from the response cache; turns
+    that ran a mutating tool or hit an output parsing error are never cached. When called inside a deadline
+    scope the agent stops between steps once the deadline passes, and
+    DeadlineExceeded is raised to the caller.
+    """
+    cache = get_response_cache()
+    cached_response = cache.get(query)
+    if cached_response is not None:
+        return cached_response
+
+    try:
+        recorder = ToolUseRecorder()
+        callbacks = [recorder]
+        deadline = current_deadline()
+        if deadline is not None:
+            callbacks.append(DeadlineCallbackHandler(deadline))
+
+        response = str(_agent.run(f"{SYSTEM_CONTEXT}\n\nUser Query: {query}", callbacks=callbacks))
+    except DeadlineExceeded:
+        raise
     except Exception as e:
         return f"Error processing query: {str(e)}"
+
+    if not UNCACHEABLE_TOOLS.intersection(recorder.tools_used):
+        cache.put(query, response)
+    return response
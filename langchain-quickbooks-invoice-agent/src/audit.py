@@ -0,0 +1,207 @@
+"""
+Audit trail of tool invocations and Pica passthrough requests.
+
+Callers only enqueue records in memory. A background writer drains the queue
+in batches and appends each batch to a rotating JSONL file with a single
+write (a group commit), so auditing adds no file I/O to the request path.
+When the queue is full, callers wait briefly for space and the record is
+dropped and counted if none frees up.
+"""
+import atexit
+import json
+import os
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from .tenants import current_tenant
+
+_SENSITIVE_FIELDS = ("secret", "key", "token", "password", "authorization")
+_STOP = object()
+
+
+def redact(value: Any) -> Any:
+    """Mask credential-like fields before they are written to the audit log."""
+    if isinstance(value, dict):
+        return {
+            k: "********" if any(s in str(k).lower() for s in _SENSITIVE_FIELDS) else redact(v)
+            for k, v in value.items()
+        }
+    if isinstance(value, list):
+        return [redact(v) for v in value]
+    return value
+
+
+class AuditSink:
+    """Buffers audit records and writes them from a background thread."""
+
+    def __init__(self,
+                 directory: str,
+                 filename: str = "audit.jsonl",
+                 max_queue: int = 10000,
+                 batch_size: int = 500,
+                 flush_interval: float = 1.0,
+                 max_file_bytes: int = 10 * 1024 * 1024,
+                 backup_count: int = 5,
+                 enqueue_timeout: float = 0.05,
+                 fsync: bool = False):
+        self.path = os.path.join(directory, filename)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_file_bytes = max_file_bytes
+        self.backup_count = backup_count
+        self.enqueue_timeout = enqueue_timeout
+        self.fsync = fsync
+
+        self.written = 0
+        self.dropped = 0
+        self.write_errors = 0
+        self._dropped_lock = threading.Lock()
+
+        os.makedirs(directory, exist_ok=True)
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max_queue)
+        self._closed = False
+        self._writer = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+        self._writer.start()
+
+    def record(self, event: str, **fields: Any) -> bool:
+        """
+        Enqueue an audit record.
+
+        Returns:
+            False if the record was dropped because the queue stayed full
+        """
+        if self._closed:
+            return False
+        record = {
+            "ts": datetime.now(timezone.utc).isoformat(),
+            "event": event,
+            **redact(fields),
+        }
+        try:
+            self._queue.put(record, timeout=self.enqueue_timeout)
+            return True
+        except queue.Full:
+            with self._dropped_lock:
+                self.dropped += 1
+            return False
+
+    def close(self, timeout: float = 10.0) -> None:
+        """Stop accepting records and flush everything already queued."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._writer.join(timeout=timeout)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "queued": self._queue.qsize(),
+            "written": self.written,
+            "dropped": self.dropped,
+            "write_errors": self.write_errors,
+        }
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            batch: List[Dict[str, Any]] = []
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+
+            # Gather whatever else arrives within the flush interval, up to a batch
+            deadline = time.monotonic() + self.flush_interval
+            while True:
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+
+            if stopping:
+                # Drain records enqueued before close() was called
+                while True:
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is not _STOP:
+                        batch.append(item)
+
+            if batch:
+                self._write(batch)
+
+    def _write(self, batch: List[Dict[str, Any]]) -> None:
+        data = "".join(json.dumps(record, default=str) + "\n" for record in batch)
+        try:
+            self._rotate_if_needed(len(data))
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(data)
+                f.flush()
+                if self.fsync:
+                    os.fsync(f.fileno())
+            self.written += len(batch)
+        except OSError:
+            self.write_errors += 1
+
+    def _rotate_if_needed(self, incoming: int) -> None:
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            return
+        if size == 0 or size + incoming <= self.max_file_bytes:
+            return
+        for i in range(self.backup_count - 1, 0, -1):
+            older = f"{self.path}.{i}"
+            if os.path.exists(older):
+                os.replace(older, f"{self.path}.{i + 1}")
+        if self.backup_count > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+
+
+_sink: Optional[AuditSink] = None
+_sink_lock = threading.Lock()
+
+
+def get_audit_sink() -> Optional[AuditSink]:
+    """Get the process-wide audit sink, or None when AUDIT_LOG_DIR is unset."""
+    global _sink
+    directory = os.getenv('AUDIT_LOG_DIR')
+    if not directory:
+        return None
+    if _sink is None:
+        with _sink_lock:
+            if _sink is None:
+                _sink = AuditSink(
+                    directory,
+                    max_queue=int(os.getenv('AUDIT_QUEUE_SIZE', '10000')),
+                    max_file_bytes=int(os.getenv('AUDIT_MAX_FILE_BYTES', str(10 * 1024 * 1024))),
+                )
+                atexit.register(_sink.close)
+    return _sink
+
+
+def audit_event(event: str, **fields: Any) -> None:
+    """Record an audit event for the current tenant, if auditing is enabled."""
+    sink = get_audit_sink()
+    if sink is None:
+        return
+    tenant = current_tenant()
+    sink.record(event, tenant=tenant.tenant_id if tenant else None, **fields)
+
+
+def shutdown_audit_sink() -> None:
+    """Flush and close the audit sink."""
+    if _sink is not None:
+        _sink.close()
@@ -1,10 +1,14 @@
-from fastapi import FastAPI, HTTPException
+import asyncio
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from typing import Optional
-from .agent import run_agent_query
-from .config import check_environment_health, EnvironmentError
+from .agent import get_response_cache, run_agent_query
+from .audit import get_audit_sink, shutdown_audit_sink
+from .config import check_environment_health, get_chat_timeout, EnvironmentError
+from .deadline import Deadline, DeadlineExceeded, deadline_scope
+from .tenants import Tenant, TenantError, get_tenant_registry, tenant_scope
 
 app = FastAPI(title="LangChain Chat API", version="1.0.0")
 
@@ -18,6 +22,16 @@ app.add_middleware(
 
 app.mount("/static", StaticFiles(directory="frontend"), name="static")
 
+@app.on_event("startup")
+async def start_audit_sink():
+    """Start the audit writer, if AUDIT_LOG_DIR is set, before serving requests."""
+    get_audit_sink()
+
+@app.on_event("shutdown")
+async def flush_audit_sink():
+    """Write out buffered audit records before the process exits."""
+    await asyncio.to_thread(shutdown_audit_sink)
+
 class ChatRequest(BaseModel):
     message: str
     conversation_id: Optional[str] = None
@@ -26,22 +40,90 @@ class ChatResponse(BaseModel):
     response: str
     conversation_id: Optional[str] = None
 
+DISCONNECT_POLL_INTERVAL = 0.5
+
+
+def _resolve_tenant(http_request: Request, rate_limited: bool = True) -> Tenant:
+    """
+    Route a request to its tenant using the X-API-Key (or bearer token) and
+    X-Tenant-ID headers, and apply the tenant's rate limit.
+    """
+    api_key = http_request.headers.get("x-api-key")
+    authorization = http_request.headers.get("authorization", "")
+    if not api_key and authorization.lower().startswith("bearer "):
+        api_key = authorization[7:].strip()
+
+    try:
+        tenant = get_tenant_registry().resolve(
+            tenant_id=http_request.headers.get("x-tenant-id"),
+            api_key=api_key
+        )
+    except TenantError as e:
+        raise HTTPException(status_code=401, detail=str(e))
+
+    if rate_limited and not tenant.try_acquire():
+        raise HTTPException(status_code=429, detail=f"Rate limit exceeded for tenant {tenant.tenant_id}")
+    return tenant
+
+
+async def _run_agent_with_deadline(query: str, deadline: Deadline, http_request: Request) -> str:
+    """
+    Run the agent in a worker thread under `deadline`.
+
+    The deadline is cancelled when the client disconnects or time runs out, so
+    the agent stops at its next LLM or tool step and frees the worker.
+    """
+    with deadline_scope(deadline):
+        # to_thread copies the current context, so the worker sees the deadline
+        agent_task = asyncio.ensure_future(asyncio.to_thread(run_agent_query, query))
+
+    try:
+        while not agent_task.done():
+            done, _ = await asyncio.wait(
+                {agent_task},
+                timeout=min(DISCONNECT_POLL_INTERVAL, deadline.remaining())
+            )
+            if done:
+                break
+            if await http_request.is_disconnected():
+                deadline.cancel("cancelled: client disconnected")
+                raise DeadlineExceeded("Client disconnected")
+            if deadline.expired():
+                deadline.cancel("timed out")
+                raise DeadlineExceeded(f"Request exceeded its {deadline.timeout:.0f}s deadline")
+        return agent_task.result()
+    finally:
+        if not agent_task.done():
+            agent_task.cancel()
+
+
 @app.post("/api/chat", response_model=ChatResponse)
-async def chat_endpoint(request: ChatRequest):
+async def chat_endpoint(request: ChatRequest, http_request: Request):
     """
     Chat endpoint that processes messages through the LangChain agent.
+
+    Each request gets a CHAT_REQUEST_TIMEOUT budget covering every LLM and
+    Pica call made on its behalf; running out returns 504. The request runs
+    with its tenant's QuickBooks connection, HTTP pool and rate limit.
     """
     try:
         if not request.message.strip():
             raise HTTPException(status_code=400, detail="Message cannot be empty")
         
-        agent_response = run_agent_query(request.message)
+        tenant = _resolve_tenant(http_request)
+        deadline = Deadline(get_chat_timeout())
+        with tenant_scope(tenant):
+            agent_response = await _run_agent_with_deadline(request.message, deadline, http_request)
         
         return ChatResponse(
             response=agent_response,
             conversation_id=request.conversation_id
         )
     
+    except HTTPException:
+        raise
+    except DeadlineExceeded as e:
+        raise HTTPException(status_code=504, detail=f"Error processing message: {str(e)}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing message: {str(e)}")
 
@@ -74,6 +156,14 @@ async def health_check():
             "quickbooks_enabled": False
         }
 
+@app.get("/api/cache")
+async def cache_stats(http_request: Request):
+    """Response cache statistics, including the hit ratio, for the caller's tenant."""
+    tenant = _resolve_tenant(http_request, rate_limited=False)
+    with tenant_scope(tenant):
+        cache = get_response_cache()
+        return {"tenant": tenant.tenant_id, "prompt_version": cache.prompt_version, **cache.stats()}
+
 @app.get("/api/environment")
 async def environment_status():
     """Check environment variable configuration status."""
@@ -15,7 +15,10 @@ def validate_environment() -> None:
     Validate that all required environment variables are set.
     Raises EnvironmentError if any required variables are missing.
     """
-    required_vars = ['OPENAI_API_KEY', 'PICA_API_KEY', 'QUICKBOOKS_CONNECTION_KEY']
+    required_vars = ['OPENAI_API_KEY']
+    if not os.getenv('TENANTS_FILE'):
+        # Per-tenant keys come from TENANTS_FILE when it is set
+        required_vars += ['PICA_API_KEY', 'QUICKBOOKS_CONNECTION_KEY']
     missing_vars = []
     
     for var in required_vars:
@@ -57,6 +60,35 @@ def get_openai_api_key() -> str:
     return api_key
 
 
+def get_pica_base_url() -> str:
+    """Get the base URL of the Pica API (overridable for local testing)."""
+    return os.getenv('PICA_BASE_URL', 'https://api.picaos.com').rstrip('/')
+
+
+def get_chat_timeout() -> float:
+    """Get the overall time budget for a single chat request, in seconds."""
+    return float(os.getenv('CHAT_REQUEST_TIMEOUT', '60'))
+
+
+def get_http_timeout() -> float:
+    """Get the timeout for outbound HTTP calls made outside of a chat request, in seconds."""
+    return float(os.getenv('PICA_HTTP_TIMEOUT', '30'))
+
+
+def get_response_cache_settings() -> dict:
+    """
+    Get the response cache settings.
+
+    RESPONSE_CACHE_SIMILARITY enables matching near-identical phrasings when
+    set between 0 and 1 (e.g. 0.85); 0 means exact matches only.
+    """
+    return {
+        'max_entries': int(os.getenv('RESPONSE_CACHE_SIZE', '256')),
+        'ttl_seconds': float(os.getenv('RESPONSE_CACHE_TTL', '600')),
+        'similarity_threshold': float(os.getenv('RESPONSE_CACHE_SIMILARITY', '0')),
+    }
+
+
 def check_environment_health() -> dict:
     """
     Check the health of environment variables and return status.
@@ -64,10 +96,11 @@ def check_environment_health() -> dict:
     Returns:
         Dict with status information for each environment variable
     """
+    multi_tenant = bool(os.getenv('TENANTS_FILE'))
     env_status = {
         'OPENAI_API_KEY': bool(os.getenv('OPENAI_API_KEY')),
-        'PICA_API_KEY': bool(os.getenv('PICA_API_KEY')),
-        'QUICKBOOKS_CONNECTION_KEY': bool(os.getenv('QUICKBOOKS_CONNECTION_KEY')),
+        'PICA_API_KEY': multi_tenant or bool(os.getenv('PICA_API_KEY')),
+        'QUICKBOOKS_CONNECTION_KEY': multi_tenant or bool(os.getenv('QUICKBOOKS_CONNECTION_KEY')),
     }
     
     all_set = all(env_status.values())
@@ -0,0 +1,108 @@
+"""
+Per-request deadlines for the chat request path.
+
+A Deadline is created at the API edge and stored in a context variable, so the
+agent, the LLM client and the Pica tools can all read the remaining time
+without it being threaded through every call signature.
+"""
+import time
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator, Optional
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a request runs past its deadline or is cancelled."""
+    pass
+
+
+class Deadline:
+    """An absolute point in time by which a request must finish."""
+
+    def __init__(self, timeout: float):
+        self.timeout = timeout
+        self.expires_at = time.monotonic() + timeout
+        self._cancelled = threading.Event()
+        self.reason: Optional[str] = None
+
+    def remaining(self) -> float:
+        """Seconds left before the deadline (never negative)."""
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def cancel(self, reason: str = "cancelled") -> None:
+        """Cancel the request; in-flight work stops at its next check."""
+        self.reason = reason
+        self._cancelled.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def check(self) -> float:
+        """
+        Return the remaining time, or raise if the request is cancelled or expired.
+
+        Raises:
+            DeadlineExceeded: If there is no time left to start more work
+        """
+        if self.cancelled:
+            raise DeadlineExceeded(f"Request {self.reason}")
+        remaining = self.remaining()
+        if remaining <= 0:
+            raise DeadlineExceeded(f"Request exceeded its {self.timeout:.0f}s deadline")
+        return remaining
+
+
+_current_deadline: ContextVar[Optional[Deadline]] = ContextVar("deadline", default=None)
+
+
+def current_deadline() -> Optional[Deadline]:
+    """Get the deadline of the request being processed, if any."""
+    return _current_deadline.get()
+
+
+@contextmanager
+def deadline_scope(deadline: Deadline) -> Iterator[Deadline]:
+    """Make `deadline` the current deadline for the enclosed block."""
+    token = _current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current_deadline.reset(token)
+
+
+def remaining_timeout(default: float) -> float:
+    """
+    Timeout to use for an outbound call.
+
+    Inside a request this is the time left on its deadline (raising if none is
+    left); outside of one it is `default`.
+    """
+    deadline = current_deadline()
+    if deadline is None:
+        return default
+    return min(default, deadline.check())
+
+
+class DeadlineCallbackHandler(BaseCallbackHandler):
+    """Stops the agent loop before each LLM or tool step once the deadline is gone."""
+
+    raise_error: bool = True
+
+    def __init__(self, deadline: Deadline):
+        self.deadline = deadline
+
+    def on_llm_start(self, serialized: Any, prompts: Any, **kwargs: Any) -> None:
+        self.deadline.check()
+
+    def on_chat_model_start(self, serialized: Any, messages: Any, **kwargs: Any) -> None:
+        self.deadline.check()
+
+    def on_tool_start(self, serialized: Any, input_str: str, **kwargs: Any) -> None:
+        self.deadline.check()
@@ -2,9 +2,14 @@
 Pica Tool Executor for making API calls to third-party platforms via Pica.
 """
 import os
+import time
 import requests
 from typing import Dict, Any, Optional
 from urllib.parse import urlencode
+from .audit import audit_event
+from .config import get_http_timeout, get_pica_base_url
+from .deadline import remaining_timeout
+from .tenants import current_tenant
 
 
 def pica_tool_executor(
@@ -14,7 +19,8 @@ def pica_tool_executor(
     method: str = 'POST',
     query_params: Optional[Dict[str, Any]] = None,
     body: Optional[Dict[str, Any]] = None,
-    content_type: str = 'application/json'
+    content_type: str = 'application/json',
+    timeout: Optional[float] = None
 ) -> Dict[str, Any]:
     """
     Execute a Pica API call to a third-party platform.
@@ -27,6 +33,8 @@ def pica_tool_executor(
         query_params: Query parameters to append to the URL
         body: Request body for POST/PUT requests
         content_type: Content type header (default: 'application/json')
+        timeout: Request timeout in seconds (default: the current request's
+            remaining time, or PICA_HTTP_TIMEOUT outside of a request)
     
     Returns:
         Dict containing the response data
@@ -34,13 +42,14 @@ def pica_tool_executor(
     Raises:
         Exception: If the API call fails or environment variables are missing
     """
-    # Validate environment variables
-    pica_api_key = os.getenv('PICA_API_KEY')
+    # Use the calling tenant's Pica credentials, or the environment's
+    tenant = current_tenant()
+    pica_api_key = tenant.pica_api_key if tenant else os.getenv('PICA_API_KEY')
     if not pica_api_key:
         raise Exception('PICA_API_KEY environment variable is required')
     
     # Build URL
-    base_url = 'https://api.picaos.com/v1/passthrough'
+    base_url = f"{get_pica_base_url()}/v1/passthrough"
     url = f"{base_url}{path}"
     
     if query_params:
@@ -59,19 +68,26 @@ def pica_tool_executor(
     request_options = {
         'method': method.upper(),
         'url': url,
-        'headers': headers
+        'headers': headers,
+        'timeout': timeout if timeout is not None else remaining_timeout(get_http_timeout())
     }
     
     if body and method.upper() != 'GET':
         request_options['json'] = body
     
+    started = time.perf_counter()
+    status_code = None
+    error = None
     try:
         # Make the API call
-        response = requests.request(**request_options)
+        http = tenant.session if tenant else requests
+        response = http.request(**request_options)
+        status_code = response.status_code
         
         if not response.ok:
             error_text = response.text or f"{response.status_code} {response.reason}"
-            raise Exception(f"Pica API call failed: {response.status_code} {response.reason} :: {error_text}")
+            error = f"Pica API call failed: {response.status_code} {response.reason} :: {error_text}"
+            raise Exception(error)
         
         # Try to return JSON, fallback to empty dict
         try:
@@ -80,4 +96,18 @@ def pica_tool_executor(
             return {"message": "Success", "status_code": response.status_code}
             
     except requests.RequestException as e:
-        raise Exception(f"Request failed: {str(e)}")
+        error = f"Request failed: {str(e)}"
+        raise Exception(error)
+    finally:
+        audit_event(
+            "pica_passthrough",
+            method=method.upper(),
+            path=path,
+            action_id=action_id,
+            query_params=query_params,
+            body=body,
+            status="error" if error else "success",
+            status_code=status_code,
+            error=error,
+            latency_ms=round((time.perf_counter() - started) * 1000, 2),
+        )
@@ -2,9 +2,14 @@
 QuickBooks integration tools using Pica.
 """
 import os
+import time
 from typing import Dict, Any, Optional, List
 from langchain.tools import BaseTool
 from pydantic import BaseModel, Field, validator
+from .audit import audit_event
+from .config import get_http_timeout, get_pica_base_url
+from .deadline import DeadlineExceeded, remaining_timeout
+from .tenants import current_tenant
 
 
 class InvoiceLineItem(BaseModel):
@@ -76,7 +81,40 @@ class CreateQuickBooksInvoiceTool(BaseTool):
              customer_name: Optional[str] = None,
              due_date: Optional[str] = None,
              currency_code: str = "USD") -> str:
-        """Run the tool synchronously."""
+        """Run the tool synchronously and record the call in the audit log."""
+        started = time.perf_counter()
+        status = "error"
+        try:
+            result = self._create_invoice(customer_id, line_items, customer_name, due_date, currency_code)
+            if result.startswith("QuickBooks invoice created successfully"):
+                status = "success"
+            elif result.startswith("Validation Error"):
+                status = "rejected"
+            return result
+        except DeadlineExceeded:
+            status = "deadline_exceeded"
+            raise
+        finally:
+            audit_event(
+                "tool:" + self.name,
+                status=status,
+                latency_ms=round((time.perf_counter() - started) * 1000, 2),
+                inputs={
+                    "customer_id": customer_id,
+                    "customer_name": customer_name,
+                    "line_items": line_items,
+                    "due_date": due_date,
+                    "currency_code": currency_code,
+                },
+            )
+
+    def _create_invoice(self,
+                        customer_id: str,
+                        line_items: List[Dict[str, Any]],
+                        customer_name: Optional[str],
+                        due_date: Optional[str],
+                        currency_code: str) -> str:
+        """Validate the input and create the invoice through the Pica passthrough API."""
         try:
             # Convert line items to proper format
             validated_line_items = [InvoiceLineItem(**item) for item in line_items]
@@ -90,8 +128,9 @@ class CreateQuickBooksInvoiceTool(BaseTool):
                 currency_code=currency_code
             )
             
-            # Validate environment variables
-            connection_key = os.getenv('QUICKBOOKS_CONNECTION_KEY')
+            # Use the calling tenant's QuickBooks company, or the environment's
+            tenant = current_tenant()
+            connection_key = tenant.quickbooks_connection_key if tenant else os.getenv('QUICKBOOKS_CONNECTION_KEY')
             if not connection_key:
                 return "Error: QUICKBOOKS_CONNECTION_KEY environment variable is required. Please set up your QuickBooks connection."
             
@@ -141,13 +180,14 @@ class CreateQuickBooksInvoiceTool(BaseTool):
             import requests
             from urllib.parse import urlencode
             
-            pica_api_key = os.getenv('PICA_API_KEY')
+            pica_api_key = tenant.pica_api_key if tenant else os.getenv('PICA_API_KEY')
             if not pica_api_key:
                 return "Error: PICA_API_KEY environment variable is required"
             
             # Build URL
-            base_url = 'https://api.picaos.com/v1/passthrough'
-            url = f"{base_url}/v3/company/{{realmId}}/invoice"
+            base_url = f"{get_pica_base_url()}/v1/passthrough"
+            path = "/v3/company/{realmId}/invoice"
+            url = f"{base_url}{path}"
             
             # Prepare headers
             headers = {
@@ -158,8 +198,35 @@ class CreateQuickBooksInvoiceTool(BaseTool):
                 'x-pica-action-id': 'conn_mod_def::GD9h8p8qTi8::MiNlet1KSQSe99EphDAh6Q',
             }
             
-            # Make the API call
-            response = requests.post(url, headers=headers, json=invoice_body)
+            # Make the API call on the tenant's own connection pool, bounded by
+            # the request's remaining time (raises before anything is sent if
+            # the deadline already passed)
+            http = tenant.session if tenant else requests
+            timeout = remaining_timeout(get_http_timeout())
+            request_started = time.perf_counter()
+            response = None
+            error = None
+            try:
+                response = http.post(url, headers=headers, json=invoice_body, timeout=timeout)
+                if not response.ok:
+                    error = f"{response.status_code} {response.reason}"
+            except Exception as e:
+                error = str(e)
+                raise
+            finally:
+                # Same record shape as pica_executor.execute_pica_action
+                audit_event(
+                    "pica_passthrough",
+                    method="POST",
+                    path=path,
+                    action_id=headers['x-pica-action-id'],
+                    query_params=None,
+                    body=invoice_body,
+                    status="error" if error else "success",
+                    status_code=response.status_code if response is not None else None,
+                    error=error,
+                    latency_ms=round((time.perf_counter() - request_started) * 1000, 2),
+                )
             
             if not response.ok:
                 error_text = response.text or f"{response.status_code} {response.reason}"
@@ -206,6 +273,8 @@ The invoice has been created in QuickBooks and is ready for processing."""
             else:
                 return f"Invoice creation completed but response format was unexpected. Response: {result}"
                 
+        except DeadlineExceeded:
+            raise
         except ValueError as e:
             return f"Validation Error: {str(e)}"
         except Exception as e:
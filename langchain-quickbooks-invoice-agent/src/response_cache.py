@@ -0,0 +1,141 @@
+"""
+Response cache for repeated read-only chat queries.
+
+Entries are keyed by the normalized query text plus the agent's prompt
+version, expire after a TTL and are evicted least-recently-used. With a
+similarity threshold set, a query that misses exactly can still be answered
+by a near-identical cached phrasing, found through a character-trigram index.
+"""
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Set, Tuple
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+_WHITESPACE = re.compile(r"\s+")
+_NUMBERS = re.compile(r"\d+")
+
+
+def normalize_query(query: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace."""
+    text = _PUNCTUATION.sub(" ", query.lower())
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def _trigrams(text: str) -> Set[str]:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class ResponseCache:
+    """Thread-safe TTL + LRU cache of agent responses with optional fuzzy lookup."""
+
+    def __init__(self,
+                 prompt_version: str,
+                 max_entries: int = 256,
+                 ttl_seconds: float = 600,
+                 similarity_threshold: float = 0.0):
+        self.prompt_version = prompt_version
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._grams: Dict[str, Set[str]] = {}
+        self._index: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+
+    def _key(self, normalized: str) -> str:
+        return f"{self.prompt_version}:{normalized}"
+
+    def get(self, query: str) -> Optional[str]:
+        """Return the cached response for `query` or a close paraphrase of it."""
+        normalized = normalize_query(query)
+        with self._lock:
+            key = self._key(normalized)
+            response = self._lookup(key)
+            if response is None and self.similarity_threshold > 0:
+                similar_key = self._find_similar(normalized)
+                response = self._lookup(similar_key) if similar_key else None
+                if response is not None:
+                    self.similar_hits += 1
+
+            if response is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return response
+
+    def put(self, query: str, response: str) -> None:
+        normalized = normalize_query(query)
+        with self._lock:
+            key = self._key(normalized)
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (response, time.monotonic() + self.ttl_seconds)
+            if self.similarity_threshold > 0:
+                grams = _trigrams(normalized)
+                self._grams[key] = grams
+                for gram in grams:
+                    self._index.setdefault(gram, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._grams.clear()
+            self._index.clear()
+
+    def stats(self) -> Dict[str, float]:
+        """Hit/miss counters and the hit ratio since startup."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "similar_hits": self.similar_hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+    def _lookup(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        response, expires_at = entry
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return response
+
+    def _remove(self, key: str) -> None:
+        self._entries.pop(key, None)
+        for gram in self._grams.pop(key, ()):
+            keys = self._index.get(gram)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._index[gram]
+
+    def _find_similar(self, normalized: str) -> Optional[str]:
+        """Best cached key by trigram Jaccard similarity, if above the threshold."""
+        grams = _trigrams(normalized)
+        overlaps: Dict[str, int] = {}
+        for gram in grams:
+            for key in self._index.get(gram, ()):
+                overlaps[key] = overlaps.get(key, 0) + 1
+
+        numbers = _NUMBERS.findall(normalized)
+        best_key, best_score = None, self.similarity_threshold
+        for key, shared in overlaps.items():
+            score = shared / (len(grams) + len(self._grams[key]) - shared)
+            # Never conflate queries that differ in an id, amount or date
+            if score >= best_score and _NUMBERS.findall(key.split(":", 1)[1]) == numbers:
+                best_key, best_score = key, score
+        return best_key
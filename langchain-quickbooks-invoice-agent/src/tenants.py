@@ -0,0 +1,201 @@
+"""
+Tenant registry for serving several QuickBooks companies from one process.
+
+Tenants are loaded from the JSON file named by TENANTS_FILE:
+
+    {
+        "tenants": {
+            "acme": {
+                "quickbooks_connection_key": "live::quickbooks::default::...",
+                "pica_api_key": "sk_live_...",
+                "api_keys": ["acme-client-key"],
+                "rate_limit_per_minute": 60,
+                "max_connections": 10
+            }
+        }
+    }
+
+`pica_api_key` falls back to PICA_API_KEY when omitted. Without TENANTS_FILE
+the registry holds a single "default" tenant built from the environment, so
+existing single-tenant deployments keep working unchanged (and unthrottled).
+
+Each tenant owns its HTTP connection pool, its rate limiter and its cache
+partitions, so a busy tenant cannot exhaust resources used by the others.
+"""
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .config import EnvironmentError
+
+DEFAULT_TENANT_ID = "default"
+
+
+class TenantError(Exception):
+    """Raised when a request cannot be routed to a known tenant."""
+    pass
+
+
+class RateLimiter:
+    """Token bucket allowing `rate_per_minute` requests with bursts up to `burst`."""
+
+    def __init__(self, rate_per_minute: float, burst: Optional[int] = None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = float(burst or max(1, int(rate_per_minute)))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def try_acquire(self) -> bool:
+        """Take a token if one is available, without waiting."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+
+class Tenant:
+    """Credentials and isolated resources for one QuickBooks company."""
+
+    def __init__(self,
+                 tenant_id: str,
+                 quickbooks_connection_key: Optional[str],
+                 pica_api_key: Optional[str],
+                 api_keys: Optional[List[str]] = None,
+                 rate_limit_per_minute: Optional[float] = None,
+                 max_connections: int = 10):
+        self.tenant_id = tenant_id
+        self.quickbooks_connection_key = quickbooks_connection_key
+        self.pica_api_key = pica_api_key
+        self.api_keys = list(api_keys or [])
+        self.rate_limiter = RateLimiter(rate_limit_per_minute) if rate_limit_per_minute else None
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_connections)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self._partitions: Dict[str, Any] = {}
+        self._partitions_lock = threading.Lock()
+
+    def partition(self, name: str, factory: Callable[[], Any]) -> Any:
+        """Get this tenant's instance of a per-tenant resource such as a cache."""
+        with self._partitions_lock:
+            if name not in self._partitions:
+                self._partitions[name] = factory()
+            return self._partitions[name]
+
+    def try_acquire(self) -> bool:
+        """Apply the tenant's rate limit; tenants without one are never limited."""
+        return self.rate_limiter is None or self.rate_limiter.try_acquire()
+
+    def close(self) -> None:
+        self.session.close()
+
+
+class TenantRegistry:
+    """Maps request credentials to tenants."""
+
+    def __init__(self, tenants: Dict[str, Tenant]):
+        self.tenants = tenants
+        self._by_api_key = {key: tenant for tenant in tenants.values() for key in tenant.api_keys}
+
+    @classmethod
+    def from_environment(cls) -> "TenantRegistry":
+        """Build the registry from TENANTS_FILE, or a single default tenant from the environment."""
+        tenants_file = os.getenv('TENANTS_FILE')
+        if not tenants_file:
+            return cls({DEFAULT_TENANT_ID: Tenant(
+                DEFAULT_TENANT_ID,
+                quickbooks_connection_key=os.getenv('QUICKBOOKS_CONNECTION_KEY'),
+                pica_api_key=os.getenv('PICA_API_KEY'),
+            )})
+
+        try:
+            with open(tenants_file) as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            raise EnvironmentError(f"Could not load TENANTS_FILE {tenants_file}: {str(e)}")
+
+        tenants = {}
+        for tenant_id, settings in data.get("tenants", {}).items():
+            tenants[tenant_id] = Tenant(
+                tenant_id,
+                quickbooks_connection_key=settings.get("quickbooks_connection_key"),
+                pica_api_key=settings.get("pica_api_key") or os.getenv('PICA_API_KEY'),
+                api_keys=settings.get("api_keys"),
+                rate_limit_per_minute=settings.get("rate_limit_per_minute", 60),
+                max_connections=settings.get("max_connections", 10),
+            )
+        if not tenants:
+            raise EnvironmentError(f"TENANTS_FILE {tenants_file} does not define any tenants")
+        return cls(tenants)
+
+    def resolve(self, tenant_id: Optional[str] = None, api_key: Optional[str] = None) -> Tenant:
+        """
+        Find the tenant for a request.
+
+        An API key identifies its tenant directly. A bare tenant id is only
+        accepted for tenants that have no API keys configured.
+
+        Raises:
+            TenantError: If the credentials don't match a tenant
+        """
+        if api_key:
+            tenant = self._by_api_key.get(api_key)
+            if tenant is None or (tenant_id and tenant_id != tenant.tenant_id):
+                raise TenantError("Invalid API key")
+            return tenant
+
+        if not tenant_id and len(self.tenants) == 1:
+            tenant_id = next(iter(self.tenants))
+
+        tenant = self.tenants.get(tenant_id) if tenant_id else None
+        if tenant is None:
+            raise TenantError(f"Unknown tenant: {tenant_id}" if tenant_id else "Tenant not specified")
+        if tenant.api_keys:
+            raise TenantError(f"Tenant {tenant_id} requires an API key")
+        return tenant
+
+
+_registry: Optional[TenantRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_tenant_registry() -> TenantRegistry:
+    """Get or create the process-wide tenant registry."""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = TenantRegistry.from_environment()
+    return _registry
+
+
+_current_tenant: ContextVar[Optional[Tenant]] = ContextVar("tenant", default=None)
+
+
+def current_tenant() -> Optional[Tenant]:
+    """Get the tenant of the request being processed, if any."""
+    return _current_tenant.get()
+
+
+@contextmanager
+def tenant_scope(tenant: Tenant) -> Iterator[Tenant]:
+    """Make `tenant` the current tenant for the enclosed block."""
+    token = _current_tenant.set(tenant)
+    try:
+        yield tenant
+    finally:
+        _current_tenant.reset(token)